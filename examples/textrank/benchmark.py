@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Created on Fri Jan 15 14:08:26 2021
+# Author:     zhuoyin94 <zhuoyin94@163.com>
+# Github:     https://github.com/MichaelYin1994
+
+"""
+本模块(textrank.benchmark)提供了TextRank流水线的性能测试，包括分词、句子相似度、
+关键词PageRank计算与main.main()的端到端吞吐量。测试结果以JSON格式输出，并可以与
+基准结果进行比较，以便在发布之前发现性能退化。
+
+用法：
+    python benchmark.py --output result.json
+    python benchmark.py --output result.json --baseline baseline.json
+    python benchmark.py --compare baseline.json result.json
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import contextlib
+from datetime import datetime
+
+import numpy as np
+
+from cache import LRUCache
+from utils import (compute_jaccard_similarity,
+                   compute_edit_similarity,
+                   compute_lcss_similarity,
+                   compute_word_scores,
+                   compute_word_scores_sp,
+                   compute_word_scores_encoded,
+                   compute_word_scores_encoded_batch)
+from vocabulary import Vocabulary, EncodedDocument
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_PATH = os.path.join(BENCHMARK_DIR, "data")
+
+# 各项测试的规模
+SIMILARITY_LENGTHS = [10, 100, 1000]
+SEGMENTATION_SENTENCES = [10, 100, 1000]
+WORD_SCORES_VOCAB_SIZES = [100, 1000, 3000]
+WORD_SCORES_SP_VOCAB_SIZES = [100, 1000, 10000]
+WORD_SCORES_BATCH_DOCUMENTS = [100, 1000]
+MAIN_SCALES = [1, 4, 16]
+
+
+def time_function(func, n_repeats=5, setup=None):
+    """重复调用func并统计每次调用的耗时（秒）。
+
+    @Parameters:
+    ----------
+        func: {callable}
+            被测试的无参函数。
+        n_repeats: {int-like}
+            重复调用的次数。
+        setup: {callable}
+            每次调用func之前执行的无参函数，其耗时不计入结果。
+
+    @Returns:
+    ----------
+        {"min", "median", "mean", "std", "n_repeats"}的统计信息字典。
+    """
+    timings = []
+    for _ in range(n_repeats):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    timings = np.array(timings)
+    return {"min": float(timings.min()),
+            "median": float(np.median(timings)),
+            "mean": float(timings.mean()),
+            "std": float(timings.std()),
+            "n_repeats": n_repeats}
+
+
+def load_sentences(path=DATA_PATH):
+    """读取path下的全部语料，并按句号切分为句子列表。"""
+    sentences = []
+    for name in sorted(os.listdir(path)):
+        if not name.endswith(".txt"):
+            continue
+        with open(os.path.join(path, name), "r") as f:
+            sentences.extend(
+                [item + "。" for item in f.read().split("。") if item.strip()])
+    return sentences
+
+
+def make_synthetic_corpus(sentences, n_documents, n_sentences=20,
+                          random_state=2020):
+    """由sentences中随机抽取的句子拼接成n_documents篇合成语料。"""
+    rng = random.Random(random_state)
+    return ["".join(rng.choice(sentences) for _ in range(n_sentences))
+            for _ in range(n_documents)]
+
+
+def make_word_lists(n_lists, length, vocab_size, random_state=2020):
+    """生成n_lists个长度为length、词表大小为vocab_size的随机词列表。"""
+    rng = np.random.RandomState(random_state)
+    return [[str(word) for word in rng.randint(0, vocab_size, length)]
+            for _ in range(n_lists)]
+
+
+def bench_similarity(n_repeats):
+    """测试各个compute_*_similarity函数在不同句子长度下的耗时。"""
+    results = {}
+    for length in SIMILARITY_LENGTHS:
+        word_list_x, word_list_y = make_word_lists(
+            2, length, max(length // 2, 2))
+        for name, func in [("jaccard", compute_jaccard_similarity),
+                           ("edit", compute_edit_similarity),
+                           ("lcss", compute_lcss_similarity)]:
+            stats = time_function(
+                lambda: func(word_list_x, word_list_y), n_repeats)
+            stats["params"] = {"length": length}
+            results["compute_{}_similarity[length={}]".format(
+                name, length)] = stats
+    return results
+
+
+def bench_word_scores(n_repeats):
+    """测试compute_word_scores与compute_word_scores_sp在不同词表大小下的耗时，
+    以及逐篇与批量计算大量短文本的关键词的耗时。"""
+    results = {}
+    for name, func, vocab_sizes in [
+            ("compute_word_scores", compute_word_scores,
+             WORD_SCORES_VOCAB_SIZES),
+            ("compute_word_scores_sp", compute_word_scores_sp,
+             WORD_SCORES_SP_VOCAB_SIZES)]:
+        for vocab_size in vocab_sizes:
+            word_lists = make_word_lists(
+                max(vocab_size // 10, 10), 30, vocab_size)
+            stats = time_function(
+                lambda: func(word_lists, word_lists), n_repeats)
+            stats["params"] = {"vocab_size": vocab_size,
+                               "n_tokens": 30 * len(word_lists)}
+            results["{}[vocab_size={}]".format(name, vocab_size)] = stats
+
+    # 大量短文本：逐篇计算与分块对角矩阵上的批量计算
+    for n_documents in WORD_SCORES_BATCH_DOCUMENTS:
+        vocabulary = Vocabulary()
+        documents = [EncodedDocument.from_word_lists(
+            make_word_lists(10, 30, 300, random_state=i), vocabulary)
+                     for i in range(n_documents)]
+        for name, func in [
+                ("compute_word_scores_encoded", lambda: [
+                    compute_word_scores_encoded(document, document,
+                                                vocabulary)
+                    for document in documents]),
+                ("compute_word_scores_encoded_batch", lambda: (
+                    compute_word_scores_encoded_batch(documents, documents,
+                                                      vocabulary)))]:
+            stats = time_function(func, n_repeats)
+            stats["params"] = {"n_documents": n_documents}
+            stats["throughput"] = n_documents / stats["median"]
+            results["{}[n_documents={}]".format(name, n_documents)] = stats
+    return results
+
+
+def bench_segmentation(n_repeats):
+    """测试segment_paragraph在不同段落长度下的耗时，每次调用之前清空句子缓存。"""
+    from segmentation import WordSegmentation
+
+    sentences = load_sentences()
+    tokenizer = WordSegmentation(sentence_cache=LRUCache(max_entries=None))
+    _ = tokenizer.seg  # 预先载入pkuseg模型，不计入耗时
+
+    results = {}
+    for n_sentences in SEGMENTATION_SENTENCES:
+        paragraph = make_synthetic_corpus(sentences, 1, n_sentences)[0]
+        stats = time_function(lambda: tokenizer.segment_paragraph(paragraph),
+                              n_repeats, setup=tokenizer.sentence_cache.clear)
+        stats["params"] = {"n_sentences": n_sentences,
+                           "n_chars": len(paragraph)}
+        stats["throughput"] = len(paragraph) / stats["median"]
+        results["segment_paragraph[n_sentences={}]".format(
+            n_sentences)] = stats
+    return results
+
+
+def bench_main(n_repeats):
+    """测试main.main()在由data/扩展得到的合成语料上的端到端吞吐量。"""
+    import main as textrank_main
+
+    sentences = load_sentences()
+    n_files = len([name for name in os.listdir(DATA_PATH)
+                   if name.endswith(".txt")])
+
+    results = {}
+    cwd = os.getcwd()
+    for scale in MAIN_SCALES:
+        corpus = make_synthetic_corpus(sentences, n_files * scale)
+        corpus_path = tempfile.mkdtemp(prefix="textrank_benchmark_")
+        try:
+            for index, text in enumerate(corpus):
+                with open(os.path.join(corpus_path, "{:06d}.txt".format(
+                        index)), "w") as f:
+                    f.write(text)
+
+            # main.main()使用相对路径读取停用词表，并将结果打印到标准输出
+            os.chdir(BENCHMARK_DIR)
+            with contextlib.redirect_stdout(io.StringIO()):
+                stats = time_function(
+                    lambda: textrank_main.main(corpus_path=corpus_path),
+                    n_repeats)
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(corpus_path)
+
+        stats["params"] = {"scale": scale, "n_documents": len(corpus)}
+        stats["throughput"] = len(corpus) / stats["median"]
+        results["main[scale={}]".format(scale)] = stats
+    return results
+
+
+# 各组测试：{名称: (测试函数, 是否依赖pkuseg)}
+BENCHMARKS = {"similarity": (bench_similarity, False),
+              "word_scores": (bench_word_scores, False),
+              "segmentation": (bench_segmentation, True),
+              "main": (bench_main, True)}
+
+
+def run_benchmarks(names=None, n_repeats=5):
+    """运行names指定的各组测试（默认为全部），返回JSON格式的测试结果。
+
+    依赖pkuseg的测试在pkuseg不可用时被跳过，并记录在结果的"skipped"字段中。
+    """
+    names = names or list(BENCHMARKS)
+    results = {"metadata": {"timestamp": datetime.now().isoformat(),
+                            "python": platform.python_version(),
+                            "numpy": np.__version__,
+                            "platform": platform.platform(),
+                            "n_repeats": n_repeats},
+               "benchmarks": {},
+               "skipped": {}}
+    for name in names:
+        if name not in BENCHMARKS:
+            raise ValueError("Invalid benchmark: {}".format(name))
+        bench, is_use_pkuseg = BENCHMARKS[name]
+        if is_use_pkuseg:
+            try:
+                import pkuseg
+            except ImportError as err:
+                results["skipped"][name] = str(err)
+                continue
+        results["benchmarks"].update(bench(n_repeats))
+    return results
+
+
+def compare_results(baseline, current, threshold=0.1, metric="median"):
+    """比较两次测试结果，找出耗时增长超过threshold的测试项。
+
+    @Parameters:
+    ----------
+        baseline: {dict-like}
+            作为基准的测试结果，格式同run_benchmarks的返回值。
+        current: {dict-like}
+            需要比较的测试结果。
+        threshold: {float-like}
+            允许的相对耗时增长，例如0.1表示慢10%以内不视为退化。
+        metric: {str-like}
+            用于比较的统计量，如"median"或"min"。
+
+    @Returns:
+    ----------
+        {测试名称: {"baseline", "current", "ratio", "is_regression"}}的字典，
+        只包含两次结果中均存在的测试项。
+    """
+    comparison = {}
+    for name, stats in current["benchmarks"].items():
+        if name not in baseline["benchmarks"]:
+            continue
+        baseline_time = baseline["benchmarks"][name][metric]
+        ratio = stats[metric] / baseline_time if baseline_time > 0 \
+            else float("inf")
+        comparison[name] = {"baseline": baseline_time,
+                            "current": stats[metric],
+                            "ratio": ratio,
+                            "is_regression": ratio > 1 + threshold}
+    return comparison
+
+
+def print_comparison(comparison):
+    """以表格的形式打印compare_results的结果。"""
+    print("{:<48} {:>12} {:>12} {:>8}".format(
+        "benchmark", "baseline(s)", "current(s)", "ratio"))
+    for name, item in sorted(comparison.items()):
+        print("{:<48} {:>12.6f} {:>12.6f} {:>8.3f}{}".format(
+            name, item["baseline"], item["current"], item["ratio"],
+            "  REGRESSION" if item["is_regression"] else ""))
+
+
+def load_json(path):
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmarks for the textrank pipeline.")
+    parser.add_argument("--output", default=None,
+                        help="path of the JSON result file")
+    parser.add_argument("--benchmarks", nargs="+", default=None,
+                        choices=list(BENCHMARKS),
+                        help="benchmark groups to run (default: all)")
+    parser.add_argument("--repeats", type=int, default=5,
+                        help="number of timed repeats of each benchmark")
+    parser.add_argument("--baseline", default=None,
+                        help="JSON result to compare the new run against")
+    parser.add_argument("--compare", nargs=2, default=None,
+                        metavar=("BASELINE", "CURRENT"),
+                        help="compare two existing JSON results and exit")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="allowed relative slowdown before a "
+                             "benchmark is reported as a regression")
+    return parser.parse_args(argv)
+
+
+def cli(argv=None):
+    """命令行入口，存在性能退化时返回1。"""
+    args = parse_args(argv)
+    if args.compare:
+        baseline, current = load_json(args.compare[0]), \
+            load_json(args.compare[1])
+    else:
+        baseline = load_json(args.baseline) if args.baseline else None
+        current = run_benchmarks(args.benchmarks, args.repeats)
+        result_json = json.dumps(current, indent=2, ensure_ascii=False)
+        if args.output:
+            with open(args.output, "w") as f:
+                f.write(result_json)
+        else:
+            print(result_json)
+        if baseline is None:
+            return 0
+
+    comparison = compare_results(baseline, current, args.threshold)
+    print_comparison(comparison)
+    return int(any(item["is_regression"] for item in comparison.values()))
+
+
+if __name__ == "__main__":
+    sys.exit(cli())
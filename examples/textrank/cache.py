@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Created on Thu Jan  7 14:32:18 2021
+# Author:     zhuoyin94 <zhuoyin94@163.com>
+# Github:     https://github.com/MichaelYin1994
+
+"""
+本模块(textrank.cache)提供了分词结果与抽取结果的缓存工具，包括容量受限的内存LRU
+缓存，以及基于SQLite的持久化缓存。
+"""
+
+import os
+import sys
+import time
+import pickle
+import sqlite3
+import threading
+from collections import OrderedDict
+
+
+def get_object_size(obj):
+    """粗略估计obj占用的内存字节数，对list与tuple类型递归计算其元素大小。"""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (list, tuple)):
+        size += sum(get_object_size(item) for item in obj)
+    return size
+
+
+class LRUCache():
+    """容量受限的LRU（Least Recently Used）缓存。
+
+    当缓存的条目数目超过max_entries，或者估计的内存占用超过max_bytes时，按最近
+    最少使用的顺序淘汰条目。缓存记录命中、未命中与淘汰的次数，并可以持久化到磁盘，
+    使得服务重启之后不必重新计算已缓存的结果。
+
+    @Parameters:
+    ----------
+        max_entries: {int-like}
+            缓存的最大条目数目，为None时不限制条目数目。
+        max_bytes: {int-like}
+            缓存的最大内存占用（字节），为None时不限制内存占用。
+        path: {str-like}
+            缓存的持久化路径。若path指向的文件存在，则在初始化时载入其中的条目。
+
+    @Attributes:
+    ----------
+        self.hits:
+            缓存命中的次数。
+        self.misses:
+            缓存未命中的次数。
+        self.evictions:
+            被淘汰的条目数目。
+    """
+    def __init__(self, max_entries=100000, max_bytes=None, path=None):
+        if max_entries is not None and max_entries <= 0:
+            raise ValueError("max_entries must be greater than 0, " +
+                             "not {}".format(max_entries))
+        if max_bytes is not None and max_bytes <= 0:
+            raise ValueError("max_bytes must be greater than 0, " +
+                             "not {}".format(max_bytes))
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.path = path
+
+        # {key: (value, 条目大小)}
+        self._data = OrderedDict()
+        self.n_bytes = 0
+        self.hits, self.misses, self.evictions = 0, 0, 0
+
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        """查询key对应的缓存值，命中时将该条目标记为最近使用。"""
+        if key not in self._data:
+            self.misses += 1
+            return default
+        item = self._data[key]
+        self._data.move_to_end(key)
+        self.hits += 1
+        return item[0]
+
+    def put(self, key, value):
+        """写入{key: value}，必要时按LRU顺序淘汰旧的条目。"""
+        if key in self._data:
+            self.n_bytes -= self._data.pop(key)[1]
+
+        size = 0
+        if self.max_bytes is not None:
+            size = get_object_size(key) + get_object_size(value)
+        self._data[key] = (value, size)
+        self.n_bytes += size
+        self._evict()
+
+    def _evict(self):
+        """淘汰最近最少使用的条目，直至满足容量约束。"""
+        while self._data and (
+                (self.max_entries is not None and \
+                 len(self._data) > self.max_entries) or \
+                (self.max_bytes is not None and \
+                 self.n_bytes > self.max_bytes)):
+            _, (_, size) = self._data.popitem(last=False)
+            self.n_bytes -= size
+            self.evictions += 1
+
+    def clear(self):
+        """清空缓存的全部条目，计数器保持不变。"""
+        self._data.clear()
+        self.n_bytes = 0
+
+    def stats(self):
+        """返回缓存的统计信息。"""
+        n_queries = self.hits + self.misses
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / n_queries if n_queries else 0.0,
+                "entries": len(self._data),
+                "bytes": self.n_bytes}
+
+    def save(self, path=None):
+        """按LRU顺序将缓存条目持久化到path（默认为self.path）。"""
+        path = path or self.path
+        if path is None:
+            raise ValueError("path must be specified to save the cache !")
+
+        items = [(key, item[0]) for key, item in self._data.items()]
+        with open(path, "wb") as file:
+            pickle.dump(items, file)
+
+    def load(self, path=None):
+        """从path（默认为self.path）载入缓存条目，超出容量的旧条目将被淘汰。"""
+        path = path or self.path
+        if path is None:
+            raise ValueError("path must be specified to load the cache !")
+
+        with open(path, "rb") as file:
+            items = pickle.load(file)
+        for key, value in items:
+            self.put(key, value)
+
+
+class SQLiteCache():
+    """基于SQLite的持久化缓存，接口与LRUCache一致，可以在多个进程之间共享。
+
+    每个条目的值被pickle序列化之后存入单个SQLite文件，并记录其字节数与最近一次
+    访问的时间。当所有条目的总字节数超过max_bytes，或者条目数目超过max_entries
+    时，按最近最少使用的顺序淘汰条目。缓存在进程结束之后依然保留，适用于对基本
+    不变的语料反复运行的批处理任务。
+
+    数据库以WAL模式打开，读操作通过mmap进行且互不阻塞，写操作由SQLite的文件锁
+    串行化，因此多个进程（例如进程池中的工作进程）可以同时读取与写入同一个缓存。
+    每个进程在第一次访问时建立自己的数据库连接，实例可以被pickle之后传递给子进程。
+
+    @Parameters:
+    ----------
+        path: {str-like}
+            SQLite数据库文件的路径，文件不存在时自动创建。
+        max_entries: {int-like}
+            缓存的最大条目数目，为None时不限制条目数目。
+        max_bytes: {int-like}
+            缓存中序列化之后的值的最大总字节数，为None时不限制。
+        access_update_interval: {float-like}
+            命中时更新条目访问时间的最小间隔（秒），默认为60秒。每次更新都是一次
+            需要获取文件写锁的写事务，若每次命中都更新，读多写少的缓存也会在多进程
+            之间相互阻塞；短时间内重复命中的条目因此不再写数据库，代价是LRU顺序的
+            精度降低为该间隔。为0时每次命中都更新，即严格的LRU顺序。
+        timeout: {float-like}
+            等待其他进程释放写锁的最长时间（秒）。
+
+    @Attributes:
+    ----------
+        self.hits:
+            本实例缓存命中的次数。
+        self.misses:
+            本实例缓存未命中的次数。
+        self.evictions:
+            本实例淘汰的条目数目。
+    """
+    def __init__(self, path, max_entries=None, max_bytes=2**30,
+                 access_update_interval=60.0, timeout=30.0):
+        if max_entries is not None and max_entries <= 0:
+            raise ValueError("max_entries must be greater than 0, " +
+                             "not {}".format(max_entries))
+        if max_bytes is not None and max_bytes <= 0:
+            raise ValueError("max_bytes must be greater than 0, " +
+                             "not {}".format(max_bytes))
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.access_update_interval = access_update_interval
+        self.timeout = timeout
+        self.hits, self.misses, self.evictions = 0, 0, 0
+
+        self._lock = threading.RLock()
+        self._connection, self._pid = None, None
+        self._connect()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_lock"], state["_connection"], state["_pid"] = None, None, None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    @property
+    def connection(self):
+        """当前进程的数据库连接，在进程中第一次访问时建立。"""
+        return self._connect()
+
+    def _connect(self):
+        """若当前进程尚未建立数据库连接（或连接继承自父进程），建立新的连接。"""
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(
+                self.path, timeout=self.timeout, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA mmap_size={}".format(2**28))
+            with connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS cache (" +
+                    "key TEXT PRIMARY KEY, value BLOB NOT NULL, " +
+                    "size INTEGER NOT NULL, last_access INTEGER NOT NULL)")
+                connection.execute(
+                    "CREATE INDEX IF NOT EXISTS cache_last_access " +
+                    "ON cache (last_access)")
+
+                # 条目数目与总字节数由触发器维护，避免每次写入都扫描全表
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS cache_stats (" +
+                    "id INTEGER PRIMARY KEY CHECK (id = 0), " +
+                    "n_entries INTEGER NOT NULL, n_bytes INTEGER NOT NULL)")
+                connection.execute(
+                    "INSERT OR IGNORE INTO cache_stats SELECT 0, COUNT(*), " +
+                    "COALESCE(SUM(size), 0) FROM cache")
+                connection.execute(
+                    "CREATE TRIGGER IF NOT EXISTS cache_insert AFTER INSERT " +
+                    "ON cache BEGIN UPDATE cache_stats SET n_entries = " +
+                    "n_entries + 1, n_bytes = n_bytes + NEW.size; END")
+                connection.execute(
+                    "CREATE TRIGGER IF NOT EXISTS cache_delete AFTER DELETE " +
+                    "ON cache BEGIN UPDATE cache_stats SET n_entries = " +
+                    "n_entries - 1, n_bytes = n_bytes - OLD.size; END")
+            self._connection, self._pid = connection, os.getpid()
+        return self._connection
+
+    def _get_stats(self):
+        """返回(条目数目, 总字节数)。"""
+        return self.connection.execute(
+            "SELECT n_entries, n_bytes FROM cache_stats").fetchone()
+
+    def __len__(self):
+        with self._lock:
+            return self._get_stats()[0]
+
+    def __contains__(self, key):
+        with self._lock:
+            return self.connection.execute(
+                "SELECT 1 FROM cache WHERE key = ?", (key, )).fetchone() \
+                is not None
+
+    @property
+    def n_bytes(self):
+        """缓存中所有条目序列化之后的总字节数。"""
+        with self._lock:
+            return self._get_stats()[1]
+
+    def get(self, key, default=None):
+        """查询key对应的缓存值，命中时更新该条目的访问时间。"""
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT value, last_access FROM cache WHERE key = ?",
+                (key, )).fetchone()
+            if row is None:
+                self.misses += 1
+                return default
+
+            now = time.time_ns()
+            if now - row[1] > self.access_update_interval * 1e9:
+                with self.connection:
+                    self.connection.execute(
+                        "UPDATE cache SET last_access = ? WHERE key = ?",
+                        (now, key))
+            self.hits += 1
+        return pickle.loads(row[0])
+
+    def put(self, key, value):
+        """写入{key: value}，必要时按LRU顺序淘汰旧的条目。"""
+        value = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock, self.connection:
+            self.connection.execute("DELETE FROM cache WHERE key = ?",
+                                    (key, ))
+            self.connection.execute(
+                "INSERT INTO cache VALUES (?, ?, ?, ?)",
+                (key, value, len(value), time.time_ns()))
+            self._evict()
+
+    def _evict(self):
+        """淘汰最近最少使用的条目，直至满足容量约束。"""
+        n_entries, n_bytes = self._get_stats()
+        n_evict_entries = 0
+        if self.max_entries is not None:
+            n_evict_entries = max(n_entries - self.max_entries, 0)
+        n_evict_bytes = 0
+        if self.max_bytes is not None:
+            n_evict_bytes = max(n_bytes - self.max_bytes, 0)
+        if n_evict_entries == 0 and n_evict_bytes == 0:
+            return
+
+        keys = []
+        for key, size in self.connection.execute(
+                "SELECT key, size FROM cache ORDER BY last_access"):
+            if len(keys) >= n_evict_entries and n_evict_bytes <= 0:
+                break
+            keys.append((key, ))
+            n_evict_bytes -= size
+        self.connection.executemany("DELETE FROM cache WHERE key = ?", keys)
+        self.evictions += len(keys)
+
+    def clear(self):
+        """清空缓存的全部条目，计数器保持不变。"""
+        with self._lock, self.connection:
+            self.connection.execute("DELETE FROM cache")
+
+    def stats(self):
+        """返回缓存的统计信息。"""
+        n_queries = self.hits + self.misses
+        with self._lock:
+            n_entries, n_bytes = self._get_stats()
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / n_queries if n_queries else 0.0,
+                "entries": n_entries,
+                "bytes": n_bytes}
+
+    def close(self):
+        """关闭当前进程的数据库连接，之后的访问会重新建立连接。"""
+        with self._lock:
+            if self._connection is not None and self._pid == os.getpid():
+                self._connection.close()
+            self._connection, self._pid = None, None
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Created on Tue Jan 26 10:47:19 2021
+# Author:     zhuoyin94 <zhuoyin94@163.com>
+# Github:     https://github.com/MichaelYin1994
+
+"""
+本模块(textrank.corpus_store)提供了可持久化的分词语料SegmentedCorpus类。语料的
+pkuseg切分结果以词表文件与扁平的整数数组保存在磁盘上，之后可以通过
+np.load(mmap_mode="r")直接载入，调整停用词、词性过滤与PageRank等参数时无需重新
+分词。
+"""
+
+import os
+import json
+from array import array
+
+import numpy as np
+
+from vocabulary import Vocabulary, EncodedDocument
+
+# 磁盘上的文件名
+METADATA_FILE_NAME = "metadata.json"
+VOCABULARY_FILE_NAME = "vocabulary.json"
+POSTAGS_FILE_NAME = "postags.json"
+ARRAY_NAMES = ["token_ids", "postag_ids", "sentence_offsets",
+               "document_offsets"]
+
+
+class SegmentedCorpus():
+    """以扁平整数数组表示的、未经清洗的语料分词结果。
+
+    第i篇文档的句子为document_offsets[i]:document_offsets[i+1]，第j个句子的词为
+    token_ids[sentence_offsets[j]:sentence_offsets[j+1]]，postag_ids与
+    token_ids一一对应。词表中的词只去除了首尾空白，大小写转换、停用词过滤与词性
+    过滤在get_views中依据分词器的参数以向量化的方式完成。
+
+    @Parameters:
+    ----------
+        vocabulary: {object-like}
+            Vocabulary类型的词表。
+        postags: {list-like}
+            词性id到词性的列表。
+        token_ids, postag_ids, sentence_offsets, document_offsets:
+            {array-like}
+            见上文，可以是np.memmap。
+        metadata: {dict-like}
+            语料的元信息，如分词器的user_vocab与delimiters，以及每篇文档的名称
+            document_names。
+
+    @Raises:
+    ----------
+        ValueError: 数组之间的长度不一致
+    """
+    def __init__(self, vocabulary, postags, token_ids, postag_ids,
+                 sentence_offsets, document_offsets, metadata=None):
+        self.vocabulary = vocabulary
+        self.postags = list(postags)
+        self.token_ids = token_ids
+        self.postag_ids = postag_ids
+        self.sentence_offsets = sentence_offsets
+        self.document_offsets = document_offsets
+        self.metadata = metadata or {}
+
+        if len(token_ids) != len(postag_ids) or \
+                len(sentence_offsets) == 0 or len(document_offsets) == 0 or \
+                sentence_offsets[-1] != len(token_ids) or \
+                document_offsets[-1] != len(sentence_offsets) - 1:
+            raise ValueError("Invalid segmented corpus arrays !")
+
+        # {分词器的清洗参数: 词id与词性id的映射数组}
+        self._filter_arrays = {}
+
+    def __len__(self):
+        return len(self.document_offsets) - 1
+
+    @property
+    def document_names(self):
+        """每篇文档的名称，未指定时为None。"""
+        return self.metadata.get("document_names")
+
+    @classmethod
+    def from_cut_results(cls, cut_results, n_sentences, metadata=None):
+        """由(词列表, 词性列表)的切分结果构建SegmentedCorpus。
+
+        @Parameters:
+        ----------
+            cut_results: {iterable}
+                所有文档的句子的切分结果，按文档顺序依次排列。
+            n_sentences: {list-like}
+                每篇文档的句子数目。
+            metadata: {dict-like}
+                语料的元信息。
+        """
+        vocabulary, postag2index = Vocabulary(), {}
+        get_index, get_postag_index = vocabulary.add, postag2index.setdefault
+
+        token_ids, postag_ids = array("i"), array("i")
+        sentence_offsets = array("q", [0])
+        for word_list, postag_list in cut_results:
+            token_ids.extend([get_index(word.strip()) for word in word_list])
+            postag_ids.extend([get_postag_index(postag, len(postag2index))
+                               for postag in postag_list])
+            sentence_offsets.append(len(token_ids))
+
+        document_offsets = np.concatenate(
+            [[0], np.cumsum(n_sentences, dtype=np.int64)]).astype(np.int64)
+        return cls(vocabulary, list(postag2index),
+                   np.array(token_ids, dtype=np.int32),
+                   np.array(postag_ids, dtype=np.int16),
+                   np.array(sentence_offsets, dtype=np.int64),
+                   document_offsets, metadata)
+
+    def save(self, path):
+        """将语料保存到目录path中：词表与词性表为JSON文件，数组为*.npy文件。"""
+        os.makedirs(path, exist_ok=True)
+        metadata_path = os.path.join(path, METADATA_FILE_NAME)
+        if os.path.exists(metadata_path):
+            os.remove(metadata_path)
+        with open(os.path.join(path, VOCABULARY_FILE_NAME), "w",
+                  encoding="utf-8") as f:
+            json.dump(self.vocabulary.index2word, f, ensure_ascii=False)
+        with open(os.path.join(path, POSTAGS_FILE_NAME), "w",
+                  encoding="utf-8") as f:
+            json.dump(self.postags, f, ensure_ascii=False)
+        for name in ARRAY_NAMES:
+            np.save(os.path.join(path, name + ".npy"), getattr(self, name))
+
+        # 元信息最后写入，其存在即表示语料已完整保存
+        with open(metadata_path, "w", encoding="utf-8") as f:
+            json.dump(self.metadata, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path, mmap_mode="r"):
+        """从目录path中载入语料，数组默认以只读的内存映射方式载入。
+
+        @Raises:
+        ----------
+            FileNotFoundError: path中没有完整保存的语料
+        """
+        metadata_path = os.path.join(path, METADATA_FILE_NAME)
+        if not os.path.exists(metadata_path):
+            raise FileNotFoundError(
+                "Segmented corpus not found in {} !".format(path))
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+        with open(os.path.join(path, VOCABULARY_FILE_NAME), "r",
+                  encoding="utf-8") as f:
+            vocabulary = Vocabulary(json.load(f))
+        with open(os.path.join(path, POSTAGS_FILE_NAME), "r",
+                  encoding="utf-8") as f:
+            postags = json.load(f)
+        arrays = {name: np.load(os.path.join(path, name + ".npy"),
+                                mmap_mode=mmap_mode)
+                  for name in ARRAY_NAMES}
+        return cls(vocabulary, postags, metadata=metadata, **arrays)
+
+    def get_document(self, index):
+        """返回第index篇文档未经清洗的EncodedDocument，以及对应的词性id数组。"""
+        if not 0 <= index < len(self):
+            raise IndexError("document index out of range")
+        sentence_offsets = np.asarray(self.sentence_offsets[
+            self.document_offsets[index]:self.document_offsets[index+1]+1])
+        begin, end = sentence_offsets[0], sentence_offsets[-1]
+        return EncodedDocument(self.token_ids[begin:end],
+                               sentence_offsets - begin), \
+            self.postag_ids[begin:end]
+
+    def _get_filter_arrays(self, tokenizer):
+        """依据分词器的清洗参数，计算词id与词性id上的映射数组。
+
+        返回(lower_ids, is_empty, is_stop_word, is_allow_postag)：lower_ids为词id到
+        其小写形式的词id的映射（小写形式不在词表中时被加入词表），其余为以词id或
+        词性id为下标的bool数组。结果按参数缓存，每种参数只需计算一次。
+        """
+        key = (tokenizer.stop_words, tokenizer.allow_word_tags)
+        if key not in self._filter_arrays:
+            vocabulary = self.vocabulary
+            lower_ids = np.array(
+                [vocabulary.add(word.lower())
+                 for word in list(vocabulary.index2word)], dtype=np.int64)
+
+            stop_words = tokenizer.stop_words
+            index2word = vocabulary.index2word
+            is_empty = np.array([not word for word in index2word], dtype=bool)
+            is_stop_word = np.array([word in stop_words
+                                     for word in index2word], dtype=bool)
+            is_allow_postag = np.array(
+                [postag in tokenizer.allow_word_tags
+                 for postag in self.postags], dtype=bool)
+            self._filter_arrays[key] = (lower_ids, is_empty, is_stop_word,
+                                        is_allow_postag)
+        return self._filter_arrays[key]
+
+    def get_views(self, index, tokenizer):
+        """返回第index篇文档各个视图的分词结果，与tokenizer分词的结果一致。
+
+        @Parameters:
+        ----------
+            index: {int-like}
+                文档的下标。
+            tokenizer: {object-like}
+                WordSegmentation类型的分词器，使用其is_lower、停用词与词性过滤的
+                参数；其分句与pkuseg的参数应当与保存语料时一致。
+
+        @Returns:
+        ----------
+            {视图名称: EncodedDocument}的字典，格式同
+            WordSegmentation.segment_paragraph_encoded，词id属于self.vocabulary。
+        """
+        document, postag_ids = self.get_document(index)
+        lower_ids, is_empty, is_stop_word, is_allow_postag = \
+            self._get_filter_arrays(tokenizer)
+
+        token_ids = np.asarray(document.token_ids, dtype=np.int64)
+        token_ids_lower = lower_ids[token_ids]
+        is_keep = ~is_empty[token_ids]
+        is_keep_lower = is_keep & ~is_stop_word[token_ids_lower]
+        is_allow = is_allow_postag[np.asarray(postag_ids, dtype=np.int64)]
+
+        # no_filter视图依据分词器自身的参数进行清洗
+        token_ids_no_filter = token_ids_lower if tokenizer.is_lower \
+            else token_ids
+        is_keep_no_filter = is_keep.copy()
+        if tokenizer.is_use_stop_words:
+            is_keep_no_filter &= ~is_stop_word[token_ids_no_filter]
+        if tokenizer.is_use_word_tags_filter:
+            is_keep_no_filter &= is_allow
+
+        views = {}
+        for name, view_token_ids, view_is_keep in [
+                ("no_filter", token_ids_no_filter, is_keep_no_filter),
+                ("no_stop_words", token_ids_lower, is_keep_lower),
+                ("all_filters", token_ids_lower, is_keep_lower & is_allow)]:
+            n_keep = np.concatenate([[0], np.cumsum(view_is_keep)])
+            views[name] = EncodedDocument(
+                view_token_ids[view_is_keep].astype(np.int32),
+                n_keep[document.sentence_offsets])
+        return views
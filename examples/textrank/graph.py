@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Created on Mon Jan 11 09:38:52 2021
+# Author:     zhuoyin94 <zhuoyin94@163.com>
+# Github:     https://github.com/MichaelYin1994
+
+"""
+本模块(textrank.graph)提供了可增量构建的词共现图CooccurrenceGraph类。
+"""
+
+from array import array
+
+import numpy as np
+from scipy import sparse
+
+from utils import (EDGE_WEIGHTS, build_cooccurrence_matrix, compute_pagerank,
+                   get_top_k_index)
+from vocabulary import EncodedDocument
+
+
+class CooccurrenceGraph():
+    """可增量构建的词共现图。
+
+    句子被逐个加入图中：vertex words决定图的结点，edge words依据滑窗内的共现关系
+    决定图的边，与compute_word_scores中vertex_source与edge_source的含义一致。
+    edge words的词id先写入定长的缓冲区，缓冲区满时由build_cooccurrence_matrix
+    一次性生成其中的全部边，以COO三元组的形式追加到待合并的边中，代价只与新边的
+    数目有关；待合并的边多于已合并的邻接矩阵的非零元时，二者才被合并为新的稀疏
+    邻接矩阵，因此合并的代价均摊到每条新边上为O(1)，内存占用不超过不同的边的数目
+    的常数倍，而与文本的总长度无关。
+
+    get_adjacent_matrix需要返回完整的结点邻接矩阵，图发生变化之后的第一次调用
+    需要O(V + E)的时间合并待合并的边并抽取结点之间的子矩阵，与一次PageRank迭代
+    的代价同阶；图未发生变化时直接返回上一次的结果。
+
+    @Parameters:
+    ----------
+        window_size: {int-like}
+            滑窗尺寸的大小。
+        buffer_size: {int-like}
+            词id缓冲区的最大长度，缓冲区满时合并进邻接矩阵。
+        edge_weight: {str-like}
+            边的权重，可选"binary"、"count"与"distance"，见EDGE_WEIGHTS。
+
+    @Attributes:
+    ----------
+        self.word2index:
+            {词: id}的索引表，包含所有出现过的词。
+        self.index2word:
+            id到词的列表。
+        self.vertex_ids:
+            结点的词id，按词首次作为结点出现的顺序排列。
+        self.adjacent_mat:
+            所有词之间的（带权）稀疏邻接矩阵（不含缓冲区与待合并的边）。
+        self.vertex_scores:
+            最近一次计算得到的结点PageRank分数，与self.vertex_ids一一对应。
+    """
+    def __init__(self, window_size=2, buffer_size=2**20,
+                 edge_weight="binary"):
+        if edge_weight not in EDGE_WEIGHTS:
+            raise ValueError("Invalid edge_weight: {}".format(edge_weight))
+        self.window_size = window_size
+        self.buffer_size = buffer_size
+        self.edge_weight = edge_weight
+
+        self.word2index = {}
+        self.index2word = []
+        self.vertex_ids = []
+        self.is_vertex = bytearray()
+        self.adjacent_mat = sparse.csr_matrix((0, 0))
+        self.vertex_scores = None
+
+        # 尚未合并进邻接矩阵的句子的词id与句子偏移量
+        self._token_ids, self._sentence_offsets = array("q"), array("q", [0])
+
+        # 已由缓冲区生成、尚未合并进邻接矩阵的边：(行, 列, 权重)三元组的列表
+        self._edge_chunks, self._n_pending_edges = [], 0
+
+        # 上一次get_adjacent_matrix的结果，以及其对应的邻接矩阵与结点数目
+        self._vertex_mat_cache = None
+
+    def __len__(self):
+        return len(self.vertex_ids)
+
+    def _get_word_index(self, word):
+        """返回word的id，新词被追加到词表的末尾。"""
+        index = self.word2index.get(word)
+        if index is None:
+            index = len(self.index2word)
+            self.word2index[word] = index
+            self.index2word.append(word)
+            self.is_vertex.append(0)
+        return index
+
+    def add_vertices(self, word_list):
+        """将word_list中的词加入图的结点集合。"""
+        for word in word_list:
+            index = self._get_word_index(word)
+            if not self.is_vertex[index]:
+                self.is_vertex[index] = 1
+                self.vertex_ids.append(index)
+
+    def add_edges(self, word_list):
+        """依据word_list中词的共现关系，向图中加入边。空列表被忽略。"""
+        if not word_list:
+            return
+        self._token_ids.extend(
+            [self._get_word_index(word) for word in word_list])
+        self._sentence_offsets.append(len(self._token_ids))
+
+        if len(self._token_ids) >= self.buffer_size:
+            self._flush()
+
+    def add_sentence(self, vertex_words, edge_words):
+        """加入一个句子，vertex_words与edge_words分别用于构建结点与边。"""
+        self.add_vertices(vertex_words)
+        self.add_edges(edge_words)
+
+    def _flush(self, is_merge=False):
+        """由缓冲区中的词id生成边，追加到待合并的边中。
+
+        is_merge为True，或者待合并的边多于已合并的邻接矩阵的非零元时，将待合并的
+        边合并进邻接矩阵。
+        """
+        if self._token_ids:
+            document = EncodedDocument(
+                np.frombuffer(self._token_ids, dtype=np.int64),
+                np.frombuffer(self._sentence_offsets, dtype=np.int64))
+            new_mat = build_cooccurrence_matrix(
+                document, len(self.index2word), self.window_size,
+                edge_weight=self.edge_weight).tocoo()
+            self._edge_chunks.append((new_mat.row, new_mat.col, new_mat.data))
+            self._n_pending_edges += new_mat.nnz
+            self._token_ids = array("q")
+            self._sentence_offsets = array("q", [0])
+
+        if is_merge or self._n_pending_edges > self.adjacent_mat.nnz:
+            self._merge()
+
+    def _merge(self):
+        """将待合并的边合并进邻接矩阵，重复的边的权重被累加。"""
+        n_words = len(self.index2word)
+        adjacent_mat = self.adjacent_mat
+        if not self._edge_chunks:
+            if adjacent_mat.shape[0] == n_words:
+                return
+
+            # 邻接矩阵随词表扩张：新增的行为空行
+            indptr = np.concatenate([
+                adjacent_mat.indptr,
+                np.full(n_words - adjacent_mat.shape[0],
+                        adjacent_mat.indptr[-1])])
+            self.adjacent_mat = sparse.csr_matrix(
+                (adjacent_mat.data, adjacent_mat.indices, indptr),
+                shape=(n_words, n_words))
+            return
+
+        adjacent_coo = adjacent_mat.tocoo()
+        rows, cols, weights = zip(
+            (adjacent_coo.row, adjacent_coo.col, adjacent_coo.data),
+            *self._edge_chunks)
+        adjacent_mat = sparse.csr_matrix(
+            (np.concatenate(weights),
+             (np.concatenate(rows), np.concatenate(cols))),
+            shape=(n_words, n_words))
+        if self.edge_weight == "binary":
+            adjacent_mat.data[:] = 1
+        self.adjacent_mat = adjacent_mat
+        self._edge_chunks, self._n_pending_edges = [], 0
+
+    def get_adjacent_matrix(self):
+        """返回结点之间的邻接矩阵。
+
+        图发生变化之后的第一次调用需要合并全部待合并的边并抽取结点之间的子矩阵，
+        代价为O(V + E)；图未发生变化时直接返回上一次的结果。
+
+        @Returns:
+        ----------
+            (adjacent_mat, index2word)二元组。adjacent_mat为结点之间的
+            scipy.sparse.csr_matrix，第i个结点为第i个首次作为结点出现的词；
+            index2word为{结点id: 词}的索引表。
+        """
+        self._flush(is_merge=True)
+        cache = self._vertex_mat_cache
+        if cache is not None and cache[0] is self.adjacent_mat and \
+                cache[1] == len(self.vertex_ids):
+            return cache[2], cache[3]
+
+        vertex_ids = np.array(self.vertex_ids, dtype=np.int64)
+        adjacent_mat = self.adjacent_mat[vertex_ids][:, vertex_ids].tocsr()
+        index2word = {index: self.index2word[word_index]
+                      for index, word_index in enumerate(self.vertex_ids)}
+        self._vertex_mat_cache = (self.adjacent_mat, len(self.vertex_ids),
+                                  adjacent_mat, index2word)
+        return adjacent_mat, index2word
+
+    def compute_word_scores(self, pagerank_config=None,
+                            is_return_info=False,
+                            is_warm_start=False,
+                            top_k=None):
+        """计算图中每一个结点的PageRank分数。
+
+        @Parameters:
+        ----------
+            pagerank_config: {dict-like}
+                PageRank算法的参数字典，见compute_pagerank。
+            is_return_info: {bool-like}
+                是否同时返回PageRank迭代的收敛信息。
+            is_warm_start: {bool-like}
+                是否以上一次计算的分数作为幂迭代的初始值。结点的编号在图的增长过程
+                中保持不变，新增结点的初始值为1/N。
+            top_k: {int-like}
+                只返回分数最大的top_k个词，见get_top_k_index。默认为None，即返回
+                全部词；warm start使用的全部结点的分数不受影响。
+
+        @Returns:
+        ----------
+            按分数降序排列的[词, 分数]的列表，格式与compute_word_scores相同。
+        """
+        if not self.vertex_ids:
+            raise ValueError("The graph must not be empty !")
+        if not pagerank_config:
+            pagerank_config = {"alpha": 0.85}
+
+        adjacent_mat, index2word = self.get_adjacent_matrix()
+        n_vertex = len(self.vertex_ids)
+
+        initial_scores = None
+        if is_warm_start and self.vertex_scores is not None:
+            initial_scores = np.concatenate([
+                self.vertex_scores,
+                np.repeat(1.0 / n_vertex, n_vertex - len(self.vertex_scores))])
+        vertex_scores, pagerank_info = compute_pagerank(
+            adjacent_mat, initial_scores=initial_scores, **pagerank_config)
+        self.vertex_scores = vertex_scores
+
+        sorted_words = []
+        for index in get_top_k_index(vertex_scores, top_k).tolist():
+            sorted_words.append([index2word[index],
+                                 float(vertex_scores[index])])
+        if is_return_info:
+            return sorted_words, pagerank_info
+        return sorted_words
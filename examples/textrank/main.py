@@ -11,9 +11,18 @@
 """
 
 import os
-import numpy as np
+import sys
+import json
+import queue
 import pickle
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 
+from cache import SQLiteCache
+from corpus_store import SegmentedCorpus
 from segmentation import WordSegmentation
 from textrank4keywords import TextRank4Keywords
 
@@ -31,56 +40,370 @@ def load_pkl(path=".//data//", filename=None):
     return data
 
 
-def load_stop_words(path=".//stopwords//"):
-    """从路径path中导入停用词表"""
-    file_names = ["baidu_stopwords.txt", "cn_stopwords.txt",
-                  "hit_stopwords.txt", "scu_stopwords.txt"]
+STOP_WORDS_FILE_NAMES = ["baidu_stopwords.txt", "cn_stopwords.txt",
+                         "hit_stopwords.txt", "scu_stopwords.txt"]
 
-    stop_words = []
-    for name in file_names:
+
+def read_stop_words(path=".//stopwords//"):
+    """读取路径path中的全部停用词表，返回去除空白与重复之后的frozenset"""
+    stop_words = set()
+    for name in STOP_WORDS_FILE_NAMES:
         try:
-            with open(path+name, "r") as f:
-                stop_words.extend(f.readlines())
-        except:
-            raise FileNotFoundError("File {} not found !".format(name))
+            with open(os.path.join(path, name), "r") as f:
+                stop_words.update(line.strip() for line in f)
+        except FileNotFoundError as err:
+            raise FileNotFoundError(
+                "File {} not found !".format(name)) from err
+    stop_words.discard("")
+    return frozenset(stop_words)
+
+
+def build_stop_words_index(index_path, path=".//stopwords//"):
+    """读取路径path中的全部停用词表，去重之后序列化为索引文件index_path
 
-    # 滤除重复的停用词
-    stop_words = list(set(stop_words))
+    索引文件为pickle序列化的frozenset，载入时只需一次文件读取，无需再对停用词
+    进行去重。index_path应当位于调用者指定的缓存目录中，而非停用词表所在的源
+    目录。返回停用词的frozenset。
+    """
+    stop_words = read_stop_words(path)
+
+    # 先写入临时文件再替换，避免并发读取到不完整的索引
+    index_dir = os.path.dirname(index_path)
+    if index_dir:
+        os.makedirs(index_dir, exist_ok=True)
+    tmp_path = "{}.{}.tmp".format(index_path, os.getpid())
+    with open(tmp_path, "wb") as f:
+        pickle.dump(stop_words, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, index_path)
     return stop_words
 
 
-def load_corpus(path=".//data//"):
-    """从路径path中导入需要抽取关键词的语料"""
-    path = ".//data//"
-    file_names = [name for name in os.listdir(path) if name.endswith(".txt")]
+def load_stop_words(path=".//stopwords//", index_path=None):
+    """从路径path中导入停用词表
+
+    index_path为None时直接读取停用词表；否则优先读取build_stop_words_index在
+    index_path生成的索引文件，索引不存在或早于任何一个停用词表文件时，重新构建
+    索引。
+    """
+    if index_path is None:
+        return list(read_stop_words(path))
+
+    try:
+        index_mtime = os.path.getmtime(index_path)
+        is_stale = any(
+            os.path.getmtime(os.path.join(path, name)) > index_mtime
+            for name in STOP_WORDS_FILE_NAMES)
+    except FileNotFoundError:
+        is_stale = True
+
+    if is_stale:
+        try:
+            return list(build_stop_words_index(index_path, path))
+        except PermissionError:
+            return load_stop_words(path)
+    with open(index_path, "rb") as f:
+        return list(pickle.load(f))
+
+
+def iter_file_chunks(file_name, chunk_size=2**20):
+    """按块读取文件file_name，每次返回不超过chunk_size个字符的文本块"""
+    with open(file_name, "r") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def load_corpus(path=".//data//", is_stream=False):
+    """从路径path中导入需要抽取关键词的语料
+
+    is_stream为True时不读取文件内容，而是返回每个文件的文本块迭代器，供
+    TextRank4Keywords.fit_predict_stream流式处理。
+    """
+    file_names = sorted(
+        [name for name in os.listdir(path) if name.endswith(".txt")])
 
     corpus = []
     for name in file_names:
-        with open(path+name, "r") as f:
-            tmp = f.readlines()
-            tmp = "".join(tmp)
-            corpus.append(tmp)
+        if is_stream:
+            corpus.append(iter_file_chunks(os.path.join(path, name)))
+        else:
+            with open(os.path.join(path, name), "r") as f:
+                corpus.append(f.read())
     return corpus
 
 
-def main(top_k=30):
-    test_corpus = load_corpus()
-    user_stop_words = load_stop_words()
+def list_corpus_files(path=".//data//"):
+    """返回路径path中全部*.txt文件的文件名（按文件名排序），不读取文件内容"""
+    with os.scandir(path) as entries:
+        return sorted(entry.name for entry in entries
+                      if entry.name.endswith(".txt") and entry.is_file())
+
+
+def read_text(file_name):
+    """读取文本文件file_name的全部内容"""
+    with open(file_name, "r") as f:
+        return f.read()
+
+
+# 流水线各阶段之间传递的结束标记
+_STOP = object()
+
+
+def _put(item_queue, item, stop_event):
+    """向有界队列item_queue放入item；队列满时阻塞，直至stop_event被置位"""
+    while not stop_event.is_set():
+        try:
+            item_queue.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _read_corpus(path, file_names, reader_queue, stop_event, n_readers):
+    """读取阶段：线程池并行读取文件，按文件顺序将(文件名, 文本)放入reader_queue
+
+    同时在读的文件不超过2 * n_readers个。读取出错时，异常对象代替文本被放入队列，
+    由消费者重新抛出。
+    """
+    try:
+        with ThreadPoolExecutor(max_workers=n_readers) as executor:
+            pending = deque()
+            for name in file_names:
+                pending.append((name, executor.submit(
+                    read_text, os.path.join(path, name))))
+                if len(pending) >= 2 * n_readers:
+                    name, future = pending.popleft()
+                    if not _put(reader_queue, (name, future.result()),
+                                stop_event):
+                        return
+            while pending:
+                name, future = pending.popleft()
+                if not _put(reader_queue, (name, future.result()),
+                            stop_event):
+                    return
+    except Exception as err:
+        _put(reader_queue, (None, err), stop_event)
+        return
+    _put(reader_queue, _STOP, stop_event)
 
+
+def _write_results(output_file, writer_queue, stop_event, errors):
+    """写入阶段：将writer_queue中的结果逐行写为JSON，每行写完即刷新
+
+    写入出错时记录异常并置位stop_event，之后的结果被丢弃，直至收到结束标记。
+    """
+    while True:
+        item = writer_queue.get()
+        if item is _STOP:
+            return
+        if errors:
+            continue
+        try:
+            output_file.write(json.dumps(item, ensure_ascii=False) + "\n")
+            output_file.flush()
+        except Exception as err:
+            errors.append(err)
+            stop_event.set()
+
+
+def run_corpus_pipeline(textrank, output_file, path=".//data//",
+                        top_k=30, n_jobs=1, n_readers=4, queue_size=64,
+                        **fit_predict_kwargs):
+    """以流水线的方式抽取路径path中每一篇语料的关键词，结果以JSONL格式流式写出
+
+    流水线分为三个阶段：读取线程池读取文件，分词与PageRank计算由
+    TextRank4Keywords.fit_predict_iter完成（n_jobs大于1时为进程池），写入线程
+    将结果逐行写入output_file。阶段之间为长度不超过queue_size的有界队列：下游
+    阶段处理不及时，上游阶段即被阻塞，因此内存占用与语料数目无关，且每一篇语料
+    的结果在计算完成后立即写出。
+
+    @Parameters:
+    ----------
+        textrank: {object-like}
+            TextRank4Keywords类型的关键词抽取器。
+        output_file: {file-like}
+            结果的输出文件，每一行为{"file": 文件名, "key_words": 关键词列表}
+            的JSON对象，顺序与文件名的顺序一致。
+        path: {str-like}
+            语料所在的路径，其中每一个*.txt文件为一篇语料。
+        top_k: {int-like}
+            每篇语料输出的关键词数目。
+        n_jobs: {int-like}
+            关键词抽取的进程数，见TextRank4Keywords.fit_predict_batch。
+        n_readers: {int-like}
+            读取文件的线程数。
+        queue_size: {int-like}
+            阶段之间的队列长度，也是同时在处理中的语料数目的上限。
+        **fit_predict_kwargs:
+            传递给TextRank4Keywords.fit_predict_iter的其他参数。
+
+    @Returns:
+    ----------
+        写出的结果的数目。
+    """
+    file_names = list_corpus_files(path)
+    reader_queue = queue.Queue(maxsize=queue_size)
+    writer_queue = queue.Queue(maxsize=queue_size)
+    stop_event = threading.Event()
+    write_errors = []
+
+    reader = threading.Thread(
+        target=_read_corpus, daemon=True,
+        args=(path, file_names, reader_queue, stop_event, n_readers))
+    writer = threading.Thread(
+        target=_write_results, daemon=True,
+        args=(output_file, writer_queue, stop_event, write_errors))
+    reader.start()
+    writer.start()
+
+    # 已读入但尚未写出的语料的文件名，与fit_predict_iter的结果顺序一致
+    pending_names = deque()
+
+    def iter_texts():
+        while True:
+            item = reader_queue.get()
+            if item is _STOP:
+                return
+            name, text = item
+            if isinstance(text, Exception):
+                raise text
+            pending_names.append(name)
+            yield text
+
+    n_results = 0
+    try:
+        for key_words in textrank.fit_predict_iter(
+                iter_texts(), n_jobs=n_jobs, top_k=top_k,
+                max_pending=queue_size, **fit_predict_kwargs):
+            if not _put(writer_queue, {"file": pending_names.popleft(),
+                                       "key_words": key_words},
+                        stop_event):
+                break
+            n_results += 1
+    except BaseException:
+        stop_event.set()
+        raise
+    finally:
+        writer_queue.put(_STOP)
+        writer.join()
+    if write_errors:
+        raise write_errors[0]
+    return n_results
+
+
+def get_corpus_file_stats(path, file_names):
+    """返回路径path中每个文件的[文件名, 字节数, 修改时间(纳秒)]列表"""
+    file_stats = []
+    for name in file_names:
+        stat = os.stat(os.path.join(path, name))
+        file_stats.append([name, stat.st_size, stat.st_mtime_ns])
+    return file_stats
+
+
+def load_segmented_corpus(tokenizer, corpus_path=".//data//",
+                          store_path=".//segmented_data//"):
+    """载入store_path中保存的分词语料；不存在或过期时对corpus_path中的语料分词并
+    保存
+
+    语料的分词结果只与语料文件以及分词器的user_vocab与delimiters有关。元信息中
+    保存了每个语料文件的文件名、字节数与修改时间，与corpus_path中当前的文件列表
+    不一致（文件被增删或修改），或者user_vocab与delimiters与保存时不一致时重新
+    分词；停用词、词性过滤等参数可以任意调整而无需重新分词。
+    """
+    file_names = list_corpus_files(corpus_path)
+    file_stats = get_corpus_file_stats(corpus_path, file_names)
+    try:
+        corpus = SegmentedCorpus.load(store_path)
+        if corpus.metadata.get("source_files") == file_stats and \
+                corpus.metadata.get("user_vocab") == \
+                tokenizer.default_user_vocab and \
+                corpus.metadata.get("delimiters") == \
+                sorted(tokenizer.default_delimiters):
+            return corpus
+    except FileNotFoundError:
+        pass
+
+    # 文件状态在读取之前获取，读取期间被修改的文件在下一次载入时被重新分词
+    corpus = tokenizer.export_corpus(
+        [read_text(os.path.join(corpus_path, name)) for name in file_names],
+        document_names=file_names)
+    corpus.metadata["source_files"] = file_stats
+    corpus.save(store_path)
+    return corpus
+
+
+def main(top_k=30, n_jobs=1, is_stream=False, cache_path=None,
+         corpus_path=".//data//", sentence_cache_path=None,
+         output_path=None, n_readers=4, queue_size=64, is_early_stop=False,
+         max_time=None, store_path=None, stop_words_index_path=None):
+    """抽取corpus_path中每一篇语料的前top_k个关键词，以JSONL格式写入output_path
+
+    output_path为None时结果被写到标准输出。指定store_path时，语料的分词结果被
+    保存在store_path中，之后的运行直接载入分词结果而无需再次分词，见
+    load_segmented_corpus。is_early_stop为True时，PageRank迭代在前top_k个
+    关键词保持稳定之后即停止；指定max_time时，PageRank迭代的耗时预算为
+    max_time秒。max_time的作用范围是一次PageRank求解：串行处理与store_path
+    模式下多篇语料在同一个分块对角矩阵上一同迭代（见compute_pagerank_batch），
+    此时max_time是整批语料共享的预算，而非每篇语料各自的预算；多进程处理时每篇
+    语料单独求解，max_time为每篇语料的预算。指定stop_words_index_path时，
+    停用词表被序列化为该路径下的索引文件以加速之后的载入，见load_stop_words；
+    默认直接读取停用词表，不会向停用词表所在的目录写入任何文件。
+    """
+    pagerank_config = {"alpha": 0.85}
+    if is_early_stop:
+        pagerank_config["top_k"] = top_k
+    if max_time is not None:
+        pagerank_config["max_time"] = max_time
+    user_stop_words = load_stop_words(index_path=stop_words_index_path)
+
+    # 指定sentence_cache_path时，所有工作进程共享同一个分词结果缓存
+    sentence_cache = SQLiteCache(sentence_cache_path, max_entries=10**6) \
+        if sentence_cache_path else None
     tokenizer = WordSegmentation(stop_words_vocab=user_stop_words,
                                  delimiters=["。", "，"],
-                                 user_vocab=USER_VOCAB)
-    textrank = TextRank4Keywords(tokenizer=tokenizer)
-
-    key_words = []
-    for text in test_corpus:
-        key_words.append(textrank.fit_predict(
-            text, vertex_source="no_stop_words")[:top_k])
-
-    for item in key_words:
-        print("\n-----------------")
-        print(item)
-        print("-----------------")
+                                 user_vocab=USER_VOCAB,
+                                 sentence_cache=sentence_cache)
+
+    # 指定cache_path时，未改变的语料直接复用上一次运行的抽取结果
+    result_cache = SQLiteCache(cache_path) if cache_path else None
+    textrank = TextRank4Keywords(tokenizer=tokenizer,
+                                 result_cache=result_cache)
+
+    output_file = open(output_path, "w") if output_path else sys.stdout
+    try:
+        if store_path:
+            corpus = load_segmented_corpus(tokenizer, corpus_path, store_path)
+            for name, key_words in zip(
+                    corpus.document_names, textrank.fit_predict_corpus(
+                        corpus, top_k=top_k, vertex_source="no_stop_words",
+                        pagerank_config=pagerank_config)):
+                output_file.write(json.dumps(
+                    {"file": name, "key_words": key_words},
+                    ensure_ascii=False) + "\n")
+                output_file.flush()
+        elif is_stream:
+            # 流式处理：逐个文件按块读取，每篇语料的结果计算完成后立即写出
+            for name in list_corpus_files(corpus_path):
+                key_words = textrank.fit_predict_stream(
+                    iter_file_chunks(os.path.join(corpus_path, name)),
+                    vertex_source="no_stop_words",
+                    pagerank_config=pagerank_config, top_k=top_k)
+                output_file.write(json.dumps(
+                    {"file": name, "key_words": key_words},
+                    ensure_ascii=False) + "\n")
+                output_file.flush()
+        else:
+            run_corpus_pipeline(textrank, output_file, path=corpus_path,
+                                top_k=top_k, n_jobs=n_jobs,
+                                n_readers=n_readers, queue_size=queue_size,
+                                vertex_source="no_stop_words",
+                                pagerank_config=pagerank_config)
+    finally:
+        if output_path:
+            output_file.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Created on Mon Jan 18 10:12:37 2021
+# Author:     zhuoyin94 <zhuoyin94@163.com>
+# Github:     https://github.com/MichaelYin1994
+
+"""
+本模块(textrank.profiling)提供了记录关键词抽取流水线各阶段耗时与计数的
+StageProfiler类。
+"""
+
+import time
+from contextlib import contextmanager
+
+
+class StageProfiler():
+    """记录流水线各阶段（stage）的耗时与计数（counter），并转发给回调函数。
+
+    WordSegmentation与TextRank4Keywords在未指定profiler时不做任何记录，只在每个
+    阶段的边界进行一次None判断，因此关闭时的额外开销可以忽略。
+
+    @Parameters:
+    ----------
+        callbacks: {list-like}
+            回调函数的列表。每记录一次耗时或计数，以事件字典调用每一个回调函数，如：
+            {'type': 'time', 'name': 'pagerank', 'value': 0.0012}
+            {'type': 'count', 'name': 'vertices', 'value': 153}
+            可用于将指标转发给外部的监控系统。
+
+    @Attributes:
+    ----------
+        self.timings:
+            {阶段名称: 累计耗时（秒）}的字典。
+        self.calls:
+            {阶段名称: 调用次数}的字典。
+        self.counters:
+            {计数名称: 累计值}的字典。
+    """
+    def __init__(self, callbacks=None):
+        self.callbacks = list(callbacks or [])
+        self.timings, self.calls, self.counters = {}, {}, {}
+
+    def add_callback(self, callback):
+        """添加一个回调函数。"""
+        self.callbacks.append(callback)
+
+    def _emit(self, event_type, name, value):
+        for callback in self.callbacks:
+            callback({"type": event_type, "name": name, "value": value})
+
+    def add_time(self, name, elapsed):
+        """为阶段name累计一次耗时elapsed（秒）。"""
+        self.timings[name] = self.timings.get(name, 0.0) + elapsed
+        self.calls[name] = self.calls.get(name, 0) + 1
+        self._emit("time", name, elapsed)
+
+    def add_count(self, name, value=1):
+        """为计数name累加value。"""
+        self.counters[name] = self.counters.get(name, 0) + value
+        self._emit("count", name, value)
+
+    @contextmanager
+    def stage(self, name):
+        """以with语句记录代码块的耗时，如：with profiler.stage("pagerank"): ..."""
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def report(self):
+        """返回{"stages": {阶段名称: {"time", "calls"}}, "counts": {...}}的字典。"""
+        return {"stages": {name: {"time": self.timings[name],
+                                  "calls": self.calls[name]}
+                           for name in self.timings},
+                "counts": dict(self.counters)}
+
+    def reset(self):
+        """清空全部记录，回调函数保持不变。"""
+        self.timings, self.calls, self.counters = {}, {}, {}
@@ -10,16 +10,137 @@
 本模块(textrank.segmentation)提供了用于中文分词的WordSegmentation类。
 """
 
-import pkuseg
+import os
+import re
+import time
+import tempfile
+import itertools
+import threading
 import unicodedata
+from array import array
+
+import numpy as np
+
+from cache import LRUCache
+from corpus_store import SegmentedCorpus
+from vocabulary import EncodedDocument
 
 SENTENCE_DELIMITERS = ["?", "!", ";", "？", "、", ",", ":",
                        "！", "。", "；", "……", "…", "\n", "\t"]
+DEFAULT_CACHE_MAX_ENTRIES = 100000
+VIEW_NAMES = ["no_filter", "no_stop_words", "all_filters"]
+_EMPTY_SET = frozenset()
 ALLOW_WORD_TAGS = ["an", "i", "j", "l", "n",
                    "nr", "nrfg", "ns", "nt",
                    "nz", "t", "v", "vd", "vn", "eng"]
 # cop = re.compile(u"[^\u4e00-\u9faf^*^a-z^A-Z^0-9]")
 
+# {(用户词表, 是否标注词性): pkuseg模型}，同一进程内配置相同的分词器共享模型
+_PKUSEG_MODELS = {}
+_PKUSEG_MODELS_LOCK = threading.Lock()
+
+
+def get_pkuseg_model(user_vocab=None, postag=True):
+    """返回进程内共享的pkuseg模型，模型在首次被请求时才载入。
+
+    载入pkuseg的分词与词性标注模型需要数秒时间与数百MB内存，因此同一进程内
+    user_vocab与postag相同的WordSegmentation共享同一个模型实例。
+
+    @Parameters:
+    ----------
+        user_vocab: {list-like} or {str-like}
+            用户专业词表，或者pkuseg可以识别的词表文件路径。
+        postag: {bool-like}
+            是否进行词性标注。
+
+    @Returns:
+    ----------
+        pkuseg.pkuseg类型的分词模型。
+    """
+    if user_vocab is None or isinstance(user_vocab, str):
+        vocab_key = user_vocab
+    else:
+        vocab_key = tuple(sorted(set(user_vocab)))
+
+    with _PKUSEG_MODELS_LOCK:
+        if (vocab_key, postag) not in _PKUSEG_MODELS:
+            import pkuseg
+
+            # TODO(zhuoyin94@163.com): pkuseg的postag需要internet连接获取词表
+            _PKUSEG_MODELS[(vocab_key, postag)] = pkuseg.pkuseg(
+                user_dict=user_vocab, postag=postag)
+        return _PKUSEG_MODELS[(vocab_key, postag)]
+
+
+def _is_non_starter(char):
+    """判断char在NFKC归一化时是否可能与之前的字符合并。
+
+    包括组合类别不为0的字符、兼容分解以组合字符开头的字符（如半角浊音符）以及
+    谚文的中声与终声字母。
+    """
+    return bool(unicodedata.combining(char)) or \
+        bool(unicodedata.combining(unicodedata.normalize("NFKD", char)[:1])) \
+        or "\u1160" <= char <= "\u11ff"
+
+
+def _get_stable_length(text):
+    """返回text中可以独立于后续文本进行NFKC归一化的前缀的长度。
+
+    text末尾的最后一个基字符及其之后的非起始字符可能与后续文本中的组合字符合并，
+    因此不属于该前缀。
+    """
+    pos = len(text)
+    while pos > 0 and _is_non_starter(text[pos-1]):
+        pos -= 1
+    return max(pos - 1, 0)
+
+
+def _get_normalized_spans(paragraph):
+    """对paragraph进行NFKC归一化，并求得归一化结果中每个字符对应的原文区间。
+
+    NFKC可能将多个字符合并为一个（如"e"与组合字符U+0301、半角片假名与浊音符、
+    谚文字母），因此不能逐字符归一化。段落先在每个组合类别为0的字符之前切分为
+    片段，相邻片段合并归一化的结果与分别归一化的结果不同时再合并为一个片段；
+    每个片段整体归一化，其输出的字符均对应该片段在原文中的区间。
+
+    @Returns:
+    ----------
+        (paragraph_normalized, starts, ends)三元组，归一化结果的第i个字符对应
+        原文paragraph[starts[i]:ends[i]]。
+    """
+    normalize = unicodedata.normalize
+    spans = []
+    for pos, char in enumerate(paragraph):
+        if spans and unicodedata.combining(char):
+            spans[-1][1] = pos + 1
+        else:
+            spans.append([pos, pos + 1])
+
+    # 合并在归一化时相互作用的相邻片段
+    merged_spans, merged_texts = [], []
+    for start, end in spans:
+        text_normalized = normalize("NFKC", paragraph[start:end])
+        if merged_spans:
+            combined = normalize("NFKC",
+                                 paragraph[merged_spans[-1][0]:end])
+            if combined != merged_texts[-1] + text_normalized:
+                merged_spans[-1][1], merged_texts[-1] = end, combined
+                continue
+        merged_spans.append([start, end])
+        merged_texts.append(text_normalized)
+
+    paragraph_normalized = normalize("NFKC", paragraph)
+    if "".join(merged_texts) != paragraph_normalized:
+        # 无法切分为独立归一化的片段时，整个段落作为一个片段
+        merged_spans, merged_texts = [[0, len(paragraph)]], \
+            [paragraph_normalized]
+
+    starts, ends = [], []
+    for (start, end), text_normalized in zip(merged_spans, merged_texts):
+        starts.extend([start] * len(text_normalized))
+        ends.extend([end] * len(text_normalized))
+    return paragraph_normalized, starts, ends
+
 
 class WordSegmentation():
     """分词辅助。依据给定条件，将包含句子的列表切分为词的有序集合。
@@ -40,6 +161,13 @@ class WordSegmentation():
             用户停用词表，默认为空。
         user_vocab: {list-like}
             用户专业词表，默认为空，若是传值则在切词过程中pkuseg不对这些词进行切分。
+        sentence_cache: {object-like}
+            缓存{句子: (词列表, 词性列表)}的缓存，默认为容量
+            DEFAULT_CACHE_MAX_ENTRIES的LRUCache。也可以是cache.SQLiteCache，
+            在多个进程之间共享分词结果。
+        profiler: {object-like}
+            StageProfiler类型的分析器，记录分句、pkuseg切分与清洗的耗时，以及句子
+            与词的数目。默认为None，即不记录。
 
     @References:
     ----------
@@ -53,11 +181,12 @@ class WordSegmentation():
                  allow_word_tags=None,
                  delimiters=None,
                  user_vocab=None,
-                 stop_words_vocab=None):
+                 stop_words_vocab=None,
+                 sentence_cache=None,
+                 profiler=None):
         # 针对输入stop_words的预处理
         self.stop_words = stop_words_vocab or []
-        self.stop_words = [word.strip() for word in self.stop_words]
-        self.stop_words = set(self.stop_words)
+        self.stop_words = frozenset(word.strip() for word in self.stop_words)
         self.default_user_vocab = user_vocab
 
         # 类参数
@@ -73,12 +202,47 @@ class WordSegmentation():
         else:
             self.default_delimiters = list(set(delimiters))
 
-        # {句子：切分的句子}
-        self.sentence_cutted_dict = {}
-        self.sentence_cutted_postag_dict = {}
+        # 清洗阶段使用的词性集合，查询的时间复杂度为O(1)
+        self.allow_word_tags = frozenset(self.default_allow_word_tags)
+
+        # 单次扫描的分句正则表达式。段落在切分之前会进行NFKC归一化，因此分隔符
+        # 也需要归一化（如"……"归一化为"......"）；较长的分隔符优先匹配
+        delimiters_normalized = {unicodedata.normalize("NFKC", sep)
+                                 for sep in self.default_delimiters}
+        self.delimiter_pattern = re.compile("|".join(
+            re.escape(sep) for sep in sorted(delimiters_normalized,
+                                             key=len, reverse=True) if sep))
+
+        # {句子：(切分的句子, 词性)}
+        if sentence_cache is None:
+            sentence_cache = LRUCache(max_entries=DEFAULT_CACHE_MAX_ENTRIES)
+        self.sentence_cache = sentence_cache
+        self.profiler = profiler
 
-        # TODO(zhuoyin94@163.com): pkuseg的postag需要internet连接获取词表
-        self.seg = pkuseg.pkuseg(user_dict=user_vocab, postag=True)
+        # pkuseg模型延迟到第一次切分句子时载入
+        self._seg = None
+
+    @property
+    def seg(self):
+        """pkuseg分词模型，首次访问时由get_pkuseg_model载入。"""
+        if self._seg is None:
+            self._seg = get_pkuseg_model(self.default_user_vocab, postag=True)
+        return self._seg
+
+    def get_params(self):
+        """返回构造当前分词器的参数字典，可用于在其他进程中重建等价的分词器。
+
+        @Returns:
+        ----------
+            {参数名: 参数值}的字典，满足WordSegmentation(**params)的调用形式。
+        """
+        return {"is_lower": self.is_lower,
+                "is_use_stop_words": self.is_use_stop_words,
+                "is_use_word_tags_filter": self.is_use_word_tags_filter,
+                "allow_word_tags": list(self.default_allow_word_tags),
+                "delimiters": list(self.default_delimiters),
+                "user_vocab": self.default_user_vocab,
+                "stop_words_vocab": list(self.stop_words)}
 
     def segment_sentence(self, sentence,
                          is_lower=None,
@@ -116,43 +280,150 @@ class WordSegmentation():
         if not is_use_word_tags_filter:
             is_use_word_tags_filter = self.is_use_word_tags_filter
 
-        # 调用pkuseg，切分句子
-        if sentence in self.sentence_cutted_dict and \
-            sentence in self.sentence_cutted_postag_dict:
-            word_list = self.sentence_cutted_dict[sentence]
-            postag_list = self.sentence_cutted_postag_dict[sentence]
-        else:
+        word_list, postag_list = self._cut_sentence(sentence)
+        return self._filter_word_list(word_list, postag_list,
+                                      is_lower,
+                                      is_use_stop_words,
+                                      is_use_word_tags_filter)
+
+    def _cut_sentence(self, sentence):
+        """调用pkuseg切分句子，返回词列表与对应的词性列表（带缓存）。"""
+        sentence_cutted = self.sentence_cache.get(sentence)
+        if sentence_cutted is None:
+            if self.profiler is not None:
+                start = time.perf_counter()
             sentence_cutted = self.seg.cut(sentence)
-            word_list = [item[0] for item in sentence_cutted]
-            postag_list = [item[1] for item in sentence_cutted]
+            sentence_cutted = ([item[0] for item in sentence_cutted],
+                               [item[1] for item in sentence_cutted])
+            self.sentence_cache.put(sentence, sentence_cutted)
+            if self.profiler is not None:
+                self.profiler.add_time("pkuseg_cut",
+                                       time.perf_counter() - start)
+        return sentence_cutted
 
-            self.sentence_cutted_dict[sentence] = word_list
-            self.sentence_cutted_postag_dict[sentence] = postag_list
+    def _cut_sentence_list(self, sentence_list, n_jobs=1):
+        """批量切分句子列表，返回与sentence_list一一对应的(词列表, 词性列表)。
 
-        # STEP 1: 依据词性滤除不满足词性要求的词汇
-        if is_use_word_tags_filter:
-            word_list_tmp = []
-            for i, word in enumerate(word_list):
-                if postag_list[i] in self.default_allow_word_tags:
-                    word_list_tmp.append(word)
-            word_list = word_list_tmp
+        句子先被去重，每个不重复的句子只查询一次缓存；未命中缓存的句子被一次性送入
+        pkuseg切分并写入缓存，结果再按位置分发回原句子列表。
 
-        # STEP 2: 滤除文本中的特殊符号
-        word_list = [word.strip() for word in word_list]
-        word_list = [word for word in word_list if len(word) > 0]
+        @Parameters:
+        ----------
+            sentence_list: {list-like}
+                需要被切分的句子列表。
+            n_jobs: {int-like}
+                大于1时使用pkuseg.test的多进程文件模式切分未命中缓存的句子，
+                适用于大规模语料；否则在当前进程中逐句切分。
 
-        # STEP 3: 转换英文的大小写
+        @Returns:
+        ----------
+            (词列表, 词性列表)二元组的列表。
+        """
+        sentence_cutted_dict = {}
+        sentences_to_cut = []
+        for sentence in dict.fromkeys(sentence_list):
+            sentence_cutted = self.sentence_cache.get(sentence)
+            if sentence_cutted is None:
+                sentences_to_cut.append(sentence)
+            else:
+                sentence_cutted_dict[sentence] = sentence_cutted
+
+        if sentences_to_cut:
+            if self.profiler is not None:
+                start = time.perf_counter()
+            if n_jobs > 1:
+                cut_results = self._cut_sentences_file_mode(
+                    sentences_to_cut, n_jobs)
+            else:
+                seg = self.seg
+                cut_results = [seg.cut(sentence)
+                               for sentence in sentences_to_cut]
+
+            for sentence, sentence_cutted in zip(sentences_to_cut,
+                                                 cut_results):
+                sentence_cutted = ([item[0] for item in sentence_cutted],
+                                   [item[1] for item in sentence_cutted])
+                self.sentence_cache.put(sentence, sentence_cutted)
+                sentence_cutted_dict[sentence] = sentence_cutted
+            if self.profiler is not None:
+                self.profiler.add_time("pkuseg_cut",
+                                       time.perf_counter() - start)
+
+        if self.profiler is not None:
+            self.profiler.add_count("unique_sentences",
+                                    len(sentence_cutted_dict))
+        return [sentence_cutted_dict[sentence] for sentence in sentence_list]
+
+    def _cut_sentences_file_mode(self, sentence_list, n_jobs):
+        """调用pkuseg.test的多进程文件模式切分句子，返回[(词, 词性), ...]的列表。
+
+        含有换行符的句子无法按行写入文件，这些句子在当前进程中切分。
+        """
+        import pkuseg
+
+        results = [None] * len(sentence_list)
+        file_index = []
+        for index, sentence in enumerate(sentence_list):
+            if "\n" in sentence or "\r" in sentence:
+                results[index] = self.seg.cut(sentence)
+            else:
+                file_index.append(index)
+        if not file_index:
+            return results
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            input_path = os.path.join(tmp_dir, "input.txt")
+            output_path = os.path.join(tmp_dir, "output.txt")
+            with open(input_path, "w", encoding="utf-8") as f:
+                f.write("\n".join(sentence_list[index]
+                                  for index in file_index) + "\n")
+            pkuseg.test(input_path, output_path,
+                        user_dict=self.default_user_vocab,
+                        postag=True, nthread=n_jobs)
+            with open(output_path, "r", encoding="utf-8") as f:
+                lines = f.read().split("\n")
+
+        # 只去除末尾换行符产生的一个空元素，多出或缺少的行均视为输出错位
+        if lines and lines[-1] == "":
+            lines.pop()
+
+        if len(lines) != len(file_index):
+            raise ValueError("pkuseg.test returned {} lines for {} " \
+                             "sentences !".format(len(lines), len(file_index)))
+        for index, line in zip(file_index, lines):
+            results[index] = [tuple(item.rsplit("/", 1))
+                              for item in line.split()]
+        return results
+
+    def _select_words(self, word_list, postag_list,
+                      is_use_stop_words,
+                      is_use_word_tags_filter):
+        """对已去除首尾空白（及转为小写）的词列表，一次扫描完成滤除空词、词性过滤与
+        停用词过滤。词性与停用词均为frozenset，每个词的查询为O(1)。"""
+        stop_words = self.stop_words if is_use_stop_words else _EMPTY_SET
+        if is_use_word_tags_filter:
+            allow_word_tags = self.allow_word_tags
+            return [word for word, postag in zip(word_list, postag_list)
+                    if word and postag in allow_word_tags
+                    and word not in stop_words]
+        return [word for word in word_list
+                if word and word not in stop_words]
+
+    def _filter_word_list(self, word_list, postag_list,
+                          is_lower,
+                          is_use_stop_words,
+                          is_use_word_tags_filter):
+        """依据给定条件，对切分后的词列表进行清洗。
+
+        去除首尾空白、转换大小写、词性过滤与停用词过滤在一次扫描中完成，
+        结果与依次执行各个步骤相同。
+        """
+        word_list = map(str.strip, word_list)
         if is_lower:
-            word_list = [word.lower() for word in word_list]
-
-        # STEP 4: 依据要求滤除停用词
-        if is_use_stop_words:
-            word_list_tmp = []
-            for i, word in enumerate(word_list):
-                if word not in self.stop_words:
-                    word_list_tmp.append(word)
-            word_list = word_list_tmp
-        return word_list
+            word_list = map(str.lower, word_list)
+        return self._select_words(word_list, postag_list,
+                                  is_use_stop_words,
+                                  is_use_word_tags_filter)
 
     def segment_sentence_list(self, sentence_list,
                               is_lower=None,
@@ -191,13 +462,14 @@ class WordSegmentation():
         if not is_use_word_tags_filter:
             is_use_word_tags_filter = self.is_use_word_tags_filter
 
+        # 批量切分：重复的句子只切分一次
         sentence_cutted_list = []
-        for sentence in sentence_list:
+        for word_list, postag_list in self._cut_sentence_list(sentence_list):
             sentence_cutted_list.append(
-                self.segment_sentence(sentence,
-                                      is_lower,
-                                      is_use_stop_words,
-                                      is_use_word_tags_filter))
+                self._filter_word_list(word_list, postag_list,
+                                       is_lower,
+                                       is_use_stop_words,
+                                       is_use_word_tags_filter))
         return sentence_cutted_list
 
     def segment_paragraph(self, paragraph=None,
@@ -230,21 +502,372 @@ class WordSegmentation():
         if not is_use_word_tags_filter:
             is_use_word_tags_filter = self.is_use_word_tags_filter
 
-        # STEP 0: 预处理。尽量将paragraph的符号转换为英文字符，提升切分正确率
-        paragraph = unicodedata.normalize("NFKC", paragraph)
-
         # STEP 1: 依据分隔符，将段落切分为句子列表
-        tmp = [paragraph]
-        for sep in self.default_delimiters:
-            sentence_list = tmp
-            tmp = []
-
-            for sentence in sentence_list:
-                tmp += sentence.split(sep)
-        sentence_list = [s.strip() for s in sentence_list if len(s.strip()) > 0]
+        sentence_list = self.split_paragraph(paragraph)
 
         # STEP 2: 对句子列表的每一个句子进行分词
         sentence_list_cutted = self.segment_sentence_list(
             sentence_list, is_lower, is_use_stop_words,
             is_use_word_tags_filter)
         return sentence_list_cutted
+
+    def split_paragraph(self, paragraph, is_return_offsets=False):
+        """依据分隔符，将段落(paragraph)切分为句子的列表。
+
+        所有分隔符被编译为一个正则表达式，段落只需被扫描一次，时间复杂度与段落长度
+        成线性关系。
+
+        @Parameters:
+        ----------
+            paragraph: {str-like}
+                需要被切分的段落。
+            is_return_offsets: {bool-like}
+                是否同时返回每个句子在原始段落中的位置。
+
+        @Returns:
+        ----------
+            NFKC归一化并去除首尾空白之后的非空句子列表。若is_return_offsets为
+            True，列表的每个元素为(句子, start, end)三元组，paragraph[start:end]
+            为该句子对应的原始文本。
+        """
+        if not isinstance(paragraph, str):
+            raise TypeError("Invalid input paragraph type !")
+        if is_return_offsets:
+            return list(self.iter_sentences(paragraph))
+
+        # 预处理。尽量将paragraph的符号转换为英文字符，提升切分正确率
+        paragraph = unicodedata.normalize("NFKC", paragraph)
+
+        sentence_list = self.delimiter_pattern.split(paragraph)
+        sentence_list = [s.strip() for s in sentence_list if len(s.strip()) > 0]
+        return sentence_list
+
+    def iter_sentences(self, paragraph):
+        """依据分隔符，单次扫描段落(paragraph)，逐个返回句子及其在原文中的位置。
+
+        @Parameters:
+        ----------
+            paragraph: {str-like}
+                需要被切分的段落。
+
+        @Yields:
+        ----------
+            (句子, start, end)三元组，句子与split_paragraph的结果相同，
+            paragraph[start:end]为该句子对应的原始文本。原文中的位置由
+            _get_normalized_spans映射得到。
+        """
+        if not isinstance(paragraph, str):
+            raise TypeError("Invalid input paragraph type !")
+        paragraph_normalized = unicodedata.normalize("NFKC", paragraph)
+
+        # 归一化之后段落中每个字符对应的原文区间
+        starts = ends = None
+        if paragraph_normalized != paragraph:
+            _, starts, ends = _get_normalized_spans(paragraph)
+        max_index = len(paragraph_normalized)
+
+        start = 0
+        matches = self.delimiter_pattern.finditer(paragraph_normalized)
+        for match in itertools.chain(matches, [None]):
+            end = match.start() if match else max_index
+            sentence = paragraph_normalized[start:end]
+            sentence_strip = sentence.strip()
+
+            if sentence_strip:
+                begin = start + len(sentence) - len(sentence.lstrip())
+                finish = begin + len(sentence_strip)
+                if starts is not None:
+                    begin, finish = starts[begin], ends[finish - 1]
+                yield sentence_strip, begin, finish
+            if match:
+                start = match.end()
+
+    def segment_paragraph_views(self, paragraph):
+        """对段落只进行一次分句与分词，同时返回多种清洗策略下的分词结果。
+
+        每个句子只调用一次pkuseg，各个视图共享同一份词与词性列表，去除首尾空白与
+        大小写转换也只进行一次，避免对同一段落重复调用segment_paragraph。
+
+        @Parameters:
+        ----------
+            paragraph: {str-like}
+                需要被分词的段落。
+
+        @Returns:
+        ----------
+            {视图名称: 分词结果}的字典，包含以下三种视图：
+            "no_filter": 依据类参数清洗的分词结果，与segment_paragraph相同；
+            "no_stop_words": 转为小写并滤除停用词，不含空句子；
+            "all_filters": 转为小写，依据词性与停用词清洗，不含空句子。
+        """
+        views = {name: [] for name in VIEW_NAMES}
+        sentence_list = self.split_paragraph(paragraph)
+        for sentence, sentence_cutted in zip(
+                sentence_list, self._cut_sentence_list(sentence_list)):
+            sentence_views = self._segment_sentence_views(
+                sentence, sentence_cutted)
+            for name in VIEW_NAMES:
+                views[name].append(sentence_views[name])
+
+        # 清洗之后的视图滤除空句子
+        for name in ["no_stop_words", "all_filters"]:
+            views[name] = [item for item in views[name] if len(item) > 0]
+        return views
+
+    def segment_sentence_list_encoded(self, sentence_list, vocabulary,
+                                      n_jobs=1):
+        """对句子列表只进行一次分词，以整数id数组的形式返回多种视图的分词结果。
+
+        @Parameters:
+        ----------
+            sentence_list: {list-like}
+                需要被分词的句子集合，list的每一个元素为一个未被分词的句子。
+            vocabulary: {object-like}
+                Vocabulary类型的词表，新词会被加入词表。
+            n_jobs: {int-like}
+                pkuseg切分的并行进程数，见_cut_sentence_list。
+
+        @Returns:
+        ----------
+            {视图名称: EncodedDocument}的字典，视图的定义见
+            segment_paragraph_views。每个视图的第i个句子对应sentence_list的第i
+            个句子，因此视图中可能含有空句子，可以调用filter_empty滤除。
+        """
+        if not isinstance(sentence_list, list):
+            raise TypeError("Invalid input sentence list !")
+        return self._encode_sentence_views(
+            sentence_list, self._cut_sentence_list(sentence_list, n_jobs),
+            vocabulary)
+
+    def _encode_sentence_views(self, sentence_list, sentence_cutted_list,
+                               vocabulary):
+        """由已切分的句子构建各个视图的EncodedDocument。"""
+        get_index = vocabulary.add
+        token_ids = {name: array("i") for name in VIEW_NAMES}
+        sentence_offsets = {name: array("q", [0]) for name in VIEW_NAMES}
+        for sentence, sentence_cutted in zip(sentence_list,
+                                             sentence_cutted_list):
+            sentence_views = self._segment_sentence_views(
+                sentence, sentence_cutted)
+            for name in VIEW_NAMES:
+                token_ids[name].extend(
+                    [get_index(word) for word in sentence_views[name]])
+                sentence_offsets[name].append(len(token_ids[name]))
+
+        documents = {}
+        for name in VIEW_NAMES:
+            documents[name] = EncodedDocument(
+                np.array(token_ids[name], dtype=np.int32),
+                np.array(sentence_offsets[name], dtype=np.int64))
+
+        if self.profiler is not None:
+            self.profiler.add_count("sentences", len(sentence_list))
+            self.profiler.add_count("tokens",
+                                    documents["no_filter"].n_tokens)
+        return documents
+
+    def segment_paragraph_encoded(self, paragraph, vocabulary):
+        """对段落进行分句与分词，以整数id数组的形式返回多种视图的分词结果。
+
+        @Parameters:
+        ----------
+            paragraph: {str-like}
+                需要被分词的段落。
+            vocabulary: {object-like}
+                Vocabulary类型的词表，新词会被加入词表。
+
+        @Returns:
+        ----------
+            {视图名称: EncodedDocument}的字典，见segment_sentence_list_encoded。
+        """
+        if self.profiler is None:
+            return self.segment_sentence_list_encoded(
+                self.split_paragraph(paragraph), vocabulary)
+
+        with self.profiler.stage("split"):
+            sentence_list = self.split_paragraph(paragraph)
+        with self.profiler.stage("segmentation"):
+            return self.segment_sentence_list_encoded(
+                sentence_list, vocabulary)
+
+    def segment_corpus_encoded(self, paragraph_list, vocabulary, n_jobs=1):
+        """对多篇段落批量进行分句与分词，以整数id数组的形式返回每篇段落的分词结果。
+
+        所有段落的句子先被汇总并去重，只有未命中缓存的不重复句子才会被送入pkuseg
+        切分，切分结果再按位置分发回每一篇段落。大量重复的句子（如新闻稿末尾的
+        公司简介）在整个语料中只切分一次。
+
+        @Parameters:
+        ----------
+            paragraph_list: {list-like}
+                需要被分词的段落的列表。
+            vocabulary: {object-like}
+                所有段落共用的Vocabulary词表，新词会被加入词表。
+            n_jobs: {int-like}
+                pkuseg切分的并行进程数，见_cut_sentence_list。
+
+        @Returns:
+        ----------
+            与paragraph_list一一对应的{视图名称: EncodedDocument}字典的列表，
+            格式同segment_paragraph_encoded。
+        """
+        if self.profiler is not None:
+            start = time.perf_counter()
+        sentence_lists = [self.split_paragraph(paragraph)
+                          for paragraph in paragraph_list]
+        if self.profiler is not None:
+            self.profiler.add_time("split", time.perf_counter() - start)
+            start = time.perf_counter()
+
+        sentence_cutted_list = self._cut_sentence_list(
+            list(itertools.chain.from_iterable(sentence_lists)), n_jobs)
+
+        documents_list, begin = [], 0
+        for sentence_list in sentence_lists:
+            end = begin + len(sentence_list)
+            documents_list.append(self._encode_sentence_views(
+                sentence_list, sentence_cutted_list[begin:end], vocabulary))
+            begin = end
+
+        if self.profiler is not None:
+            self.profiler.add_time("segmentation",
+                                   time.perf_counter() - start)
+        return documents_list
+
+    def export_corpus(self, paragraph_list, path=None, document_names=None,
+                      n_jobs=1):
+        """对多篇段落进行分句与分词，将未经清洗的切分结果导出为SegmentedCorpus。
+
+        重复的句子只切分一次（见_cut_sentence_list）。导出的语料可由
+        SegmentedCorpus.load以内存映射的方式载入，其get_views方法依据分词器的
+        is_lower、停用词与词性过滤参数给出与segment_paragraph_encoded一致的结果，
+        调整这些参数时无需重新分词。
+
+        @Parameters:
+        ----------
+            paragraph_list: {list-like}
+                需要被分词的段落的列表。
+            path: {str-like}
+                保存语料的目录，默认为None，即不保存。
+            document_names: {list-like}
+                每篇段落的名称（如文件名），保存在语料的元信息中。
+            n_jobs: {int-like}
+                pkuseg切分的并行进程数，见_cut_sentence_list。
+
+        @Returns:
+        ----------
+            SegmentedCorpus类型的分词语料。
+        """
+        if document_names is not None and \
+                len(document_names) != len(paragraph_list):
+            raise ValueError(
+                "document_names and paragraph_list must have the same length !")
+        sentence_lists = [self.split_paragraph(paragraph)
+                          for paragraph in paragraph_list]
+        cut_results = self._cut_sentence_list(
+            list(itertools.chain.from_iterable(sentence_lists)), n_jobs)
+
+        metadata = {"user_vocab": self.default_user_vocab,
+                    "delimiters": sorted(self.default_delimiters),
+                    "document_names": document_names}
+        corpus = SegmentedCorpus.from_cut_results(
+            cut_results, [len(item) for item in sentence_lists], metadata)
+        if path is not None:
+            corpus.save(path)
+        return corpus
+
+    def _segment_sentence_views(self, sentence, sentence_cutted=None):
+        """对单个句子只进行一次分词，返回{视图名称: 词列表}的字典。
+
+        sentence_cutted为句子已有的(词列表, 词性列表)切分结果，默认为None，即调用
+        pkuseg切分句子。
+        """
+        if sentence_cutted is None:
+            sentence_cutted = self._cut_sentence(sentence)
+        word_list, postag_list = sentence_cutted
+        if self.profiler is not None:
+            start = time.perf_counter()
+
+        # 所有视图共享的预处理结果
+        word_list_strip = list(map(str.strip, word_list))
+        word_list_lower = list(map(str.lower, word_list_strip))
+
+        sentence_views = {
+            "no_filter": self._select_words(
+                word_list_lower if self.is_lower else word_list_strip,
+                postag_list, self.is_use_stop_words,
+                self.is_use_word_tags_filter),
+            "no_stop_words": self._select_words(
+                word_list_lower, postag_list, True, False),
+            "all_filters": self._select_words(
+                word_list_lower, postag_list, True, True)}
+
+        if self.profiler is not None:
+            self.profiler.add_time("filter", time.perf_counter() - start)
+        return sentence_views
+
+    def iter_stream_sentences(self, chunks):
+        """从文本块的迭代器chunks中流式地切分句子。
+
+        文本块被逐个读入缓冲区，缓冲区中最后一个分隔符之前的句子被立即返回，之后
+        的残余文本与下一个文本块拼接之后继续切分。峰值内存只与最长的句子有关，而与
+        文本的总长度无关。
+
+        @Parameters:
+        ----------
+            chunks: {iterable}
+                字符串的迭代器，例如按块读取的文件，或者以文本模式打开的文件对象。
+
+        @Yields:
+        ----------
+            NFKC归一化并去除首尾空白之后的非空句子。
+        """
+        max_delimiter_length = max(
+            [len(unicodedata.normalize("NFKC", sep))
+             for sep in self.default_delimiters] + [1])
+
+        # pending为尚未归一化的原文：文本块末尾的基字符及其之后的组合字符可能与
+        # 下一个文本块开头的组合字符合并，需要与下一个文本块拼接之后再归一化
+        buffer, pending = "", ""
+        end_of_chunks = object()
+        for chunk in itertools.chain(chunks, [end_of_chunks]):
+            if chunk is end_of_chunks:
+                text, pending = pending, ""
+            elif not isinstance(chunk, str):
+                raise TypeError("Invalid input chunk type !")
+            else:
+                text = pending + chunk
+                stable_length = _get_stable_length(text)
+                text, pending = text[:stable_length], text[stable_length:]
+
+            # 只需从可能与新文本块组成分隔符的位置开始扫描
+            scan_start = max(len(buffer) - max_delimiter_length + 1, 0)
+            buffer += unicodedata.normalize("NFKC", text)
+
+            start = 0
+            for match in self.delimiter_pattern.finditer(buffer, scan_start):
+                sentence = buffer[start:match.start()].strip()
+                if sentence:
+                    yield sentence
+                start = match.end()
+            buffer = buffer[start:]
+
+        sentence = buffer.strip()
+        if sentence:
+            yield sentence
+
+    def iter_stream_views(self, chunks):
+        """流式地切分并分词，逐个句子返回多种清洗策略下的分词结果。
+
+        @Parameters:
+        ----------
+            chunks: {iterable}
+                字符串的迭代器，见iter_stream_sentences。
+
+        @Yields:
+        ----------
+            每个句子的{视图名称: 词列表}字典，视图的定义见segment_paragraph_views。
+            词列表可能为空。
+        """
+        for sentence in self.iter_stream_sentences(chunks):
+            yield self._segment_sentence_views(sentence)
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Created on Fri Jan 15 16:30:12 2021
+# Author:     zhuoyin94 <zhuoyin94@163.com>
+# Github:     https://github.com/MichaelYin1994
+
+import sys
+import json
+if ".." not in sys.path:
+    sys.path.append("..")
+
+from benchmark import time_function, run_benchmarks, compare_results, cli
+
+
+def test_time_function():
+    calls = []
+    stats = time_function(lambda: calls.append(1), n_repeats=3,
+                          setup=lambda: calls.append(0))
+    assert calls == [0, 1, 0, 1, 0, 1]
+    assert stats["n_repeats"] == 3
+    assert 0 <= stats["min"] <= stats["median"]
+
+
+def test_compare_results(tmp_path):
+    results = run_benchmarks(["similarity"], n_repeats=1)
+    assert len(results["benchmarks"]) == 9
+    assert json.loads(json.dumps(results)) == results
+
+    # 当前结果慢于基准20%以上时视为退化
+    current = json.loads(json.dumps(results))
+    name = "compute_lcss_similarity[length=100]"
+    current["benchmarks"][name]["median"] *= 1.5
+    comparison = compare_results(results, current, threshold=0.2)
+    assert comparison[name]["is_regression"]
+    assert sum(item["is_regression"] for item in comparison.values()) == 1
+
+    baseline_path = str(tmp_path / "baseline.json")
+    current_path = str(tmp_path / "current.json")
+    with open(baseline_path, "w") as f:
+        json.dump(results, f)
+    with open(current_path, "w") as f:
+        json.dump(current, f)
+    assert cli(["--compare", baseline_path, current_path,
+                "--threshold", "0.2"]) == 1
+    assert cli(["--compare", baseline_path, baseline_path]) == 0
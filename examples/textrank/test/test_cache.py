@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Created on Thu Jan  7 16:05:12 2021
+# Author:     zhuoyin94 <zhuoyin94@163.com>
+# Github:     https://github.com/MichaelYin1994
+
+import os
+import sys
+import pickle
+import pytest
+import multiprocessing
+if ".." not in sys.path:
+    sys.path.append("..")
+
+from cache import LRUCache, SQLiteCache
+
+
+def test_lru_cache_eviction():
+    # 按条目数目淘汰
+    cache = LRUCache(max_entries=2)
+    cache.put("A", (["A"], ["n"]))
+    cache.put("B", (["B"], ["n"]))
+    assert cache.get("A") == (["A"], ["n"])
+
+    cache.put("C", (["C"], ["v"]))
+    assert "B" not in cache
+    assert "A" in cache and "C" in cache
+    assert cache.get("B") is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["evictions"] == 1
+    assert stats["entries"] == 2
+
+    # 按内存占用淘汰
+    cache = LRUCache(max_entries=None, max_bytes=2000)
+    for i in range(100):
+        cache.put(str(i), ([str(i)] * 5, ["n"] * 5))
+    assert 0 < len(cache) < 100
+    assert cache.n_bytes <= 2000
+    assert "99" in cache and "0" not in cache
+
+    with pytest.raises(ValueError):
+        LRUCache(max_entries=0)
+
+
+def test_lru_cache_persistence(tmp_path):
+    path = os.path.join(str(tmp_path), "sentence_cache.pkl")
+    cache = LRUCache(max_entries=10, path=path)
+    for i in range(5):
+        cache.put(str(i), ([str(i)], ["n"]))
+    cache.get("0")
+    cache.save()
+
+    # 重启之后载入缓存，并保持LRU顺序
+    cache = LRUCache(max_entries=4, path=path)
+    assert len(cache) == 4
+    assert "1" not in cache
+    assert cache.get("0") == (["0"], ["n"])
+
+
+def test_sqlite_cache(tmp_path):
+    path = os.path.join(str(tmp_path), "result_cache.db")
+    cache = SQLiteCache(path, max_entries=3, access_update_interval=0.0)
+    for i in range(4):
+        cache.put(str(i), [[str(i), 0.1 * i]])
+    assert len(cache) == 3
+    assert "0" not in cache
+    assert cache.get("1") == [["1", 0.1]]
+    assert cache.get("0") is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["evictions"] == 1 and stats["entries"] == 3
+    cache.close()
+
+    # 重启之后条目依然存在，并按访问顺序淘汰
+    cache = SQLiteCache(path, max_entries=None, max_bytes=None,
+                        access_update_interval=0.0)
+    assert len(cache) == 3
+    cache.put("4", None)
+    assert "4" in cache
+    cache.max_bytes = cache.n_bytes - 1
+    cache.put("5", [["5", 0.5]])
+    assert "2" not in cache and "1" in cache and "5" in cache
+    assert cache.n_bytes <= cache.max_bytes
+
+    cache.clear()
+    assert len(cache) == 0
+    cache.close()
+
+    with pytest.raises(ValueError):
+        SQLiteCache(path, max_bytes=0)
+
+    # 默认设置下，刚写入的条目被命中时不再更新访问时间
+    cache = SQLiteCache(path)
+    cache.put("A", "a")
+    query = "SELECT last_access FROM cache WHERE key = ?"
+    last_access = cache.connection.execute(query, ("A", )).fetchone()
+    assert cache.get("A") == "a"
+    assert cache.connection.execute(query, ("A", )).fetchone() == last_access
+    cache.close()
+
+
+def _put_items(args):
+    cache, begin, end = args
+    for i in range(begin, end):
+        cache.put(str(i % 50), ([str(i % 50)], ["n"]))
+        cache.get(str((i + 1) % 50))
+    return cache.stats()["hits"]
+
+
+def test_sqlite_cache_multiprocess(tmp_path):
+    path = os.path.join(str(tmp_path), "sentence_cache.db")
+    cache = SQLiteCache(path, max_entries=40, access_update_interval=1.0)
+
+    # 实例被pickle之后在子进程中重新建立连接
+    cache_copy = pickle.loads(pickle.dumps(cache))
+    cache_copy.put("A", (["A"], ["n"]))
+    assert cache.get("A") == (["A"], ["n"])
+
+    with multiprocessing.Pool(4) as pool:
+        hits = pool.map(_put_items, [(cache, i * 100, (i + 1) * 100)
+                                     for i in range(4)])
+    assert sum(hits) > 0
+    assert len(cache) == 40
+    assert cache.n_bytes == sum(
+        len(row[0]) for row in cache.connection.execute(
+            "SELECT value FROM cache"))
+    cache.close()
+    assert len(cache) == 40
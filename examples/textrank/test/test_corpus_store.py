@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Created on Tue Jan 26 14:02:51 2021
+# Author:     zhuoyin94 <zhuoyin94@163.com>
+# Github:     https://github.com/MichaelYin1994
+
+import sys
+import pytest
+import numpy as np
+if ".." not in sys.path:
+    sys.path.append("..")
+
+from corpus_store import SegmentedCorpus
+from segmentation import WordSegmentation
+from textrank4keywords import TextRank4Keywords
+from utils import build_similarity_matrix, compute_word_scores_encoded
+from vocabulary import Vocabulary
+
+CORPUS = ["2020年10月21-23日，2020年“北京国际城市轨道交通展览会暨高峰论坛”在北京中国国际展览中心隆重举行。作为城市轨道交通信号系统的领军企业，交控科技股份有限公司（以下简称“交控科技”）携列车远程瞭望系统、天枢系统、智能列车乘客服务系统、无感改造、互联互通的CBTC系统、智慧管理、智慧培训等系统解决方案亮相。",
+          "数据平台和算法集市通过统一的数据总线和算法能力为上层智能智慧业务提供了全面的PaaS（平台即服务）服务。交控科技还推出了列车远程瞭望系统的视距延伸装置——轨道星链。",
+          "",
+          "公司总裁助理夏夕盛进行了“智慧单轨运行系统的发展及展望”主题演讲。根据列车运行速度计算安全行进距离。CBTC系统。"]
+
+
+def test_segmented_corpus(tmp_path):
+    path = str(tmp_path / "corpus")
+    seg = WordSegmentation(delimiters=["。", "，"])
+    corpus = seg.export_corpus(CORPUS, path=path,
+                               document_names=["a", "b", "c", "d"])
+
+    # 以只读的内存映射方式载入
+    loaded = SegmentedCorpus.load(path)
+    assert isinstance(loaded.token_ids, np.memmap)
+    assert len(loaded) == len(corpus) == len(CORPUS)
+    assert loaded.document_names == ["a", "b", "c", "d"]
+    assert loaded.vocabulary.index2word == corpus.vocabulary.index2word
+    for name in ["token_ids", "postag_ids", "sentence_offsets",
+                 "document_offsets"]:
+        assert np.array_equal(getattr(loaded, name), getattr(corpus, name))
+
+    document, postag_ids = loaded.get_document(1)
+    assert len(document) == len(seg.split_paragraph(CORPUS[1]))
+    assert len(postag_ids) == document.n_tokens
+    with pytest.raises(IndexError):
+        loaded.get_document(len(CORPUS))
+
+    # 不同清洗参数下的各个视图与直接分词的结果一致
+    for params in [{},
+                   {"is_lower": False, "is_use_stop_words": True,
+                    "stop_words_vocab": ["的", "了", "cbtc", "CBTC"]},
+                   {"is_use_word_tags_filter": True,
+                    "allow_word_tags": ["n", "v"],
+                    "stop_words_vocab": ["系统"]}]:
+        tokenizer = WordSegmentation(delimiters=["。", "，"], **params)
+        for index, paragraph in enumerate(CORPUS):
+            views = loaded.get_views(index, tokenizer)
+            vocabulary = Vocabulary()
+            expected = tokenizer.segment_paragraph_encoded(paragraph,
+                                                           vocabulary)
+            for name, document in views.items():
+                assert document.to_word_lists(loaded.vocabulary) == \
+                    expected[name].to_word_lists(vocabulary)
+
+    # 载入的结果可以直接用于构图与相似度计算
+    views = loaded.get_views(0, seg)
+    result = compute_word_scores_encoded(views["all_filters"],
+                                         views["no_stop_words"],
+                                         loaded.vocabulary)
+    assert result == TextRank4Keywords(tokenizer=seg).fit_predict(CORPUS[0])
+    similarity_mat = build_similarity_matrix(
+        views["no_filter"].filter_empty(), similarity="lcss")
+    assert similarity_mat.shape[0] == len(
+        views["no_filter"].filter_empty())
+
+    with pytest.raises(FileNotFoundError):
+        SegmentedCorpus.load(str(tmp_path / "missing"))
+
+
+def test_fit_predict_corpus(tmp_path):
+    seg = WordSegmentation(stop_words_vocab=["的", "了", "在"])
+    texts = [text for text in CORPUS if text]
+    seg.export_corpus(texts, path=str(tmp_path))
+    corpus = SegmentedCorpus.load(str(tmp_path))
+
+    textrank = TextRank4Keywords(tokenizer=seg)
+    expected = [textrank.fit_predict(text, window_size=3)[:10]
+                for text in texts]
+    for batch_size in [1, 2, 10]:
+        assert list(textrank.fit_predict_corpus(
+            corpus, top_k=10, batch_size=batch_size,
+            window_size=3)) == expected
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Created on Mon Jan 11 14:20:05 2021
+# Author:     zhuoyin94 <zhuoyin94@163.com>
+# Github:     https://github.com/MichaelYin1994
+
+import sys
+import random
+import pytest
+import numpy as np
+if ".." not in sys.path:
+    sys.path.append("..")
+
+from graph import CooccurrenceGraph
+from utils import compute_word_scores, compute_word_scores_sp
+
+
+def test_cooccurrence_graph():
+    graph = CooccurrenceGraph(window_size=2)
+    with pytest.raises(ValueError):
+        graph.compute_word_scores()
+
+    vertex_source, edge_source = [], []
+    for _ in range(50):
+        sentence = [str(i) for i in np.random.randint(0, 60, 20)]
+        vertex_source.append(
+            [word for word in sentence if int(word) % 3 != 0])
+        edge_source.append(sentence)
+
+    # 缓冲区较小时，边被多次合并进邻接矩阵
+    expected = compute_word_scores(vertex_source, edge_source,
+                                   window_size=3)
+    for buffer_size in [7, 2**20]:
+        graph = CooccurrenceGraph(window_size=3, buffer_size=buffer_size)
+        for vertex_words, edge_words in zip(vertex_source, edge_source):
+            graph.add_sentence(vertex_words, edge_words)
+        graph.add_edges([])
+
+        result = graph.compute_word_scores()
+        assert len(graph) == len(expected)
+        assert [word for word, _ in result] == [word for word, _ in expected]
+        assert np.allclose([score for _, score in result],
+                           [score for _, score in expected])
+        assert graph.compute_word_scores(top_k=5) == result[:5]
+
+    # 缓冲区中的边先被追加为待合并的边，只在其多于已合并的边时才合并
+    graph = CooccurrenceGraph(window_size=3, buffer_size=7)
+    n_merges, adjacent_mat = 0, graph.adjacent_mat
+    for vertex_words, edge_words in zip(vertex_source, edge_source):
+        graph.add_sentence(vertex_words, edge_words)
+        if graph.adjacent_mat is not adjacent_mat:
+            n_merges, adjacent_mat = n_merges + 1, graph.adjacent_mat
+    assert n_merges < len(edge_source) // 2
+    assert [word for word, _ in graph.compute_word_scores()] == \
+        [word for word, _ in expected]
+
+    # 图未发生变化时直接返回上一次的结点邻接矩阵
+    vertex_mat, _ = graph.get_adjacent_matrix()
+    assert graph.get_adjacent_matrix()[0] is vertex_mat
+    graph.add_vertices(["新词"])
+    assert graph.get_adjacent_matrix()[0].shape[0] == len(graph)
+
+
+def test_cooccurrence_graph_weighted():
+    sentences = [[str(i) for i in np.random.randint(0, 40, 15)]
+                 for _ in range(30)]
+    for edge_weight in ["count", "distance"]:
+        expected = compute_word_scores_sp(sentences, sentences,
+                                          window_size=3,
+                                          edge_weight=edge_weight)
+        graph = CooccurrenceGraph(window_size=3, buffer_size=50,
+                                  edge_weight=edge_weight)
+        for sentence in sentences:
+            graph.add_sentence(sentence, sentence)
+
+        # 多次合并缓冲区时，重复的共现被累加
+        result = dict(graph.compute_word_scores())
+        assert np.allclose([result[word] for word, _ in expected],
+                           [score for _, score in expected])
+
+    with pytest.raises(ValueError):
+        CooccurrenceGraph(edge_weight="cosine")
+
+
+def test_cooccurrence_graph_warm_start():
+    sentences = [[str(i) for i in np.random.randint(0, 300, 20)]
+                 for _ in range(200)]
+    graph = CooccurrenceGraph(window_size=2)
+    for sentence in sentences:
+        graph.add_sentence(sentence, sentence)
+    _, info_cold = graph.compute_word_scores(is_return_info=True)
+
+    # 新增少量的边之后，warm start的迭代次数更少，且结果与重新计算一致
+    sentences.append([str(i) for i in np.random.randint(0, 310, 5)])
+    graph.add_sentence(sentences[-1], sentences[-1])
+    result, info_warm = graph.compute_word_scores(is_return_info=True,
+                                                  is_warm_start=True)
+    expected = compute_word_scores(sentences, sentences)
+
+    assert info_warm["n_iter"] < info_cold["n_iter"]
+    result = dict(result)
+    assert np.allclose([result[word] for word, _ in expected],
+                       [score for _, score in expected], atol=1e-6)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Created on Tue Jan 19 15:21:06 2021
+# Author:     zhuoyin94 <zhuoyin94@163.com>
+# Github:     https://github.com/MichaelYin1994
+
+import io
+import os
+import sys
+import json
+import time
+import pytest
+if ".." not in sys.path:
+    sys.path.append("..")
+
+from main import (STOP_WORDS_FILE_NAMES, build_stop_words_index,
+                  load_stop_words, load_segmented_corpus, run_corpus_pipeline)
+from segmentation import WordSegmentation
+from corpus_store import SegmentedCorpus
+from textrank4keywords import TextRank4Keywords
+
+SENTENCES = ["交控科技还推出了列车远程瞭望系统的视距延伸装置。",
+             "根据列车运行速度计算安全行进距离。",
+             "数据平台和算法集市通过统一的数据总线为上层智慧业务提供服务。",
+             "公司总裁助理进行了智慧单轨运行系统的发展及展望主题演讲。"]
+
+
+def test_load_stop_words(tmp_path):
+    path = str(tmp_path / "stopwords")
+    os.mkdir(path)
+    for i, name in enumerate(STOP_WORDS_FILE_NAMES):
+        with open(os.path.join(path, name), "w") as f:
+            f.write("的\n了\n \nword{}\n".format(i))
+
+    # 未指定索引路径时直接读取停用词表，不在停用词表目录中写入任何文件
+    expected = {"的", "了", "word0", "word1", "word2", "word3"}
+    assert set(load_stop_words(path)) == expected
+    assert sorted(os.listdir(path)) == sorted(STOP_WORDS_FILE_NAMES)
+
+    # 第一次载入时构建索引，之后只读取索引文件
+    index_path = str(tmp_path / "cache" / "stop_words.index.pkl")
+    assert set(load_stop_words(path, index_path)) == expected
+    assert os.path.exists(index_path)
+    assert build_stop_words_index(index_path, path) == frozenset(expected)
+    assert set(load_stop_words(path, index_path)) == expected
+    assert sorted(os.listdir(path)) == sorted(STOP_WORDS_FILE_NAMES)
+
+    # 停用词表更新之后，索引被重新构建
+    time.sleep(0.01)
+    file_path = os.path.join(path, STOP_WORDS_FILE_NAMES[0])
+    with open(file_path, "a") as f:
+        f.write("新词\n")
+    os.utime(file_path, (time.time() + 10, time.time() + 10))
+    assert set(load_stop_words(path, index_path)) == expected | {"新词"}
+
+    os.remove(file_path)
+    with pytest.raises(FileNotFoundError) as err:
+        load_stop_words(path)
+    assert isinstance(err.value.__cause__, FileNotFoundError)
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_run_corpus_pipeline(tmp_path, n_jobs):
+    texts = ["".join(SENTENCES[j % 4] for j in range(i, i + 3))
+             for i in range(10)]
+
+    # 空白或只包含停用词的语料不中断整个流水线
+    texts[3], texts[7] = "", "的。了。\n"
+    for i, text in enumerate(texts):
+        with open(os.path.join(str(tmp_path), "{:03d}.txt".format(i)),
+                  "w") as f:
+            f.write(text)
+    with open(os.path.join(str(tmp_path), "ignored.csv"), "w") as f:
+        f.write(SENTENCES[0])
+
+    textrank = TextRank4Keywords(
+        tokenizer=WordSegmentation(stop_words_vocab=["的", "了"]))
+    expected = [textrank.fit_predict(text)[:5] for text in texts]
+
+    # 队列长度小于语料数目时，结果仍按文件名的顺序完整写出
+    output_file = io.StringIO()
+    n_results = run_corpus_pipeline(textrank, output_file,
+                                    path=str(tmp_path), top_k=5,
+                                    n_jobs=n_jobs, n_readers=2,
+                                    queue_size=3)
+    records = [json.loads(line)
+               for line in output_file.getvalue().splitlines()]
+    assert n_results == len(texts)
+    assert [item["file"] for item in records] == \
+        ["{:03d}.txt".format(i) for i in range(len(texts))]
+    assert [item["key_words"] for item in records] == \
+        json.loads(json.dumps(expected))
+
+
+def test_run_corpus_pipeline_errors(tmp_path):
+    with open(os.path.join(str(tmp_path), "000.txt"), "wb") as f:
+        f.write(b"\xff\xfe\xfa")
+    textrank = TextRank4Keywords(tokenizer=WordSegmentation())
+
+    # 读取阶段的异常在主线程中被重新抛出
+    with pytest.raises(UnicodeDecodeError):
+        run_corpus_pipeline(textrank, io.StringIO(), path=str(tmp_path))
+
+    # 写入阶段的异常同样被重新抛出
+    with open(os.path.join(str(tmp_path), "000.txt"), "w") as f:
+        f.write(SENTENCES[0])
+    output_file = io.StringIO()
+    output_file.close()
+    with pytest.raises(ValueError):
+        run_corpus_pipeline(textrank, output_file, path=str(tmp_path))
+
+
+def test_load_segmented_corpus(tmp_path):
+    corpus_path, store_path = tmp_path / "data", str(tmp_path / "store")
+    corpus_path.mkdir()
+    for i, sentence in enumerate(SENTENCES):
+        (corpus_path / "{:03d}.txt".format(i)).write_text(sentence)
+
+    # 第一次载入时分词并保存，之后直接载入而不再分词
+    tokenizer = WordSegmentation(delimiters=["。"])
+    corpus = load_segmented_corpus(tokenizer, str(corpus_path), store_path)
+    assert corpus.document_names == \
+        ["{:03d}.txt".format(i) for i in range(len(SENTENCES))]
+    tokenizer = WordSegmentation(delimiters=["。"], is_use_stop_words=True)
+    tokenizer.export_corpus = None
+    corpus_loaded = load_segmented_corpus(tokenizer, str(corpus_path),
+                                          store_path)
+    assert corpus_loaded.vocabulary.index2word == \
+        corpus.vocabulary.index2word
+
+    # 分句参数改变时重新分词
+    tokenizer = WordSegmentation(delimiters=["。", "，"],
+                                 user_vocab=["交控科技"])
+    corpus = load_segmented_corpus(tokenizer, str(corpus_path), store_path)
+    assert corpus.metadata["user_vocab"] == ["交控科技"]
+
+    # 语料文件被修改、增加或删除时重新分词
+    tokenizer.export_corpus = None
+    corpus = load_segmented_corpus(tokenizer, str(corpus_path), store_path)
+    file_name = corpus_path / "000.txt"
+    stat = os.stat(file_name)
+    file_name.write_text("全新的语料内容。")
+    os.utime(file_name, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    tokenizer = WordSegmentation(delimiters=["。", "，"],
+                                 user_vocab=["交控科技"])
+    corpus = load_segmented_corpus(tokenizer, str(corpus_path), store_path)
+    assert "全新" in corpus.vocabulary.index2word
+    assert corpus.metadata["source_files"][0][1] == file_name.stat().st_size
+    assert SegmentedCorpus.load(store_path).metadata == corpus.metadata
+
+    (corpus_path / "001.txt").unlink()
+    corpus = load_segmented_corpus(tokenizer, str(corpus_path), store_path)
+    assert len(corpus) == len(SENTENCES) - 1
+    assert "001.txt" not in corpus.document_names
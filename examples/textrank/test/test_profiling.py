@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Created on Mon Jan 18 11:03:54 2021
+# Author:     zhuoyin94 <zhuoyin94@163.com>
+# Github:     https://github.com/MichaelYin1994
+
+import sys
+if ".." not in sys.path:
+    sys.path.append("..")
+
+from profiling import StageProfiler
+
+
+def test_stage_profiler():
+    events = []
+    profiler = StageProfiler(callbacks=[events.append])
+    with profiler.stage("graph"):
+        pass
+    with profiler.stage("graph"):
+        pass
+    profiler.add_count("vertices", 10)
+    profiler.add_count("vertices", 5)
+
+    report = profiler.report()
+    assert report["stages"]["graph"]["calls"] == 2
+    assert report["stages"]["graph"]["time"] >= 0
+    assert report["counts"] == {"vertices": 15}
+    assert [(item["type"], item["name"]) for item in events] == \
+        [("time", "graph"), ("time", "graph"),
+         ("count", "vertices"), ("count", "vertices")]
+
+    profiler.reset()
+    assert profiler.report() == {"stages": {}, "counts": {}}
+    assert len(profiler.callbacks) == 1
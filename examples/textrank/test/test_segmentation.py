@@ -6,13 +6,16 @@
 # Github:     https://github.com/MichaelYin1994
 
 import sys
+import itertools
 import unicodedata
 
+import pytest
 import pkuseg
 if ".." not in sys.path:
     sys.path.append("..")
 
-from segmentation import WordSegmentation
+from segmentation import WordSegmentation, get_pkuseg_model
+from vocabulary import Vocabulary
 
 SENTENCE_LIST = ["根据列车运行速度计算安全行进距离",
                  "数据平台和算法集市通过统一的数据总线和算法能力为上层智能智慧业务提供了全面的PaaS（平台即服务）服务",
@@ -112,5 +115,192 @@ def test_segment_paragraph():
     assert seg.segment_paragraph(PARAGRAPH) == expected
 
 
+def test_split_paragraph():
+    seg = WordSegmentation(delimiters=["。", "，", "……", "…", "\n"])
+    paragraph = "  交控科技，轨道星链……列车远程瞭望系统…智慧城轨。\n\n 天枢系统 "
+    expected = ["交控科技", "轨道星链", "列车远程瞭望系统", "智慧城轨", "天枢系统"]
+    assert seg.split_paragraph(paragraph) == expected
+
+    # 句子在原始段落中的位置
+    result = seg.split_paragraph(paragraph, is_return_offsets=True)
+    assert [sentence for sentence, _, _ in result] == expected
+    assert [paragraph[start:end] for _, start, end in result] == expected
+
+    paragraph = "ＰａａＳ平台？数据总线"
+    result = WordSegmentation().split_paragraph(
+        paragraph, is_return_offsets=True)
+    assert result == [("PaaS平台", 0, 6), ("数据总线", 7, 11)]
+
+    # NFKC将多个字符合并为一个时（组合字符、半角浊音符、谚文字母），之后的
+    # 位置不发生偏移
+    paragraph = "Cafe\u0301很好。第二句话。ｶﾞｷﾞ好。\u1112\u1161\u11ab。第三句。"
+    result = WordSegmentation(delimiters=["。"]).split_paragraph(
+        paragraph, is_return_offsets=True)
+    assert [sentence for sentence, _, _ in result] == \
+        ["Café很好", "第二句话", "ガギ好", "한", "第三句"]
+    for sentence, start, end in result:
+        assert unicodedata.normalize("NFKC", paragraph[start:end]) == sentence
+    assert paragraph[result[1][1]:result[1][2]] == "第二句话"
+
+
+def test_iter_stream_sentences():
+    seg = WordSegmentation(delimiters=["。", "，", "……", "、", "\n"])
+    paragraph = PARAGRAPH + "\n轨道星链……天枢系统\n\n" + PARAGRAPH
+    expected = seg.split_paragraph(paragraph)
+
+    for chunk_size in [1, 2, 3, 7, 64, len(paragraph)]:
+        chunks = [paragraph[i:i+chunk_size]
+                  for i in range(0, len(paragraph), chunk_size)]
+        assert list(seg.iter_stream_sentences(iter(chunks))) == expected
+
+    # 文本块的边界落在基字符与其组合字符之间时，二者应当一同归一化
+    paragraph = "Cafe\u0301\u0327很好。ｶﾞｷﾞ好。\u1112\u1161\u11ab。e\u0301。"
+    expected = seg.split_paragraph(paragraph)
+    assert expected == ["Caf\u0229\u0301很好", "ガギ好", "한", "é"]
+    for chunk_size in [1, 2, 3, 4, 5, len(paragraph)]:
+        chunks = [paragraph[i:i+chunk_size]
+                  for i in range(0, len(paragraph), chunk_size)]
+        assert list(seg.iter_stream_sentences(iter(chunks))) == expected
+    assert list(seg.iter_stream_sentences(
+        ["Cafe", "\u0301", "\u0327很好。\u1112", "\u1161", "\u11ab"])) == \
+        ["Caf\u0229\u0301很好", "한"]
+
+
+def test_segment_paragraph_views():
+    stop_words_vocab = ["的", "了", "在", "及"]
+    allow_word_tags = ["n", "v", "nr", "ns"]
+    seg = WordSegmentation(is_lower=False,
+                           is_use_stop_words=False,
+                           is_use_word_tags_filter=False,
+                           allow_word_tags=allow_word_tags,
+                           stop_words_vocab=stop_words_vocab)
+    views = seg.segment_paragraph_views(PARAGRAPH)
+
+    # 各视图应当与分别调用segment_paragraph的结果一致
+    assert views["no_filter"] == seg.segment_paragraph(PARAGRAPH)
+
+    expected = seg.segment_paragraph(
+        PARAGRAPH, is_lower=True, is_use_stop_words=True,
+        is_use_word_tags_filter=False)
+    assert views["no_stop_words"] == [item for item in expected if item]
+
+    expected = seg.segment_paragraph(
+        PARAGRAPH, is_lower=True, is_use_stop_words=True,
+        is_use_word_tags_filter=True)
+    assert views["all_filters"] == [item for item in expected if item]
+
+
+def test_filter_word_list():
+    word_list = [" 列车 ", "的", "CBTC", "", "  ", "系统", "The", "the"]
+    postag_list = ["n", "u", "nx", "w", "w", "n", "nx", "nx"]
+    seg = WordSegmentation(allow_word_tags=["n", "nx"],
+                           stop_words_vocab=["的 ", "the"])
+
+    # 一次扫描的清洗结果应当与依次执行各个步骤的结果一致
+    for is_lower in [False, True]:
+        for is_use_stop_words in [False, True]:
+            for is_use_word_tags_filter in [False, True]:
+                expected = [
+                    word.strip().lower() if is_lower else word.strip()
+                    for word, postag in zip(word_list, postag_list)
+                    if not is_use_word_tags_filter or postag in ["n", "nx"]]
+                expected = [word for word in expected if word]
+                if is_use_stop_words:
+                    expected = [word for word in expected
+                                if word not in ["的", "the"]]
+                assert seg._filter_word_list(
+                    word_list, postag_list, is_lower, is_use_stop_words,
+                    is_use_word_tags_filter) == expected
+    assert isinstance(seg.stop_words, frozenset)
+    assert seg.allow_word_tags == frozenset(["n", "nx"])
+
+
+def test_segment_paragraph_encoded():
+    seg = WordSegmentation(stop_words_vocab=["的", "了", "在", "及"])
+    vocabulary = Vocabulary()
+    documents = seg.segment_paragraph_encoded(PARAGRAPH, vocabulary)
+    views = seg.segment_paragraph_views(PARAGRAPH)
+
+    # 解码之后应当与segment_paragraph_views的结果一致
+    assert documents["no_filter"].to_word_lists(vocabulary) == \
+        views["no_filter"]
+    for name in ["no_stop_words", "all_filters"]:
+        assert documents[name].filter_empty().to_word_lists(vocabulary) == \
+            views[name]
+        assert len(documents[name]) == len(documents["no_filter"])
+
+
+def test_segment_corpus_encoded():
+    seg = WordSegmentation(stop_words_vocab=["的", "了", "在", "及"])
+    paragraph_list = [PARAGRAPH, "。".join(SENTENCE_LIST), PARAGRAPH]
+
+    # 重复的句子只被pkuseg切分一次
+    cut_sentences = []
+    cut = seg.seg.cut
+    seg._seg = type("CountingSeg", (), {"cut": lambda self, sentence: (
+        cut_sentences.append(sentence) or cut(sentence))})()
+
+    vocabulary = Vocabulary()
+    documents_list = seg.segment_corpus_encoded(paragraph_list, vocabulary)
+    assert len(cut_sentences) == len(set(cut_sentences))
+    assert set(cut_sentences) == set(itertools.chain.from_iterable(
+        seg.split_paragraph(paragraph) for paragraph in paragraph_list))
+
+    # 结果按位置分发回每一篇段落，与逐篇分词的结果一致
+    for paragraph, documents in zip(paragraph_list, documents_list):
+        views = seg.segment_paragraph_views(paragraph)
+        assert documents["no_filter"].to_word_lists(vocabulary) == \
+            views["no_filter"]
+        assert documents["all_filters"].filter_empty().to_word_lists(
+            vocabulary) == views["all_filters"]
+
+    # 全部命中缓存时不再调用pkuseg
+    n_cut = len(cut_sentences)
+    seg.segment_corpus_encoded(paragraph_list, Vocabulary())
+    assert len(cut_sentences) == n_cut
+
+
+def test_cut_sentences_file_mode(monkeypatch):
+    seg = WordSegmentation()
+    sentence_list = SENTENCE_LIST[:4] + ["换行\n句子"]
+
+    expected = [seg.seg.cut(sentence) for sentence in sentence_list]
+    results = seg._cut_sentences_file_mode(sentence_list, n_jobs=2)
+    assert [[tuple(item) for item in result] for result in results] == \
+        [[tuple(item) for item in result] for result in expected]
+
+    # 多进程文件模式与逐句切分的结果一致，且按原顺序返回
+    seg_file = WordSegmentation()
+    assert seg_file._cut_sentence_list(sentence_list * 2, n_jobs=2) == \
+        seg._cut_sentence_list(sentence_list * 2)
+
+    # pkuseg.test的输出行数与句子数目不一致时抛出异常，而非截断之后错位
+    def test_extra_line(input_path, output_path, **kwargs):
+        pkuseg_test(input_path, output_path, **kwargs)
+        with open(output_path, "a", encoding="utf-8") as f:
+            f.write("多余/n\n")
+
+    pkuseg_test = pkuseg.test
+    monkeypatch.setattr(pkuseg, "test", test_extra_line)
+    with pytest.raises(ValueError):
+        seg._cut_sentences_file_mode(sentence_list, n_jobs=2)
+
+
+def test_pkuseg_model_sharing():
+    seg_x = WordSegmentation(user_vocab=["交控科技", "轨道星链"])
+    seg_y = WordSegmentation(user_vocab=["轨道星链", "交控科技"],
+                             is_use_stop_words=True)
+    seg_z = WordSegmentation(user_vocab=["交控科技"])
+
+    # 模型延迟到第一次切分句子时载入
+    assert seg_x._seg is None
+    seg_x.segment_sentence(SENTENCE_LIST[2])
+    assert seg_x._seg is not None
+
+    assert seg_x.seg is seg_y.seg
+    assert seg_x.seg is not seg_z.seg
+    assert seg_z.seg is get_pkuseg_model(["交控科技"], postag=True)
+
+
 if __name__ == "__main__":
     test_segment_sentence_list()
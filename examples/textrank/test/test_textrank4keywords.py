@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Created on Wed Jan 6 10:21:37 2021
+# Author:     zhuoyin94 <zhuoyin94@163.com>
+# Github:     https://github.com/MichaelYin1994
+
+import sys
+import pytest
+import numpy as np
+if ".." not in sys.path:
+    sys.path.append("..")
+
+from cache import SQLiteCache
+from profiling import StageProfiler
+from segmentation import WordSegmentation
+from textrank4keywords import (MAX_SERIAL_BATCH_SIZE, TextRank4Keywords,
+                               get_result_cache_key)
+
+CORPUS = ["2020年10月21-23日，2020年“北京国际城市轨道交通展览会暨高峰论坛”在北京中国国际展览中心隆重举行。作为城市轨道交通信号系统的领军企业，交控科技股份有限公司（以下简称“交控科技”）携列车远程瞭望系统、天枢系统、智能列车乘客服务系统、无感改造、互联互通的CBTC系统、智慧管理、智慧培训等系统解决方案亮相，完整展示了智慧城轨的未来面貌，吸引大量业内专业人士及观众驻足观看交流。",
+          "数据平台和算法集市通过统一的数据总线和算法能力为上层智能智慧业务提供了全面的PaaS（平台即服务）服务。交控科技还推出了列车远程瞭望系统的视距延伸装置——轨道星链。",
+          "公司总裁助理夏夕盛进行了“智慧单轨运行系统的发展及展望”主题演讲。根据列车运行速度计算安全行进距离。"]
+
+
+def test_fit_predict_batch():
+    tokenizer = WordSegmentation(stop_words_vocab=["的", "了", "在"],
+                                 delimiters=["。", "，"])
+    textrank = TextRank4Keywords(tokenizer=tokenizer)
+
+    expected = [textrank.fit_predict(text)[:10] for text in CORPUS]
+    assert [textrank.fit_predict(text, top_k=10) for text in CORPUS] == \
+        expected
+    assert textrank.fit_predict_batch(CORPUS, n_jobs=1, top_k=10) == expected
+    assert textrank.fit_predict_batch(CORPUS, n_jobs=2, top_k=10) == expected
+
+    # 空白或只包含停用词的语料的结果为空列表，不影响同一批中的其余语料
+    texts = [CORPUS[0], "", CORPUS[1], "的。了。在。 \n"]
+    assert textrank.fit_predict("") == []
+    for n_jobs in [1, 2]:
+        assert textrank.fit_predict_batch(texts, n_jobs=n_jobs, top_k=10) == \
+            [expected[0], [], expected[1], []]
+
+    with pytest.raises(ValueError):
+        textrank.fit_predict_batch(CORPUS, n_jobs=0)
+
+
+def test_word_views():
+    tokenizer = WordSegmentation(stop_words_vocab=["的", "了", "在"])
+    textrank = TextRank4Keywords(tokenizer=tokenizer)
+    assert textrank.words_no_filter is None
+
+    # 分词结果由整数id按需解码，与segment_paragraph_views的结果一致
+    textrank.fit_predict(CORPUS[0])
+    views = tokenizer.segment_paragraph_views(CORPUS[0])
+    assert textrank.words_no_filter == views["no_filter"]
+    assert textrank.words_no_stop_words == views["no_stop_words"]
+    assert textrank.words_all_filters == views["all_filters"]
+
+    # 与原先的普通属性一样可以被赋值，下一次抽取时重新由分词结果解码
+    textrank.words_no_filter = [["A"]]
+    textrank.words_no_stop_words = []
+    textrank.words_all_filters = None
+    assert textrank.words_no_filter == [["A"]]
+    assert textrank.words_no_stop_words == []
+    assert textrank.words_all_filters is None
+    textrank.fit_predict(CORPUS[1])
+    assert textrank.words_no_filter == \
+        tokenizer.segment_paragraph_views(CORPUS[1])["no_filter"]
+
+
+def test_fit_predict_iter(tmp_path):
+    tokenizer = WordSegmentation(stop_words_vocab=["的", "了", "在"])
+    textrank = TextRank4Keywords(
+        tokenizer=tokenizer,
+        result_cache=SQLiteCache(str(tmp_path / "result.db")))
+    expected = [textrank.fit_predict(text)[:10] for text in CORPUS]
+    textrank.result_cache.clear()
+
+    # 输入为迭代器，结果按输入顺序逐个返回
+    for n_jobs in [1, 2]:
+        for max_pending in [1, 2, None]:
+            results = textrank.fit_predict_iter(
+                iter(CORPUS * 2), n_jobs=n_jobs, top_k=10,
+                max_pending=max_pending)
+            assert next(results) == expected[0]
+            assert list(results) == expected[1:] + expected
+    assert len(textrank.result_cache) == len(CORPUS)
+
+    # 串行时第一篇语料的结果无需等待max_pending篇语料读入
+    n_read = []
+
+    def iter_texts():
+        for i in range(64):
+            n_read.append(i)
+            yield CORPUS[i % len(CORPUS)]
+    results = textrank.fit_predict_iter(iter_texts(), top_k=10,
+                                        max_pending=64)
+    assert next(results) == expected[0]
+    assert len(n_read) <= MAX_SERIAL_BATCH_SIZE
+    assert len(list(results)) == 63
+
+    with pytest.raises(ValueError):
+        next(textrank.fit_predict_iter(CORPUS, n_jobs=0))
+
+
+def test_result_cache(tmp_path):
+    tokenizer = WordSegmentation(stop_words_vocab=["的", "了", "在"],
+                                 delimiters=["。", "，"])
+    expected = TextRank4Keywords(tokenizer=tokenizer).fit_predict(CORPUS[0])
+
+    path = str(tmp_path / "result_cache.db")
+    textrank = TextRank4Keywords(tokenizer=tokenizer,
+                                 result_cache=SQLiteCache(path))
+    assert textrank.fit_predict(CORPUS[0]) == expected
+    assert textrank.fit_predict(CORPUS[0]) == expected
+    assert textrank.result_cache.stats()["hits"] == 1
+
+    # 批量抽取只计算未命中缓存的语料
+    result = textrank.fit_predict_batch(CORPUS, top_k=5)
+    assert textrank.result_cache.stats()["misses"] == 1 + len(CORPUS)
+    textrank = TextRank4Keywords(tokenizer=tokenizer,
+                                 result_cache=SQLiteCache(path))
+    assert textrank.fit_predict_batch(CORPUS, n_jobs=2, top_k=5) == result
+    assert textrank.result_cache.stats()["hits"] == len(CORPUS)
+
+    # 分词器或算法参数不同时，缓存键不同
+    params = tokenizer.get_params()
+    key = get_result_cache_key(CORPUS[0], params, window_size=2)
+    assert key == get_result_cache_key(
+        CORPUS[0], dict(params, stop_words_vocab=["在", "了", "的"]),
+        window_size=2)
+    assert key != get_result_cache_key(CORPUS[0], params, window_size=3)
+    assert key != get_result_cache_key(
+        CORPUS[0], dict(params, stop_words_vocab=["的"]), window_size=2)
+    assert key != get_result_cache_key(CORPUS[1], params, window_size=2)
+
+
+def test_fit_predict_batch_shared_cache(tmp_path):
+    sentence_cache = SQLiteCache(str(tmp_path / "sentence_cache.db"))
+    tokenizer = WordSegmentation(stop_words_vocab=["的", "了", "在"],
+                                 delimiters=["。", "，"],
+                                 sentence_cache=sentence_cache)
+    textrank = TextRank4Keywords(tokenizer=tokenizer)
+
+    # 工作进程共享同一个分词结果缓存
+    expected = TextRank4Keywords(tokenizer=WordSegmentation(
+        stop_words_vocab=["的", "了", "在"], delimiters=["。", "，"])
+        ).fit_predict_batch(CORPUS, top_k=10)
+    assert textrank.fit_predict_batch(CORPUS, n_jobs=2, top_k=10) == expected
+    n_sentences = len({sentence for text in CORPUS
+                       for sentence in tokenizer.split_paragraph(text)})
+    assert len(sentence_cache) == n_sentences
+    assert textrank.fit_predict_batch(CORPUS, n_jobs=1, top_k=10) == expected
+    assert sentence_cache.stats()["hits"] == n_sentences
+
+
+def test_profiler():
+    tokenizer = WordSegmentation(stop_words_vocab=["的", "了", "在"],
+                                 delimiters=["。", "，"])
+    expected = TextRank4Keywords(tokenizer=tokenizer).fit_predict(CORPUS[0])
+
+    events = []
+    tokenizer = WordSegmentation(stop_words_vocab=["的", "了", "在"],
+                                 delimiters=["。", "，"])
+    textrank = TextRank4Keywords(
+        tokenizer=tokenizer, profiler=StageProfiler(callbacks=[events.append]))
+    assert tokenizer.profiler is textrank.profiler
+    assert textrank.fit_predict(CORPUS[0]) == expected
+
+    report = textrank.get_profile_report()
+    for name in ["split", "segmentation", "pkuseg_cut", "filter", "graph",
+                 "pagerank", "fit_predict"]:
+        assert report["stages"][name]["calls"] >= 1
+    assert report["counts"]["sentences"] == \
+        len(tokenizer.split_paragraph(CORPUS[0]))
+    assert report["counts"]["vertices"] == len(expected)
+    assert report["counts"]["pagerank_iterations"] >= 1
+    assert report["caches"]["sentence_cache"]["misses"] > 0
+    assert len(events) > 0
+
+    with pytest.raises(ValueError):
+        TextRank4Keywords(tokenizer=tokenizer).get_profile_report()
+
+
+def test_fit_predict_stream():
+    textrank = TextRank4Keywords(
+        tokenizer=WordSegmentation(stop_words_vocab=["的", "了", "在"]))
+    text = "".join(CORPUS)
+
+    for vertex_source in ["all_filters", "no_filter"]:
+        expected = textrank.fit_predict(text, vertex_source=vertex_source)
+        for chunk_size in [1, 16, len(text)]:
+            chunks = (text[i:i+chunk_size]
+                      for i in range(0, len(text), chunk_size))
+            result = textrank.fit_predict_stream(
+                chunks, vertex_source=vertex_source)
+
+            # 分数相同的词之间的顺序可能受浮点误差影响
+            result = dict(result)
+            assert len(result) == len(expected)
+            assert np.allclose([result[word] for word, _ in expected],
+                               [score for _, score in expected])
+    assert textrank.fit_predict_stream(iter([text]), top_k=5) == \
+        textrank.fit_predict_stream(iter([text]))[:5]
+    assert textrank.fit_predict_stream(iter(["", " \n", "的。了。"])) == []
+
+
+def test_partial_fit_predict():
+    textrank = TextRank4Keywords(
+        tokenizer=WordSegmentation(stop_words_vocab=["的", "了", "在"]))
+    with pytest.raises(ValueError):
+        textrank.predict()
+
+    # 增量累积全部语料之后的结果与一次性处理全部语料的结果一致
+    for text in CORPUS:
+        textrank.partial_fit(text)
+        result = textrank.predict(top_k=5)
+        assert len(result) == 5
+    expected = textrank.fit_predict("".join(CORPUS))
+    for is_warm_start, atol in [(True, 1e-4), (False, 1e-12)]:
+        result = dict(textrank.predict(is_warm_start=is_warm_start))
+        assert len(result) == len(expected)
+        assert np.allclose([result[word] for word, _ in expected],
+                           [score for _, score in expected], atol=atol)
+
+    with pytest.raises(ValueError):
+        textrank.partial_fit(CORPUS[0], window_size=3)
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Created on Fri Jan  8 15:12:40 2021
+# Author:     zhuoyin94 <zhuoyin94@163.com>
+# Github:     https://github.com/MichaelYin1994
+
+import sys
+if ".." not in sys.path:
+    sys.path.append("..")
+
+from textrank4sentence import TextRank4Sentence
+
+PARAGRAPH = "2020年10月21-23日，2020年“北京国际城市轨道交通展览会暨高峰论坛”在北京中国国际展览中心隆重举行。作为城市轨道交通信号系统的领军企业，交控科技股份有限公司（以下简称“交控科技”）携列车远程瞭望系统、天枢系统、智能列车乘客服务系统、无感改造、互联互通的CBTC系统、智慧管理、智慧培训等系统解决方案亮相。交控科技还推出了列车远程瞭望系统的视距延伸装置——轨道星链。"
+
+
+def test_fit_predict():
+    for similarity in ["jaccard", "lcss", "edit"]:
+        textrank = TextRank4Sentence(similarity=similarity,
+                                     top_k_neighbors=3)
+        key_sentences = textrank.fit_predict(PARAGRAPH)
+
+        assert len(key_sentences) == len(textrank.sentences)
+        assert sorted(sentence for sentence, _ in key_sentences) == \
+            sorted(textrank.sentences)
+        scores = [score for _, score in key_sentences]
+        assert scores == sorted(scores, reverse=True)
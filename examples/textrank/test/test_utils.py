@@ -9,14 +9,31 @@ import sys
 import random
 import pytest
 import numpy as np
+from scipy import sparse
 if ".." not in sys.path:
     sys.path.append("..")
 
 from utils import (get_word_pair,
                    compute_jaccard_similarity,
+                   compute_jaccard_similarity_matrix,
+                   compute_jaccard_similarity_lsh,
+                   compute_minhash_signatures,
                    compute_edit_similarity,
+                   compute_edit_similarity_many,
                    compute_lcss_similarity,
-                   compute_word_scores)
+                   compute_lcss_similarity_many,
+                   compute_pagerank,
+                   compute_pagerank_batch,
+                   get_top_k_index,
+                   compute_word_scores,
+                   build_similarity_matrix,
+                   compute_sentence_scores,
+                   compute_word_scores_sp,
+                   compute_word_scores_encoded,
+                   compute_word_scores_encoded_batch,
+                   build_cooccurrence_edges,
+                   build_cooccurrence_matrix)
+from vocabulary import Vocabulary, EncodedDocument
 
 SENTENCE_LIST = ["根据列车运行速度计算安全行进距离",
                  "数据平台和算法集市通过统一的数据总线和算法能力为上层智能智慧业务提供了全面的PaaS（平台即服务）服务",
@@ -54,6 +71,33 @@ def test_edit_similarity():
         compute_edit_similarity(text_x, text_y)
 
 
+def test_edit_similarity_many():
+    text_x = ["A", "A", "B"]
+    text_y_list = [["A"], ["A", "A", "B"], ["B", "A", "C", "A"], []]
+    expected = [1 - 2 / 4, 1 - 0 / 6, 1 - 3 / 7, 1 - 3 / 3]
+    result = compute_edit_similarity_many(text_x, text_y_list)
+    assert isinstance(result, np.ndarray)
+    assert result.tolist() == expected
+
+    # 两个空列表之间的相似度为0
+    assert compute_edit_similarity([], []) == 0
+    assert compute_edit_similarity_many([], [["A"], []]).tolist() == [0, 0]
+
+    # 批量计算的结果应当与逐个计算的结果一致
+    text_x = ["A", "B", "C", "D"] * np.random.randint(low=10, high=100)
+    random.shuffle(text_x)
+    text_y_list = []
+    for _ in range(20):
+        text_y = ["A", "B", "C", "E"] * np.random.randint(low=0, high=100)
+        random.shuffle(text_y)
+        text_y_list.append(text_y)
+
+    expected = [compute_edit_similarity(text_x, text_y)
+                for text_y in text_y_list]
+    result = compute_edit_similarity_many(text_x, text_y_list)
+    assert result.tolist() == expected
+
+
 def test_lcss_similarity():
     # LCSS相似度正确性测试
     text_x = ["A", "A", "B", "C", "D"]
@@ -99,6 +143,31 @@ def test_lcss_similarity():
         compute_lcss_similarity(text_x, text_y)
 
 
+def test_lcss_similarity_many():
+    text_x = ["A", "A", "B", "C", "D"]
+    text_y_list = [["A", "B", "C"], ["A", "B", "C", "D"], ["A"], [],
+                   ["A", "A"], ["E", "F", "G", "A"]]
+    expected = [3 / 3, 4 / 4, 1 / 1, 0, 2 / 2, 0]
+    result = compute_lcss_similarity_many(text_x, text_y_list, max_pos_diff=1)
+    assert isinstance(result, np.ndarray)
+    assert result.tolist() == expected
+
+    # 批量计算的结果应当与逐个计算的结果一致
+    for max_pos_diff in [0, 1, 3, 50]:
+        text_x = ["A", "B", "C", "D"] * np.random.randint(low=1, high=20)
+        random.shuffle(text_x)
+        text_y_list = []
+        for _ in range(20):
+            text_y = ["A", "B", "C", "E"] * np.random.randint(low=0, high=20)
+            random.shuffle(text_y)
+            text_y_list.append(text_y)
+
+        expected = [compute_lcss_similarity(text_x, text_y, max_pos_diff)
+                    for text_y in text_y_list]
+        result = compute_lcss_similarity_many(text_x, text_y_list, max_pos_diff)
+        assert result.tolist() == expected
+
+
 def test_jaccard_similarity():
     # jaccard相似度正确性测试
     text_x = ["A", "A", "B", "C", "D"]
@@ -117,6 +186,39 @@ def test_jaccard_similarity():
     assert compute_jaccard_similarity(text_x, text_y) == expected
 
 
+def test_jaccard_similarity_matrix():
+    text_list = [["A", "A", "B", "C", "D"], ["A", "B", "F"], ["E"], [],
+                 ["D", "C", "B", "A"]]
+    result = compute_jaccard_similarity_matrix(text_list).toarray()
+    for i, text_x in enumerate(text_list):
+        for j, text_y in enumerate(text_list):
+            assert result[i, j] == compute_jaccard_similarity(text_x, text_y)
+
+    result = compute_jaccard_similarity_matrix(text_list, threshold=0.5)
+    assert result.nnz == 6
+    assert result[0, 4] == 1 and result[0, 1] == 0
+
+
+def test_jaccard_similarity_lsh():
+    text_list = []
+    for _ in range(200):
+        text_list.append([str(i) for i in np.random.randint(0, 10000, 30)])
+    # 构造近似重复的句子
+    for text in text_list[:20]:
+        text_list.append(text[:28] + ["A", "B"])
+
+    signatures = compute_minhash_signatures(text_list, n_permutations=64)
+    assert signatures.shape == (len(text_list), 64)
+
+    result = compute_jaccard_similarity_lsh(text_list, threshold=0.6)
+    n_found = sum(result[i, 200 + i] > 0 for i in range(20))
+    assert n_found >= 15
+    assert np.allclose(result.diagonal(), 1)
+
+    result = compute_jaccard_similarity_lsh([[], ["A"]]).toarray()
+    assert result.tolist() == [[0, 0], [0, 1]]
+
+
 def test_get_word_pair():
     text = ["A", "B", "F", "C"]
     expected = [("A", "B"), ("B", "F"),
@@ -147,6 +249,57 @@ def test_get_word_pair():
         list(get_word_pair(text, window_size=1.2))
 
 
+def test_build_cooccurrence_matrix():
+    word_lists = [[int(i) for i in np.random.randint(0, 30, size)]
+                  for size in [1, 2, 5, 40, 0, 17]]
+    token_ids = [np.array(word_list, dtype=np.int64)
+                 for word_list in word_lists]
+
+    for window_size in [1, 2, 3, 6]:
+        # 与逐个生成词对的结果一致
+        expected_binary = np.zeros((30, 30))
+        expected_count = np.zeros((30, 30))
+        for word_list in word_lists:
+            if not word_list:
+                continue
+            for shift in range(1, max(window_size, 2) + 1):
+                for x, y in zip(word_list, word_list[shift:]):
+                    expected_binary[x, y] = expected_binary[y, x] = 1
+                    expected_count[x, y] += 1
+                    if x != y:
+                        expected_count[y, x] += 1
+        pairs = {tuple(sorted(pair)) for word_list in word_lists if word_list
+                 for pair in get_word_pair(word_list, window_size)}
+
+        rows, cols, weights = build_cooccurrence_edges(
+            token_ids, window_size)
+        assert set(zip(rows.tolist(), cols.tolist())) == pairs
+        assert len(rows) == len(pairs) and np.all(weights == 1)
+
+        result = build_cooccurrence_matrix(token_ids, 30, window_size)
+        assert sparse.issparse(result)
+        assert np.array_equal(result.toarray(), expected_binary)
+        result = build_cooccurrence_matrix(token_ids, 30, window_size,
+                                           edge_weight="count",
+                                           is_sparse=False)
+        assert np.array_equal(result, expected_count)
+
+    # 按距离衰减的权重
+    result = build_cooccurrence_matrix([np.array([0, 1, 0])], 2, 2,
+                                       edge_weight="distance", is_sparse=False)
+    assert np.allclose(result, [[0.5, 2], [2, 0]])
+
+    # 未登录词（编号为-1）不参与构图
+    result = build_cooccurrence_matrix([np.array([0, 1, 2])], 2, 2,
+                                       vertex_index=np.array([0, -1, 1]))
+    assert np.array_equal(result.toarray(), [[0, 1], [1, 0]])
+
+    with pytest.raises(ValueError):
+        build_cooccurrence_edges(token_ids, 2, edge_weight="cosine")
+    with pytest.raises(TypeError):
+        build_cooccurrence_edges([["A", "B"]], 2)
+
+
 def test_compute_word_scores():
     with pytest.raises(ValueError):
         compute_word_scores(vertex_source=None,
@@ -173,3 +326,304 @@ def test_compute_word_scores():
                               edge_source=text_y,
                               window_size=2,
                               pagerank_config={"alpha": 0.8}))
+
+    word_scores, info = compute_word_scores(vertex_source=text_x,
+                                            edge_source=text_y,
+                                            pagerank_config={"alpha": 0.8},
+                                            is_return_info=True)
+    assert len(word_scores) == 15
+    assert info["is_converged"]
+
+
+def test_compute_pagerank():
+    adjacent_mat = (np.random.rand(50, 50) > 0.8).astype(float)
+    adjacent_mat = np.maximum(adjacent_mat, adjacent_mat.T)
+    adjacent_mat[:5, :] = 0
+    adjacent_mat[:, :5] = 0
+
+    scores, info = compute_pagerank(adjacent_mat, alpha=0.8)
+    assert np.isclose(scores.sum(), 1)
+    assert info["is_converged"] and 0 < info["n_iter"] <= 100
+    assert info["residual"] < 50 * 1e-6
+
+    # 稠密矩阵与稀疏矩阵的计算结果一致
+    scores_sp, info_sp = compute_pagerank(sparse.csr_matrix(adjacent_mat),
+                                          alpha=0.8)
+    assert np.allclose(scores, scores_sp)
+    assert info_sp["n_iter"] == info["n_iter"]
+
+    # 未收敛时返回最后一次迭代的结果
+    _, info = compute_pagerank(adjacent_mat, max_iter=2, tol=1e-12)
+    assert not info["is_converged"] and info["n_iter"] == 2
+
+    # 前top_k个结点稳定之后提前停止，其顺序与收敛之后的结果一致
+    _, info_top_k = compute_pagerank(adjacent_mat, alpha=0.8, top_k=5,
+                                     tol=1e-12)
+    assert info_top_k["stop_reason"] == "top_k"
+    assert not info_top_k["is_converged"]
+    _, info_full = compute_pagerank(adjacent_mat, alpha=0.8, tol=1e-12)
+    assert info_top_k["n_iter"] < info_full["n_iter"]
+    scores_top_k, _ = compute_pagerank(adjacent_mat, alpha=0.8, top_k=5,
+                                       n_stable_iter=5)
+    assert np.array_equal(get_top_k_index(scores_top_k, 5),
+                          get_top_k_index(scores, 5))
+
+    # 超时之后返回当前最优的结果
+    scores_time, info_time = compute_pagerank(adjacent_mat, max_time=0.0)
+    assert info_time["stop_reason"] == "max_time"
+    assert info_time["n_iter"] == 1 and np.isclose(scores_time.sum(), 1)
+    with pytest.raises(ValueError):
+        compute_pagerank(adjacent_mat, top_k=0)
+    with pytest.raises(ValueError):
+        compute_pagerank(adjacent_mat, max_iter=0)
+
+    # 与networkx的计算结果一致（networkx为可选依赖）
+    nx = pytest.importorskip("networkx")
+    expected = nx.pagerank(nx.from_numpy_array(adjacent_mat), alpha=0.8)
+    assert np.allclose(scores, [expected[i] for i in range(50)])
+
+
+def test_compute_pagerank_batch():
+    adjacent_mats = []
+    for n_vertex in [50, 3, 0, 120, 1, 20]:
+        adjacent_mat = (np.random.rand(n_vertex, n_vertex) > 0.8).astype(float)
+        adjacent_mat = np.maximum(adjacent_mat, adjacent_mat.T)
+        adjacent_mat[:n_vertex // 10, :] = 0
+        adjacent_mat[:, :n_vertex // 10] = 0
+        adjacent_mats.append(adjacent_mat)
+    adjacent_mats[3] = sparse.csr_matrix(adjacent_mats[3])
+
+    # 每个图的分数与收敛信息与单独调用compute_pagerank的结果一致
+    for config in [{"alpha": 0.8}, {"alpha": 0.85, "max_iter": 5,
+                                    "tol": 1e-12},
+                   {"top_k": 5}, {"top_k": 2, "n_stable_iter": 1},
+                   {"top_k": 200, "tol": 1e-12}]:
+        scores_list, info_list = compute_pagerank_batch(adjacent_mats,
+                                                        **config)
+        assert len(scores_list) == len(info_list) == len(adjacent_mats)
+        for adjacent_mat, scores, info in zip(adjacent_mats, scores_list,
+                                              info_list):
+            expected_scores, expected_info = compute_pagerank(adjacent_mat,
+                                                              **config)
+            assert np.allclose(scores, expected_scores)
+            assert info["n_iter"] == expected_info["n_iter"]
+            assert info["is_converged"] == expected_info["is_converged"]
+            assert np.isclose(info["residual"], expected_info["residual"])
+            assert info["stop_reason"] == expected_info["stop_reason"]
+    assert compute_pagerank_batch([]) == ([], [])
+
+    _, info_list = compute_pagerank_batch(adjacent_mats, max_time=0.0)
+    assert [info["n_iter"] for info in info_list] == [1, 1, 0, 1, 1, 1]
+    assert info_list[0]["stop_reason"] == "max_time"
+
+    # max_iter小于1时与compute_pagerank一致地抛出异常
+    with pytest.raises(ValueError):
+        compute_pagerank_batch(adjacent_mats, max_iter=0)
+
+
+def test_get_top_k_index():
+    scores = np.array([0.1, 0.3, 0.2, 0.3, 0.05, 0.2])
+    assert get_top_k_index(scores).tolist() == [1, 3, 2, 5, 0, 4]
+    for top_k in range(1, 8):
+        assert get_top_k_index(scores, top_k).tolist() == \
+            [1, 3, 2, 5, 0, 4][:top_k]
+
+    # 与sorted的稳定排序一致
+    scores = np.random.randint(0, 5, 100).astype(float)
+    expected = [index for index, _ in sorted(
+        enumerate(scores), key=lambda item: item[1], reverse=True)]
+    assert get_top_k_index(scores, 10).tolist() == expected[:10]
+    with pytest.raises(ValueError):
+        get_top_k_index(scores, 0)
+
+
+def test_compute_word_scores_sp():
+    with pytest.raises(ValueError):
+        compute_word_scores_sp(vertex_source=None,
+                               edge_source=None)
+
+    # 稀疏PageRank与稠密PageRank的结果应当一致
+    text_x = [[str(i) for i in range(15)] * 2]
+    text_y = []
+    for i in range(5):
+        text_tmp = [str(i) for i in range(100)] * np.random.randint(low=20, high=100)
+        random.shuffle(text_tmp)
+        text_y.append(text_tmp)
+    text_y.append([str(i) for i in range(20, 30)])
+
+    for window_size in [2, 3, 5]:
+        expected = compute_word_scores(vertex_source=text_x,
+                                       edge_source=text_y,
+                                       window_size=window_size,
+                                       pagerank_config={"alpha": 0.8})
+        result = compute_word_scores_sp(vertex_source=text_x,
+                                        edge_source=text_y,
+                                        window_size=window_size,
+                                        pagerank_config={"alpha": 0.8})
+
+        expected_words = [word for word, _ in expected]
+        expected_scores = np.array([score for _, score in expected])
+        result_scores = dict(result)
+        assert len(result) == len(expected)
+        assert np.allclose([result_scores[word] for word in expected_words],
+                           expected_scores)
+
+        # top_k只返回前top_k个词，与全部排序之后截取的结果一致
+        for compute, full_result in [(compute_word_scores, expected),
+                                     (compute_word_scores_sp, result)]:
+            assert compute(vertex_source=text_x, edge_source=text_y,
+                           window_size=window_size,
+                           pagerank_config={"alpha": 0.8},
+                           top_k=7) == full_result[:7]
+
+    # 含有悬挂结点（无边结点）的图
+    words = [[word for word in sentence] for sentence in SENTENCE_LIST]
+    expected = compute_word_scores(vertex_source=words,
+                                   edge_source=words[:2],
+                                   window_size=2)
+    result = compute_word_scores_sp(vertex_source=words,
+                                    edge_source=words[:2],
+                                    window_size=2)
+    assert [word for word, _ in result] == [word for word, _ in expected]
+    assert np.allclose([score for _, score in result],
+                       [score for _, score in expected])
+
+
+def test_compute_word_scores_encoded():
+    text_x = [[str(i) for i in range(15)] * 2, []]
+    text_y = []
+    for i in range(5):
+        text_tmp = [str(i) for i in range(100)] * np.random.randint(low=2, high=10)
+        random.shuffle(text_tmp)
+        text_y.append(text_tmp)
+
+    vocabulary = Vocabulary()
+    vertex_document = EncodedDocument.from_word_lists(text_x, vocabulary)
+    edge_document = EncodedDocument.from_word_lists(text_y, vocabulary)
+    with pytest.raises(ValueError):
+        compute_word_scores_encoded(
+            EncodedDocument.from_word_lists([[]], vocabulary),
+            edge_document, vocabulary)
+
+    # 整数id编码的结果应当与稀疏PageRank的结果一致
+    for window_size in [2, 3, 5]:
+        expected = compute_word_scores_sp(vertex_source=text_x,
+                                          edge_source=text_y,
+                                          window_size=window_size)
+        result = compute_word_scores_encoded(vertex_document, edge_document,
+                                             vocabulary,
+                                             window_size=window_size)
+        assert [word for word, _ in result] == \
+            [word for word, _ in expected]
+        assert np.allclose([score for _, score in result],
+                           [score for _, score in expected])
+
+
+def test_compute_word_scores_encoded_batch():
+    vocabulary = Vocabulary()
+    vertex_documents, edge_documents = [], []
+    for n_words in [15, 100, 3, 40]:
+        word_lists = [[str(word) for word in
+                       np.random.randint(0, n_words, 30)] for _ in range(4)]
+        vertex_documents.append(
+            EncodedDocument.from_word_lists(word_lists[:2], vocabulary))
+        edge_documents.append(
+            EncodedDocument.from_word_lists(word_lists, vocabulary))
+
+    for edge_weight in ["binary", "distance"]:
+        result, info_list = compute_word_scores_encoded_batch(
+            vertex_documents, edge_documents, vocabulary, window_size=3,
+            edge_weight=edge_weight, is_return_info=True)
+        for i, (vertex_document, edge_document) in enumerate(
+                zip(vertex_documents, edge_documents)):
+            expected, info = compute_word_scores_encoded(
+                vertex_document, edge_document, vocabulary, window_size=3,
+                edge_weight=edge_weight, is_return_info=True)
+            assert [word for word, _ in result[i]] == \
+                [word for word, _ in expected]
+            assert np.allclose([score for _, score in result[i]],
+                               [score for _, score in expected])
+            assert info_list[i]["n_iter"] == info["n_iter"]
+
+    # top_k只返回前top_k个词
+    result = compute_word_scores_encoded_batch(
+        vertex_documents, edge_documents, vocabulary, top_k=5)
+    for i, (vertex_document, edge_document) in enumerate(
+            zip(vertex_documents, edge_documents)):
+        expected = compute_word_scores_encoded(vertex_document,
+                                               edge_document, vocabulary)
+        assert result[i] == expected[:5]
+
+    with pytest.raises(ValueError):
+        compute_word_scores_encoded_batch(vertex_documents,
+                                          edge_documents[1:], vocabulary)
+
+    # 空文档不参与迭代，结果为空列表，其余文档的结果不受影响
+    empty_document = EncodedDocument.from_word_lists([[]], vocabulary)
+    result, info_list = compute_word_scores_encoded_batch(
+        [vertex_documents[0], empty_document, vertex_documents[1]],
+        [edge_documents[0], edge_documents[0], empty_document], vocabulary,
+        is_return_info=True)
+    assert result == [compute_word_scores_encoded(
+        vertex_documents[0], edge_documents[0], vocabulary), [], []]
+    assert info_list[1]["n_iter"] == 0 and info_list[0]["n_iter"] > 0
+    assert compute_word_scores_encoded_batch(
+        [empty_document], [empty_document], vocabulary) == [[]]
+
+
+def test_similarity_encoded():
+    text_list = [["A", "B", "C"], ["A", "B", "D"], ["E", "F"],
+                 ["A", "E", "F", "G"], [], ["Z", "A"]]
+    vocabulary = Vocabulary()
+    document = EncodedDocument.from_word_lists(text_list, vocabulary)
+    assert document.to_word_lists(vocabulary) == text_list
+
+    # 整数id数组的快速路径应当与词列表的结果一致
+    for similarity in ["jaccard", "lcss", "edit"]:
+        expected = build_similarity_matrix(text_list, similarity).toarray()
+        result = build_similarity_matrix(document, similarity).toarray()
+        assert np.allclose(result, expected)
+
+    assert np.allclose(
+        compute_edit_similarity_many(document[0], list(document)),
+        compute_edit_similarity_many(text_list[0], text_list))
+    assert np.allclose(compute_minhash_signatures(document),
+                       compute_minhash_signatures(text_list))
+
+
+def test_build_similarity_matrix():
+    text_list = [["A", "B", "C"], ["A", "B", "D"], ["E", "F"],
+                 ["A", "E", "F", "G"], []]
+
+    for similarity, compute_similarity in [
+            ("jaccard", compute_jaccard_similarity),
+            ("lcss", compute_lcss_similarity),
+            ("edit", compute_edit_similarity)]:
+        result = build_similarity_matrix(text_list, similarity).toarray()
+        for i, text_x in enumerate(text_list):
+            for j, text_y in enumerate(text_list):
+                expected = 0 if i == j else \
+                    compute_similarity(text_x, text_y)
+                assert np.isclose(result[i, j], expected)
+
+    # 依据相似度阈值与邻居数目剪枝
+    result = build_similarity_matrix(text_list, "jaccard",
+                                     similarity_threshold=0.3)
+    assert result.nnz == 4
+    result = build_similarity_matrix(text_list, "edit", top_k_neighbors=1)
+    assert (result != result.T).nnz == 0
+    assert result[0, 1] > 0 and result[2, 3] > 0 and result[0, 2] == 0
+
+    with pytest.raises(ValueError):
+        build_similarity_matrix(text_list, "cosine")
+
+
+def test_compute_sentence_scores():
+    with pytest.raises(ValueError):
+        compute_sentence_scores([])
+
+    text_list = [["A", "B", "C"], ["A", "B", "D"], ["A", "B"], ["E", "F"]]
+    result = compute_sentence_scores(text_list, similarity="jaccard")
+    assert len(result) == len(text_list)
+    assert np.isclose(sum(score for _, score in result), 1)
+    assert result[-1][0] == 3
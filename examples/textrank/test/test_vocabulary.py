@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Created on Wed Jan 13 10:42:09 2021
+# Author:     zhuoyin94 <zhuoyin94@163.com>
+# Github:     https://github.com/MichaelYin1994
+
+import sys
+import pytest
+import numpy as np
+if ".." not in sys.path:
+    sys.path.append("..")
+
+from vocabulary import Vocabulary, EncodedDocument
+
+
+def test_vocabulary():
+    vocabulary = Vocabulary(["列车", "系统"])
+    assert len(vocabulary) == 2 and "列车" in vocabulary
+
+    token_ids = vocabulary.encode(["系统", "智慧", "列车", "智慧"])
+    assert token_ids.dtype == np.int32
+    assert token_ids.tolist() == [1, 2, 0, 2]
+    assert vocabulary.decode(token_ids) == ["系统", "智慧", "列车", "智慧"]
+
+    # 不加入词表时，未登录词被编码为-1
+    assert vocabulary.encode(["交通", "系统"], is_add=False).tolist() == [-1, 1]
+    assert len(vocabulary) == 3
+    assert len(vocabulary.encode([])) == 0
+
+
+def test_encoded_document():
+    word_lists = [["A", "B"], [], ["B", "C", "A"], []]
+    vocabulary = Vocabulary()
+    document = EncodedDocument.from_word_lists(word_lists, vocabulary)
+
+    assert len(document) == 4 and document.n_tokens == 5
+    assert document.sentence_offsets.tolist() == [0, 2, 2, 5, 5]
+    assert document[2].tolist() == [1, 2, 0]
+    assert document[-1].tolist() == []
+    assert [item.tolist() for item in document] == [[0, 1], [], [1, 2, 0], []]
+    assert document.to_word_lists(vocabulary) == word_lists
+    assert document.filter_empty().to_word_lists(vocabulary) == \
+        [["A", "B"], ["B", "C", "A"]]
+
+    with pytest.raises(IndexError):
+        document[4]
+    with pytest.raises(ValueError):
+        EncodedDocument([0, 1, 2], [0, 2])
@@ -10,8 +10,95 @@
 本模块(textrank.textrank4keywords)用于抽取具体文本中的关键词项。
 """
 
+import os
+import json
+import time
+import hashlib
+import itertools
+import multiprocessing
+from collections import deque
+from functools import partial
+
+from cache import SQLiteCache
+from graph import CooccurrenceGraph
 from segmentation import WordSegmentation
-from utils import compute_word_scores
+from utils import (compute_word_scores_encoded,
+                   compute_word_scores_encoded_batch)
+from vocabulary import Vocabulary
+
+# 工作进程内的TextRank4Keywords实例，由_init_worker负责初始化
+_WORKER_TEXTRANK = None
+
+# 串行的fit_predict_iter每一批的最大语料数目：批内重复的句子只切分一次，而第一篇
+# 语料的结果至多等待这么多篇语料处理完毕
+MAX_SERIAL_BATCH_SIZE = 8
+
+
+def _init_worker(tokenizer_params, sentence_cache=None):
+    """进程池的初始化函数，每个工作进程只构建一次分词器与pkuseg模型。
+
+    sentence_cache为可跨进程共享的缓存（如SQLiteCache）时，所有工作进程读写同一个
+    分词结果缓存。
+    """
+    global _WORKER_TEXTRANK
+    _WORKER_TEXTRANK = TextRank4Keywords(
+        tokenizer=WordSegmentation(sentence_cache=sentence_cache,
+                                   **tokenizer_params))
+
+
+def _fit_predict_worker(text, top_k=None, **kwargs):
+    """在工作进程中抽取text的关键词，只返回前top_k个结果以减少进程间通信。"""
+    return _WORKER_TEXTRANK.fit_predict(text, top_k=top_k, **kwargs)
+
+
+def _get_view_names(vertex_source, edge_source):
+    """返回vertex_source与edge_source对应的分词视图的名称。"""
+    vertex_view = "all_filters" if vertex_source == "all_filters" \
+        else "no_filter"
+    edge_view = "no_stop_words" if edge_source == "no_stop_words" \
+        else "no_filter"
+    return vertex_view, edge_view
+
+
+def _iter_batches(iterable, batch_size):
+    """将iterable按顺序切分为长度不超过batch_size的列表。"""
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def get_result_cache_key(text, tokenizer_params, **kwargs):
+    """计算抽取结果的缓存键：语料、分词器参数与算法参数的SHA-256摘要。
+
+    @Parameters:
+    ----------
+        text: {str-like}
+            需要抽取关键词的语料。
+        tokenizer_params: {dict-like}
+            分词器的参数字典，见WordSegmentation.get_params。
+        **kwargs:
+            影响抽取结果的其他参数，例如window_size与pagerank_config。
+
+    @Returns:
+    ----------
+        十六进制字符串形式的摘要。
+    """
+    params = dict(tokenizer_params, **kwargs)
+
+    # 停用词表、用户词典与词性表与顺序无关
+    for name in ["stop_words_vocab", "allow_word_tags", "user_vocab"]:
+        if isinstance(params.get(name), (list, tuple, set)):
+            params[name] = sorted(set(params[name]))
+
+    digest = hashlib.sha256(json.dumps(
+        params, sort_keys=True, ensure_ascii=False, default=str).encode())
+    digest.update(b"\0")
+    digest.update(text.encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
 
 # TODO(zhuoyin94@163.com): 调用sklearn.utils的API对输入类型进行检测，完善异常处理
 class TextRank4Keywords():
@@ -21,6 +108,14 @@ class TextRank4Keywords():
     ----------
         tokenizer: {object-like}
             WordSegmentation类型的分词器。
+        result_cache: {object-like}
+            抽取结果的缓存，例如cache.SQLiteCache或cache.LRUCache，默认为None，
+            即不缓存。缓存键由get_result_cache_key计算，分词器或算法参数改变时
+            自动失效。
+        profiler: {object-like}
+            StageProfiler类型的分析器，记录分句、pkuseg切分、清洗、构图与PageRank
+            迭代各阶段的耗时与计数。若分词器未指定分析器，则与分词器共享。默认为
+            None，即不记录。多进程批量抽取时只记录主进程中的计算。
 
     @Attributes:
     ----------
@@ -30,16 +125,29 @@ class TextRank4Keywords():
             滤除停用词后的分词后的语料。
         self.words_all_filters:
             依据词性与停用词进行清洗后的分词结果。
+        self.vocabulary:
+            最近一次fit_predict构建的Vocabulary词表。
+        self.documents:
+            {视图名称: EncodedDocument}的字典，即以整数id表示的分词结果，
+            self.words_*由其按需解码得到。命中结果缓存时为None。self.words_*
+            也可以被直接赋值，赋值的结果在下一次抽取关键词之前保持有效。
+        self.graph:
+            增量模式（partial_fit）下持续累积的CooccurrenceGraph词共现图。
 
     @References:
     ----------
     [1] https://github.com/letiantian/TextRank4ZH
     [2] https://github.com/lancopku/pkuseg-python
     """
-    def __init__(self, tokenizer=None):
-        self.words_no_filter = None
-        self.words_no_stop_words = None
-        self.words_all_filters = None
+    def __init__(self, tokenizer=None, result_cache=None, profiler=None):
+        self.result_cache = result_cache
+        self.profiler = profiler
+        self.vocabulary = None
+        self.documents = None
+        self.graph = None
+
+        # 被直接赋值的self.words_*：{视图名称: 分词结果}，每次抽取时清空
+        self._assigned_views = {}
 
         if tokenizer is None:
             self.tokenizer = WordSegmentation(is_lower=True,
@@ -47,12 +155,56 @@ class TextRank4Keywords():
                                               is_use_word_tags_filter=False)
         else:
             self.tokenizer = tokenizer
+        if profiler is not None and self.tokenizer.profiler is None:
+            self.tokenizer.profiler = profiler
+
+    def _decode_view(self, view_name):
+        """将self.documents中的视图解码为list[list[str]]类型的分词结果，
+        与segment_paragraph_views的结果一致。"""
+        if view_name in self._assigned_views:
+            return self._assigned_views[view_name]
+        if self.documents is None:
+            return None
+        document = self.documents[view_name]
+        if view_name != "no_filter":
+            document = document.filter_empty()
+        return document.to_word_lists(self.vocabulary)
+
+    def _assign_view(self, view_name, word_lists):
+        """直接为self.words_*赋值，之后的抽取会重新由self.documents解码。"""
+        self._assigned_views[view_name] = word_lists
+
+    @property
+    def words_no_filter(self):
+        return self._decode_view("no_filter")
+
+    @words_no_filter.setter
+    def words_no_filter(self, word_lists):
+        self._assign_view("no_filter", word_lists)
+
+    @property
+    def words_no_stop_words(self):
+        return self._decode_view("no_stop_words")
+
+    @words_no_stop_words.setter
+    def words_no_stop_words(self, word_lists):
+        self._assign_view("no_stop_words", word_lists)
+
+    @property
+    def words_all_filters(self):
+        return self._decode_view("all_filters")
+
+    @words_all_filters.setter
+    def words_all_filters(self, word_lists):
+        self._assign_view("all_filters", word_lists)
 
     def fit_predict(self, text,
                     window_size=2,
                     vertex_source="all_filters",
                     edge_source="no_stop_words",
-                    pagerank_config=None):
+                    pagerank_config=None,
+                    edge_weight="binary",
+                    top_k=None):
         """对语料text进行关键词抽取并返回抽取的关键词与其重要程度。
 
         @Parameters:
@@ -65,7 +217,14 @@ class TextRank4Keywords():
                 使用什么样的词表构建图的边。
             pagerank_config: {dict-like}
                 PageRank算法的参数字典，细节可参考文献[1][2]，如：
-                {'alpha': 0.85}
+                {'alpha': 0.85}。批量计算多篇语料时，其中的max_time为同一批
+                语料共享的耗时预算，见compute_pagerank_batch。
+            edge_weight: {str-like}
+                边的权重，"binary"为0-1边，"count"为窗口内的共现次数，
+                "distance"为按距离衰减的共现次数。
+            top_k: {int-like}
+                只返回重要度最大的top_k个关键词，由np.argpartition选出，无需对
+                全部词排序。默认为None，即返回全部关键词。
 
         @Return:
         ----------
@@ -77,36 +236,478 @@ class TextRank4Keywords():
         """
         if not pagerank_config:
             pagerank_config = {"alpha": 0.85}
+        fit_predict_kwargs = {"window_size": window_size,
+                              "vertex_source": vertex_source,
+                              "edge_source": edge_source,
+                              "pagerank_config": pagerank_config,
+                              "edge_weight": edge_weight}
+        if self.result_cache is None:
+            return self._fit_predict(text, top_k=top_k, **fit_predict_kwargs)
 
-        # TODO(zhuoyin94@163.com): 此处进行了三次同样类型的分词，可提升效率
-        # 不同种类的分词策略
-        self.words_no_filter = self.tokenizer.segment_paragraph(text)
+        cache_key = self._get_cache_key(text, fit_predict_kwargs, top_k)
+        key_words = self.result_cache.get(cache_key)
+        if self.profiler is not None:
+            self.profiler.add_count(
+                "result_cache_hits" if key_words is not None
+                else "result_cache_misses")
+        if key_words is not None:
+            self.vocabulary, self.documents = None, None
+            self._assigned_views.clear()
+            self.keywords = key_words
+            return self.keywords
 
-        self.words_no_stop_words = self.tokenizer.segment_paragraph(
-            text, is_lower=True, is_use_stop_words=True,
-            is_use_word_tags_filter=False)
-        self.words_no_stop_words = [item for item in self.words_no_stop_words \
-                                    if len(item) > 0]
+        self._fit_predict(text, top_k=top_k, **fit_predict_kwargs)
+        self.result_cache.put(cache_key, self.keywords)
+        return self.keywords
 
-        self.words_all_filters = self.tokenizer.segment_paragraph(
-            text, is_lower=True, is_use_stop_words=True,
-            is_use_word_tags_filter=False)
-        self.words_all_filters = [item for item in self.words_all_filters \
-                                  if len(item) > 0]
+    def _get_cache_key(self, text, fit_predict_kwargs, top_k=None):
+        """计算text在当前分词器与fit_predict_kwargs参数下的结果缓存键。"""
+        return get_result_cache_key(
+            text, self.tokenizer.get_params(), top_k=top_k,
+            **fit_predict_kwargs)
 
-        if vertex_source == "all_filters":
-            vertex_source_tmp = self.words_all_filters
-        else:
-            vertex_source_tmp = self.words_no_filter
+    def _fit_predict(self, text, window_size, vertex_source, edge_source,
+                     pagerank_config, edge_weight, top_k=None):
+        """不经结果缓存，对语料text进行关键词抽取，参数见fit_predict。"""
+        if self.profiler is not None:
+            start = time.perf_counter()
 
-        if edge_source == "no_stop_words":
-            edge_source_tmp = self.words_no_stop_words
-        else:
-            edge_source_tmp = self.words_no_filter
+        # 不同种类的分词策略，只对text进行一次分句与分词，词被编码为整数id
+        vocabulary = Vocabulary()
+        documents = self.tokenizer.segment_paragraph_encoded(text, vocabulary)
+        self._fit_documents(documents, vocabulary, window_size,
+                            vertex_source, edge_source, pagerank_config,
+                            edge_weight, top_k)
+
+        if self.profiler is not None:
+            self.profiler.add_time("fit_predict", time.perf_counter() - start)
+        return self.keywords
+
+    def _fit_documents(self, documents, vocabulary, window_size,
+                       vertex_source, edge_source, pagerank_config,
+                       edge_weight, top_k=None):
+        """对已分词的文档documents进行关键词抽取，documents的格式同
+        segment_paragraph_encoded的返回值，其余参数见fit_predict。结点或边的
+        视图为空时（如空白或只包含停用词的语料），抽取结果为空列表。"""
+        self.vocabulary, self.documents = vocabulary, documents
+        self._assigned_views.clear()
+
+        vertex_view, edge_view = _get_view_names(vertex_source, edge_source)
+        if not documents[vertex_view].n_tokens or \
+                not documents[edge_view].n_tokens:
+            self.keywords = []
+            return self.keywords
 
         # 依据PageRank算法，计算每个词的重要程度
-        self.keywords = compute_word_scores(vertex_source_tmp,
-                                            edge_source_tmp,
-                                            window_size=window_size,
-                                            pagerank_config=pagerank_config)
+        self.keywords = compute_word_scores_encoded(
+            self.documents[vertex_view],
+            self.documents[edge_view],
+            self.vocabulary,
+            window_size=window_size,
+            pagerank_config=pagerank_config,
+            edge_weight=edge_weight,
+            profiler=self.profiler,
+            top_k=top_k)
+        return self.keywords
+
+    def get_profile_report(self):
+        """返回分析器记录的各阶段耗时与计数，以及缓存的命中率等统计信息。
+
+        @Raises:
+        ----------
+            ValueError: 未指定profiler
+
+        @Return:
+        ----------
+            StageProfiler.report()的结果，并增加"caches"字段，如：
+            {'stages': {'pkuseg_cut': {'time': 0.12, 'calls': 40}, ...},
+             'counts': {'sentences': 40, 'tokens': 612, ...},
+             'caches': {'sentence_cache': {'hit_rate': 0.25, ...}, ...}}
+        """
+        if self.profiler is None:
+            raise ValueError("profiler must be specified to get the report !")
+
+        report = self.profiler.report()
+        report["caches"] = {"sentence_cache":
+                            self.tokenizer.sentence_cache.stats()}
+        if self.result_cache is not None:
+            report["caches"]["result_cache"] = self.result_cache.stats()
+        return report
+
+    def fit_predict_stream(self, chunks,
+                           window_size=2,
+                           vertex_source="all_filters",
+                           edge_source="no_stop_words",
+                           pagerank_config=None,
+                           edge_weight="binary",
+                           top_k=None):
+        """以流式的方式对大规模语料进行关键词抽取。
+
+        chunks中的文本被逐块读入、切分与分词，每个句子的共现关系被立即写入增量构建
+        的CooccurrenceGraph中，不保留中间的分词结果，峰值内存只与词表大小和图的边数
+        有关，而与语料的总长度无关。抽取结果与fit_predict一致。
+
+        @Parameters:
+        ----------
+            chunks: {iterable}
+                字符串的迭代器，例如按块读取的文件，或者以文本模式打开的文件对象。
+            window_size, vertex_source, edge_source, pagerank_config,
+            edge_weight, top_k:
+                见fit_predict。
+
+        @Return:
+        ----------
+            按重要度排序的关键词list，格式同fit_predict。
+        """
+        vertex_view, edge_view = _get_view_names(vertex_source, edge_source)
+
+        graph = CooccurrenceGraph(window_size=window_size,
+                                  edge_weight=edge_weight)
+        if self.profiler is not None:
+            start = time.perf_counter()
+        for views in self.tokenizer.iter_stream_views(chunks):
+            graph.add_sentence(views[vertex_view], views[edge_view])
+
+        if len(graph) == 0:
+            self.keywords = []
+            return self.keywords
+        if self.profiler is None:
+            self.keywords = graph.compute_word_scores(
+                pagerank_config=pagerank_config, top_k=top_k)
+            return self.keywords
+
+        # 流式模式下分句、分词与构图交替进行，作为一个阶段记录
+        self.profiler.add_time("stream_graph", time.perf_counter() - start)
+        with self.profiler.stage("pagerank"):
+            self.keywords, pagerank_info = graph.compute_word_scores(
+                pagerank_config=pagerank_config, is_return_info=True,
+                top_k=top_k)
+        self.profiler.add_count("vertices", len(graph))
+        self.profiler.add_count("pagerank_iterations",
+                                pagerank_info["n_iter"])
+        return self.keywords
+
+    def fit_predict_batch(self, texts,
+                          n_jobs=1,
+                          top_k=None,
+                          chunksize=1,
+                          window_size=2,
+                          vertex_source="all_filters",
+                          edge_source="no_stop_words",
+                          pagerank_config=None,
+                          edge_weight="binary"):
+        """对语料集合texts中的每一篇语料进行关键词抽取，支持多进程并行。
+
+        n_jobs大于1时，texts中的语料会被分发到进程池中并行处理。每个工作进程依据
+        self.tokenizer的参数只初始化一次分词器（及pkuseg模型），并且只向主进程返回
+        前top_k个关键词。若指定了self.result_cache，只有未命中缓存的语料会被
+        分发计算，其前top_k个关键词随后被写入缓存。若分词器的sentence_cache为
+        SQLiteCache，所有工作进程共享该分词结果缓存，重复出现的句子（如公司简介、
+        版权声明）在所有进程中只需切分一次。n_jobs为1时，所有语料的句子被汇总去重
+        之后一次性切分，见WordSegmentation.segment_corpus_encoded，全部语料的
+        PageRank分数由compute_word_scores_encoded_batch一次求得。
+
+        @Parameters:
+        ----------
+            texts: {list-like}
+                需要抽取关键词的语料集合，每一个元素为一篇语料（字符串类型）。
+            n_jobs: {int-like}
+                并行的进程数目。n_jobs为1时在当前进程中串行计算；n_jobs为负数时
+                使用(cpu核数 + 1 + n_jobs)个进程，例如-1表示使用全部的cpu核。
+            top_k: {int-like}
+                每篇语料返回的关键词数目，默认为None，即返回全部关键词。
+            chunksize: {int-like}
+                每次分发给工作进程的语料数目。
+            window_size, vertex_source, edge_source, pagerank_config,
+            edge_weight:
+                见fit_predict。
+
+        @Raises:
+        ----------
+            ValueError: n_jobs为0导致的参数错误
+
+        @Return:
+        ----------
+            与texts顺序一致的关键词列表的列表，每个元素的格式同fit_predict。
+        """
+        if n_jobs == 0:
+            raise ValueError("n_jobs must not be 0 !")
+        if n_jobs < 0:
+            n_jobs = max(os.cpu_count() + 1 + n_jobs, 1)
+        texts = list(texts)
+
+        fit_predict_kwargs = {"window_size": window_size,
+                              "vertex_source": vertex_source,
+                              "edge_source": edge_source,
+                              "pagerank_config": pagerank_config,
+                              "edge_weight": edge_weight}
+        if not pagerank_config:
+            fit_predict_kwargs["pagerank_config"] = {"alpha": 0.85}
+
+        # 只对未命中结果缓存的语料进行抽取
+        key_words = [None] * len(texts)
+        cache_keys = None
+        if self.result_cache is not None:
+            tokenizer_params = self.tokenizer.get_params()
+            cache_keys = [get_result_cache_key(text, tokenizer_params,
+                                               top_k=top_k,
+                                               **fit_predict_kwargs)
+                          for text in texts]
+            key_words = [self.result_cache.get(cache_key)
+                         for cache_key in cache_keys]
+        miss_index = [index for index, item in enumerate(key_words)
+                      if item is None]
+        miss_texts = [texts[index] for index in miss_index]
+
+        if n_jobs == 1 or len(miss_texts) <= 1:
+            # 所有语料的句子汇总去重之后一次性切分，各篇语料共用一个词表
+            # 全部语料的PageRank在一个分块对角矩阵上同时迭代
+            vocabulary = Vocabulary()
+            documents_list = self.tokenizer.segment_corpus_encoded(
+                miss_texts, vocabulary)
+            vertex_view, edge_view = _get_view_names(vertex_source,
+                                                     edge_source)
+            miss_key_words = compute_word_scores_encoded_batch(
+                [item[vertex_view] for item in documents_list],
+                [item[edge_view] for item in documents_list],
+                vocabulary,
+                window_size=window_size,
+                pagerank_config=fit_predict_kwargs["pagerank_config"],
+                edge_weight=edge_weight,
+                profiler=self.profiler,
+                top_k=top_k)
+        else:
+            # 多进程并行抽取关键词，imap保证返回结果与texts的顺序一致
+            shared_cache = self.tokenizer.sentence_cache \
+                if isinstance(self.tokenizer.sentence_cache, SQLiteCache) \
+                else None
+            worker = partial(_fit_predict_worker, top_k=top_k,
+                             **fit_predict_kwargs)
+            with multiprocessing.Pool(
+                    processes=min(n_jobs, len(miss_texts)),
+                    initializer=_init_worker,
+                    initargs=(self.tokenizer.get_params(),
+                              shared_cache)) as pool:
+                miss_key_words = list(
+                    pool.imap(worker, miss_texts, chunksize=chunksize))
+
+        for index, item in zip(miss_index, miss_key_words):
+            key_words[index] = item
+            if cache_keys is not None:
+                self.result_cache.put(cache_keys[index], item)
+        return key_words
+
+    def fit_predict_iter(self, texts,
+                         n_jobs=1,
+                         top_k=None,
+                         max_pending=None,
+                         window_size=2,
+                         vertex_source="all_filters",
+                         edge_source="no_stop_words",
+                         pagerank_config=None,
+                         edge_weight="binary"):
+        """fit_predict_batch的惰性版本：逐篇读取texts，按texts的顺序逐个返回结果。
+
+        texts可以是任意的迭代器（如逐个读取文件的生成器），任意时刻至多只有
+        max_pending篇语料被读入而尚未返回结果，因此内存占用与语料集合的大小无关，
+        且第一篇语料的结果无需等待其余语料处理完毕。n_jobs为1时，每
+        min(max_pending, MAX_SERIAL_BATCH_SIZE)篇语料作为一批交由
+        fit_predict_batch处理，批内重复的句子只切分一次；否则语料被逐篇提交给
+        进程池。
+
+        @Parameters:
+        ----------
+            texts: {iterable}
+                需要抽取关键词的语料的迭代器。
+            n_jobs, top_k:
+                见fit_predict_batch。
+            max_pending: {int-like}
+                已读入但尚未返回结果的语料的最大数目，默认为4 * n_jobs。
+            window_size, vertex_source, edge_source, pagerank_config,
+            edge_weight:
+                见fit_predict。
+
+        @Raises:
+        ----------
+            ValueError: n_jobs为0导致的参数错误
+
+        @Yields:
+        ----------
+            与texts顺序一致的关键词列表，格式同fit_predict。
+        """
+        if n_jobs == 0:
+            raise ValueError("n_jobs must not be 0 !")
+        if n_jobs < 0:
+            n_jobs = max(os.cpu_count() + 1 + n_jobs, 1)
+        if max_pending is None:
+            max_pending = 4 * n_jobs
+        max_pending = max(max_pending, 1)
+
+        fit_predict_kwargs = {"window_size": window_size,
+                              "vertex_source": vertex_source,
+                              "edge_source": edge_source,
+                              "pagerank_config": pagerank_config,
+                              "edge_weight": edge_weight}
+        if n_jobs == 1:
+            batch_size = min(max_pending, MAX_SERIAL_BATCH_SIZE)
+            for batch in _iter_batches(texts, batch_size):
+                yield from self.fit_predict_batch(
+                    batch, n_jobs=1, top_k=top_k, **fit_predict_kwargs)
+            return
+
+        if not pagerank_config:
+            fit_predict_kwargs["pagerank_config"] = {"alpha": 0.85}
+        tokenizer_params = self.tokenizer.get_params()
+        shared_cache = self.tokenizer.sentence_cache \
+            if isinstance(self.tokenizer.sentence_cache, SQLiteCache) else None
+
+        # pending中为(缓存键, 已缓存的结果, AsyncResult)，按texts的顺序排列
+        pending = deque()
+        with multiprocessing.Pool(processes=n_jobs,
+                                  initializer=_init_worker,
+                                  initargs=(tokenizer_params,
+                                            shared_cache)) as pool:
+            for text in texts:
+                cache_key, key_words, async_result = None, None, None
+                if self.result_cache is not None:
+                    cache_key = get_result_cache_key(
+                        text, tokenizer_params, top_k=top_k,
+                        **fit_predict_kwargs)
+                    key_words = self.result_cache.get(cache_key)
+                if key_words is None:
+                    async_result = pool.apply_async(
+                        _fit_predict_worker, (text, top_k),
+                        fit_predict_kwargs)
+                pending.append((cache_key, key_words, async_result))
+
+                if len(pending) >= max_pending:
+                    yield self._get_pending_result(*pending.popleft())
+            while pending:
+                yield self._get_pending_result(*pending.popleft())
+
+    def _get_pending_result(self, cache_key, key_words, async_result):
+        """等待fit_predict_iter中提交的一篇语料的结果，并写入结果缓存。"""
+        if async_result is None:
+            return key_words
+        key_words = async_result.get()
+        if cache_key is not None:
+            self.result_cache.put(cache_key, key_words)
+        return key_words
+
+    def fit_predict_corpus(self, corpus,
+                           top_k=None,
+                           batch_size=256,
+                           window_size=2,
+                           vertex_source="all_filters",
+                           edge_source="no_stop_words",
+                           pagerank_config=None,
+                           edge_weight="binary"):
+        """对已分词的语料corpus中的每一篇文档进行关键词抽取，无需再调用pkuseg。
+
+        每篇文档的各个视图由corpus.get_views依据self.tokenizer的清洗参数求得，
+        每batch_size篇文档的PageRank分数由compute_word_scores_encoded_batch一次
+        求得。
+
+        @Parameters:
+        ----------
+            corpus: {object-like}
+                SegmentedCorpus类型的分词语料，见WordSegmentation.export_corpus。
+            top_k: {int-like}
+                每篇文档返回的关键词数目，默认为None，即返回全部关键词。
+            batch_size: {int-like}
+                每批计算的文档数目。
+            window_size, vertex_source, edge_source, pagerank_config,
+            edge_weight:
+                见fit_predict。
+
+        @Yields:
+        ----------
+            与corpus中文档顺序一致的关键词列表，格式同fit_predict。
+        """
+        vertex_view, edge_view = _get_view_names(vertex_source, edge_source)
+        for batch in _iter_batches(range(len(corpus)), batch_size):
+            views_list = [corpus.get_views(index, self.tokenizer)
+                          for index in batch]
+            yield from compute_word_scores_encoded_batch(
+                [views[vertex_view] for views in views_list],
+                [views[edge_view] for views in views_list],
+                corpus.vocabulary,
+                window_size=window_size,
+                pagerank_config=pagerank_config,
+                edge_weight=edge_weight,
+                profiler=self.profiler,
+                top_k=top_k)
+
+    def partial_fit(self, text,
+                    window_size=2,
+                    vertex_source="all_filters",
+                    edge_source="no_stop_words",
+                    edge_weight="binary"):
+        """增量模式：将语料text的词与共现关系累积进持久的词共现图self.graph。
+
+        词表与稀疏邻接矩阵在多次调用之间保持不变并持续增长，调用predict即可得到
+        截至目前所有语料的关键词。
+
+        @Parameters:
+        ----------
+            text: {str-like}
+                新到达的语料。
+            window_size, vertex_source, edge_source, edge_weight:
+                见fit_predict。window_size与edge_weight在第一次调用时确定，
+                之后不可更改。
+
+        @Raises:
+        ----------
+            ValueError: window_size或edge_weight与已有的词共现图不一致
+
+        @Return:
+        ----------
+            self。
+        """
+        if self.graph is None:
+            self.graph = CooccurrenceGraph(window_size=window_size,
+                                           edge_weight=edge_weight)
+        elif self.graph.window_size != window_size:
+            raise ValueError(("window_size must be {} for the existing " +
+                              "graph, not {}").format(
+                                  self.graph.window_size, window_size))
+        elif self.graph.edge_weight != edge_weight:
+            raise ValueError(("edge_weight must be {} for the existing " +
+                              "graph, not {}").format(
+                                  self.graph.edge_weight, edge_weight))
+
+        vertex_view, edge_view = _get_view_names(vertex_source, edge_source)
+        for views in self.tokenizer.iter_stream_views([text]):
+            self.graph.add_sentence(views[vertex_view], views[edge_view])
+        return self
+
+    def predict(self, top_k=None, pagerank_config=None, is_warm_start=True):
+        """增量模式：依据partial_fit累积的词共现图计算关键词。
+
+        默认以上一次predict得到的PageRank分数作为幂迭代的初始值（warm start），
+        新语料只带来少量新边时，只需少数几次迭代即可收敛。
+
+        @Parameters:
+        ----------
+            top_k: {int-like}
+                返回的关键词数目，默认为None，即返回全部关键词。
+            pagerank_config: {dict-like}
+                见fit_predict。
+            is_warm_start: {bool-like}
+                是否以上一次的分数作为初始值。
+
+        @Raises:
+        ----------
+            ValueError: 尚未调用partial_fit
+
+        @Return:
+        ----------
+            按重要度排序的关键词list，格式同fit_predict。
+        """
+        if self.graph is None:
+            raise ValueError("partial_fit must be called before predict !")
+
+        self.keywords = self.graph.compute_word_scores(
+            pagerank_config=pagerank_config, is_warm_start=is_warm_start,
+            top_k=top_k)
         return self.keywords
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Created on Fri Jan  8 10:47:26 2021
+# Author:     zhuoyin94 <zhuoyin94@163.com>
+# Github:     https://github.com/MichaelYin1994
+# Reference:  https://github.com/someus/
+
+"""
+本模块(textrank.textrank4sentence)用于抽取具体文本中的关键句（文本摘要）。
+"""
+
+from segmentation import WordSegmentation
+from utils import compute_sentence_scores
+
+
+class TextRank4Sentence():
+    """依据PageRank算法与句子之间的相似度，构建句子图并抽取关键句。
+
+    @Parameters:
+    ----------
+        tokenizer: {object-like}
+            WordSegmentation类型的分词器。
+        similarity: {str-like} or {callable}
+            句子相似度，可选"jaccard"、"lcss"与"edit"，或者形如
+            f(word_list_x, word_lists_y)的一对多相似度函数。
+        similarity_threshold: {float-like}
+            句子图中保留的边的最小相似度。
+        top_k_neighbors: {int-like}
+            句子图中每个句子保留的最大邻居数目，默认不限制。
+
+    @Attributes:
+    ----------
+        self.sentences:
+            段落切分之后的句子列表。
+        self.words_sentences:
+            与self.sentences一一对应的、用于计算句子相似度的分词结果。
+
+    @References:
+    ----------
+    [1] https://github.com/letiantian/TextRank4ZH
+    [2] Barrios, Federico, et al. "Variations of the similarity function of
+        textrank for automated summarization." arXiv preprint
+        arXiv:1602.03606 (2016).
+    """
+    def __init__(self, tokenizer=None,
+                 similarity="jaccard",
+                 similarity_threshold=0.0,
+                 top_k_neighbors=None):
+        self.sentences = None
+        self.words_sentences = None
+        self.key_sentences = None
+
+        self.similarity = similarity
+        self.similarity_threshold = similarity_threshold
+        self.top_k_neighbors = top_k_neighbors
+
+        if tokenizer is None:
+            self.tokenizer = WordSegmentation(is_lower=True,
+                                              is_use_stop_words=False,
+                                              is_use_word_tags_filter=False)
+        else:
+            self.tokenizer = tokenizer
+
+    def fit_predict(self, text,
+                    sentence_source="all_filters",
+                    pagerank_config=None):
+        """对语料text进行关键句抽取并返回抽取的关键句与其重要程度。
+
+        @Parameters:
+        ----------
+            text: {str-like}
+                需要抽取关键句的语料。
+            sentence_source: {str-like}
+                使用什么样的分词结果计算句子之间的相似度，可选"all_filters"、
+                "no_stop_words"与"no_filter"。
+            pagerank_config: {dict-like}
+                PageRank算法的参数字典，如：{'alpha': 0.85}
+
+        @Return:
+        ----------
+            按重要度排序的关键句list，如：
+                [['交控科技还推出了列车远程瞭望系统的视距延伸装置', 0.0531],
+                 ...]
+        """
+        if not pagerank_config:
+            pagerank_config = {"alpha": 0.85}
+
+        # 切分句子，分词结果与句子保持一一对应（允许空的词列表）
+        self.sentences = self.tokenizer.split_paragraph(text)
+        if sentence_source == "no_filter":
+            self.words_sentences = self.tokenizer.segment_sentence_list(
+                self.sentences)
+        else:
+            self.words_sentences = self.tokenizer.segment_sentence_list(
+                self.sentences, is_lower=True, is_use_stop_words=True,
+                is_use_word_tags_filter=sentence_source == "all_filters")
+
+        # 依据PageRank算法，计算每个句子的重要程度
+        sentence_scores = compute_sentence_scores(
+            self.words_sentences,
+            similarity=self.similarity,
+            similarity_threshold=self.similarity_threshold,
+            top_k_neighbors=self.top_k_neighbors,
+            pagerank_config=pagerank_config)
+
+        self.key_sentences = [[self.sentences[index], score]
+                              for index, score in sentence_scores]
+        return self.key_sentences
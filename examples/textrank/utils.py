@@ -12,12 +12,24 @@
 计算方法。
 """
 
+import time
+
 import numpy as np
-import networkx as nx
+from scipy import sparse
+
+from vocabulary import Vocabulary, EncodedDocument
 
 # 全局化随机种子设定
 np.random.seed(2020)
 
+def _check_window_size(window_size):
+    """检查window_size的合法性，返回实际使用的滑窗尺寸（至少为2）。"""
+    if window_size <= 0 or not isinstance(window_size, int):
+        raise ValueError(("window_size must be int and " +
+                          "greater than 0, not {}".format(window_size)))
+    return max(window_size, 2)
+
+
 def get_word_pair(word_list, window_size=2):
     """根据word_list的元素内容，依据window_size的大小生成词对。
 
@@ -37,11 +49,7 @@ def get_word_pair(word_list, window_size=2):
     """
     if not word_list:
         raise ValueError("word_list must not be empty !")
-    if window_size <= 0 or not isinstance(window_size, int):
-        raise ValueError(("window_size must be int and " +
-                          "greater than 0, not {}".format(window_size)))
-    elif window_size < 2:
-        window_size = 2
+    window_size = _check_window_size(window_size)
 
     # 依据window_size大小，扫描word_list，构成词对
     for i in range(1, window_size+1):
@@ -77,6 +85,251 @@ def compute_jaccard_similarity(word_list_x, word_list_y):
     return len(intersect_words) / len(union_words)
 
 
+def _is_token_ids(word_list):
+    """判断word_list是否为整数id数组。"""
+    return isinstance(word_list, np.ndarray) and word_list.dtype.kind in "iu"
+
+
+def _as_encoded_document(word_lists):
+    """若word_lists由整数id数组组成，返回对应的EncodedDocument，否则返回None。"""
+    if isinstance(word_lists, EncodedDocument):
+        return word_lists
+    if len(word_lists) == 0 or \
+            not all(_is_token_ids(word_list) for word_list in word_lists):
+        return None
+    sentence_offsets = np.zeros(len(word_lists) + 1, dtype=np.int64)
+    np.cumsum([len(word_list) for word_list in word_lists],
+              out=sentence_offsets[1:])
+    return EncodedDocument(np.concatenate(word_lists), sentence_offsets)
+
+
+def _build_binary_word_matrix(word_lists):
+    """将word_lists编码为shape为(N, V)的0-1稀疏矩阵，V为词表大小。
+
+    word_lists为EncodedDocument或整数id数组的列表时，直接由id数组与句子偏移量
+    构建稀疏矩阵，无需逐词哈希。
+    """
+    document = _as_encoded_document(word_lists)
+    if document is not None:
+        _, indices = np.unique(document.token_ids, return_inverse=True)
+        indices = indices.reshape(-1)
+        word_mat = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.int64), indices,
+             document.sentence_offsets),
+            shape=(len(document), indices.max() + 1 if len(indices) else 0))
+        word_mat.sum_duplicates()
+        word_mat.data[:] = 1
+        return word_mat
+
+    word2index = {}
+    indices, indptr = [], [0]
+    for word_list in word_lists:
+        word_ids = {word2index.setdefault(word, len(word2index))
+                    for word in word_list}
+        indices.extend(sorted(word_ids))
+        indptr.append(len(indices))
+
+    indices = np.array(indices, dtype=np.int64)
+    word_mat = sparse.csr_matrix(
+        (np.ones(len(indices), dtype=np.int64), indices, indptr),
+        shape=(len(word_lists), len(word2index)))
+    return word_mat
+
+
+def compute_jaccard_similarity_matrix(word_lists, threshold=0.0):
+    """精确计算word_lists中所有词列表两两之间的jaccard距离。
+
+    每个词列表只被编码一次，成为0-1稀疏矩阵X的一行。交集大小由稀疏矩阵乘积X * X^T
+    一次求得，并集大小为|x| + |y| - |x ∩ y|。只有至少共享一个词的列表对才会出现在
+    结果中，因此结果的存储量与共享词的列表对数目成正比，而非N^2。
+
+    @Parameters:
+    ----------
+        word_lists: {list-like}
+            词列表的集合，每一个元素为一个句子分词之后的词列表。
+        threshold: {float-like}
+            只保留jaccard距离大于等于threshold的列表对。
+
+    @Returns:
+    ----------
+        shape为(N, N)的对称scipy.sparse.csr_matrix，第(i, j)个元素为第i个与第j个
+        词列表之间的jaccard距离，与compute_jaccard_similarity的结果一致。
+    """
+    if not isinstance(word_lists, EncodedDocument):
+        word_lists = list(word_lists)
+    n_lists = len(word_lists)
+    word_mat = _build_binary_word_matrix(word_lists)
+    word_counts = np.diff(word_mat.indptr)
+
+    intersect_mat = word_mat.dot(word_mat.T).tocoo()
+    rows, cols = intersect_mat.row, intersect_mat.col
+    similarity = intersect_mat.data / \
+        (word_counts[rows] + word_counts[cols] - intersect_mat.data)
+
+    is_kept = (similarity >= threshold) & (similarity > 0)
+    return sparse.csr_matrix(
+        (similarity[is_kept], (rows[is_kept], cols[is_kept])),
+        shape=(n_lists, n_lists))
+
+
+def compute_minhash_signatures(word_lists, n_permutations=128,
+                               random_state=2020):
+    """计算word_lists中每一个词列表的MinHash签名。
+
+    第k个哈希函数为h_k(x) = (a_k * x + b_k) mod p，其中x为词的整数id，p为梅森素数
+    2^31 - 1。两个词列表的签名中取值相同的位置比例是其jaccard距离的无偏估计。
+
+    @Parameters:
+    ----------
+        word_lists: {list-like}
+            词列表的集合，每一个元素为一个句子分词之后的词列表。
+        n_permutations: {int-like}
+            哈希函数（随机排列）的个数，即签名的长度。
+        random_state: {int-like}
+            生成哈希函数参数的随机种子。
+
+    @Returns:
+    ----------
+        shape为(N, n_permutations)的np.ndarray。空列表的签名全部为p。
+    """
+    prime = (1 << 31) - 1
+    word_mat = _build_binary_word_matrix(list(word_lists))
+    n_lists, n_words = word_mat.shape
+
+    rng = np.random.RandomState(random_state)
+    coef_a = rng.randint(1, prime, size=n_permutations).astype(np.int64)
+    coef_b = rng.randint(0, prime, size=n_permutations).astype(np.int64)
+    word_hashes = (np.arange(n_words, dtype=np.int64)[:, None] * coef_a + \
+                   coef_b) % prime
+
+    # 分块对每一行的词哈希值取最小值，控制中间结果的内存占用
+    signatures = np.full((n_lists, n_permutations), prime, dtype=np.int64)
+    is_nonempty = np.diff(word_mat.indptr) > 0
+    row_ids = np.flatnonzero(is_nonempty)
+    chunk_size = max(1, 2**20 // n_permutations)
+    for start in range(0, len(row_ids), chunk_size):
+        rows = row_ids[start:start+chunk_size]
+        begin, end = word_mat.indptr[rows[0]], word_mat.indptr[rows[-1] + 1]
+        signatures[rows] = np.minimum.reduceat(
+            word_hashes[word_mat.indices[begin:end]],
+            word_mat.indptr[rows] - begin, axis=0)
+    return signatures
+
+
+def _get_lsh_band_config(threshold, n_permutations):
+    """依据threshold选择LSH的分段数目，使得S曲线的拐点(1/b)^(1/r)接近threshold。"""
+    best_n_bands, best_error = 1, np.inf
+    for n_rows in range(1, n_permutations + 1):
+        n_bands = n_permutations // n_rows
+        error = abs((1 / n_bands) ** (1 / n_rows) - threshold)
+        if error < best_error:
+            best_n_bands, best_error = n_bands, error
+    return best_n_bands
+
+
+def compute_jaccard_similarity_lsh(word_lists, threshold=0.5,
+                                   n_permutations=128, n_bands=None,
+                                   random_state=2020):
+    """基于MinHash与LSH，近似计算word_lists中jaccard距离较大的列表对。
+
+    MinHash签名被切分为n_bands段，任意一段完全相同的两个列表成为候选列表对；只对
+    候选列表对估计jaccard距离，避免计算全部N^2个列表对，适用于大规模语料的近似去重。
+
+    @Parameters:
+    ----------
+        word_lists: {list-like}
+            词列表的集合，每一个元素为一个句子分词之后的词列表。
+        threshold: {float-like}
+            只保留估计的jaccard距离大于等于threshold的列表对。
+        n_permutations: {int-like}
+            MinHash签名的长度。
+        n_bands: {int-like}
+            LSH的分段数目，默认依据threshold自动选择。
+        random_state: {int-like}
+            生成哈希函数参数的随机种子。
+
+    @Returns:
+    ----------
+        shape为(N, N)的对称scipy.sparse.csr_matrix，存储候选列表对的估计jaccard
+        距离，对角线上非空列表的距离为1。
+    """
+    signatures = compute_minhash_signatures(
+        word_lists, n_permutations, random_state)
+    n_lists = len(signatures)
+    if n_bands is None:
+        n_bands = _get_lsh_band_config(threshold, n_permutations)
+    n_rows = n_permutations // n_bands
+    row_ids = np.flatnonzero(signatures[:, 0] < (1 << 31) - 1)
+
+    # 在每一段中，签名相同的列表落入同一个桶，桶内的列表两两成为候选对
+    candidate_pairs = []
+    for band in range(n_bands):
+        band_signatures = np.ascontiguousarray(
+            signatures[row_ids, band*n_rows:(band+1)*n_rows])
+        _, bucket_ids = np.unique(
+            band_signatures.view([("", band_signatures.dtype)] * n_rows),
+            return_inverse=True)
+        bucket_ids = bucket_ids.ravel()
+
+        order = np.argsort(bucket_ids, kind="stable")
+        bucket_bounds = np.flatnonzero(np.diff(bucket_ids[order])) + 1
+        for bucket in np.split(row_ids[order], bucket_bounds):
+            if len(bucket) > 1:
+                index_x, index_y = np.triu_indices(len(bucket), k=1)
+                candidate_pairs.append(
+                    bucket[index_x] * n_lists + bucket[index_y])
+
+    rows, cols = row_ids, row_ids
+    similarity = np.ones(len(row_ids))
+    if candidate_pairs:
+        pairs = np.unique(np.concatenate(candidate_pairs))
+        pair_x, pair_y = pairs // n_lists, pairs % n_lists
+        pair_similarity = (
+            signatures[pair_x] == signatures[pair_y]).mean(axis=1)
+
+        is_kept = pair_similarity >= threshold
+        pair_x, pair_y = pair_x[is_kept], pair_y[is_kept]
+        rows = np.concatenate([rows, pair_x, pair_y])
+        cols = np.concatenate([cols, pair_y, pair_x])
+        similarity = np.concatenate(
+            [similarity, pair_similarity[is_kept], pair_similarity[is_kept]])
+    return sparse.csr_matrix((similarity, (rows, cols)),
+                             shape=(n_lists, n_lists))
+
+
+def _encode_word_lists(word_list_x, word_lists_y):
+    """将word_list_x与word_lists_y中的词映射为整数id。
+
+    词表由word_list_x构建，word_lists_y中未在word_list_x出现的词被映射为-1，
+    这些词不可能与word_list_x中的任何词匹配。输入均为整数id数组时，由np.unique与
+    np.searchsorted批量完成映射。
+    """
+    if _is_token_ids(word_list_x) and \
+            all(_is_token_ids(word_list) for word_list in word_lists_y):
+        vocab_x, ids_x = np.unique(word_list_x, return_inverse=True)
+        ids_x = ids_x.reshape(-1).astype(np.int64)
+        if not word_lists_y:
+            return ids_x, []
+
+        token_ids_y = np.concatenate(word_lists_y)
+        ids_y = np.full(len(token_ids_y), -1, dtype=np.int64)
+        if len(vocab_x):
+            positions = np.searchsorted(vocab_x, token_ids_y)
+            positions[positions == len(vocab_x)] = 0
+            is_known = vocab_x[positions] == token_ids_y
+            ids_y[is_known] = positions[is_known]
+        split_points = np.cumsum([len(word_list)
+                                  for word_list in word_lists_y])[:-1]
+        return ids_x, np.split(ids_y, split_points)
+
+    word2id = {}
+    ids_x = np.array([word2id.setdefault(word, len(word2id))
+                      for word in word_list_x], dtype=np.int64)
+    ids_y = [np.array([word2id.get(word, -1) for word in word_list],
+                      dtype=np.int64) for word_list in word_lists_y]
+    return ids_x, ids_y
+
+
 def compute_edit_similarity(word_list_x, word_list_y):
     """计算word_list_x与word_list_y之间的编辑距离（Edit Distance）。
 
@@ -91,24 +344,119 @@ def compute_edit_similarity(word_list_x, word_list_y):
     ----------
         返回两个列表之间的编辑距离。
     """
-    length_x, length_y = len(word_list_x), len(word_list_y)
-    denominator = length_x + length_y
+    return float(compute_edit_similarity_many(word_list_x, [word_list_y])[0])
 
-    # 初始化全局dp矩阵
-    dp = np.zeros((length_x+1, length_y+1))
-    dp[:, 0] = np.arange(0, length_x+1)
-    dp[0, :] = np.arange(0, length_y+1)
 
-    # 动态规划矩阵计算
-    for i in range(1, length_x+1):
-        for j in range(1, length_y+1):
-            if word_list_x[i-1] == word_list_y[j-1]:
-                dp[i, j] = dp[i-1, j-1]
-            else:
-                dp[i, j] = min(dp[i-1, j] + 1,
-                               dp[i, j-1] + 1,
-                               dp[i-1, j-1] + 2)
-    return 1 - dp[-1, -1] / denominator
+def compute_edit_similarity_many(word_list_x, word_lists_y):
+    """计算word_list_x与word_lists_y中每一个词列表之间的编辑距离。
+
+    编辑距离中替换操作的代价为2，即等价于一次删除与一次插入，因此编辑距离满足
+    dist = len(x) + len(y) - 2 * LCS(x, y)。最长公共子序列LCS的长度由位并行
+    （Bit-parallel）算法[1]求得，见_compute_edit_similarity_padded。
+
+    @Parameters:
+    ----------
+        word_list_x: {list-like}
+            句子分词之后的词列表，列表中的每一个元素即句子中的词。
+        word_lists_y: {list-like}
+            待比较的词列表的集合，每一个元素为一个句子分词之后的词列表。
+
+    @Returns:
+    ----------
+        shape为(len(word_lists_y), )的np.ndarray。两个列表均为空时相似度为0。
+
+    @References:
+    ----------
+    [1] Hyyrö, Heikki. "Bit-parallel LCS-length computation revisited."
+        Proceedings of the 15th Australasian Workshop on Combinatorial
+        Algorithms. 2004.
+    """
+    ids_x, ids_y = _encode_word_lists(word_list_x, word_lists_y)
+    padded_y, lengths_y = _pad_token_ids(ids_y)
+    return _compute_edit_similarity_padded(ids_x, padded_y, lengths_y)
+
+
+def _pad_token_ids(token_ids_list):
+    """将整数id数组的列表填充为shape为(N, L)的矩阵，L为最大长度，填充值为-2。
+
+    @Returns:
+    ----------
+        (padded, lengths)二元组，padded[i, :lengths[i]]为第i个数组。
+    """
+    lengths = np.array([len(token_ids) for token_ids in token_ids_list],
+                       dtype=np.int64)
+    padded = np.full((len(lengths), int(lengths.max()) if len(lengths)
+                      else 0), -2, dtype=np.int64)
+    if padded.size:
+        is_token = np.arange(padded.shape[1]) < lengths[:, None]
+        padded[is_token] = np.concatenate(token_ids_list)
+    return padded, lengths
+
+
+def _popcount(words):
+    """按行统计shape为(C, W)的np.uint64矩阵中1的个数。"""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).sum(axis=1).astype(np.int64)
+    return np.unpackbits(np.ascontiguousarray(words).view(np.uint8),
+                         axis=1).sum(axis=1).astype(np.int64)
+
+
+def _compute_edit_similarity_padded(ids_x, padded_y, lengths_y):
+    """由填充之后的id矩阵，同时计算ids_x与所有候选列表之间的编辑距离。
+
+    ids_x被编码为每个词的位置掩码（每64位一个np.uint64），所有候选列表的
+    位向量组成shape为(C, W)的矩阵，按位置j对所有候选同时进行一次位并行的更新：
+    V = (V + M) | (V - M)，其中M = V & mask(y[:, j])。M为V的子集，因此
+    V - M = V ^ M，只有加法需要在64位的字之间传递进位。填充值与未在ids_x中
+    出现的词的掩码为0，不改变V。
+    """
+    length_x = len(ids_x)
+    n_candidates = len(lengths_y)
+    denominators = length_x + lengths_y
+    scores = np.zeros(n_candidates)
+    if n_candidates == 0 or length_x == 0:
+        return scores
+
+    # 每个不同的词的位置掩码，最后一行为全0的掩码
+    vocab_x, inverse_x = np.unique(ids_x, return_inverse=True)
+    n_words = (length_x + 63) // 64
+    positions = np.arange(length_x)
+    match_masks = np.zeros((len(vocab_x) + 1, n_words), dtype=np.uint64)
+    np.bitwise_or.at(match_masks,
+                     (inverse_x.reshape(-1), positions // 64),
+                     np.left_shift(np.uint64(1),
+                                   (positions % 64).astype(np.uint64)))
+
+    # 候选列表中的每个词对应的掩码行：由词id直接查表，-1与-2落在表尾的两个位置
+    n_ids = int(padded_y.max(initial=vocab_x[-1])) + 3
+    lookup = np.full(n_ids, len(vocab_x), dtype=np.int64)
+    lookup[vocab_x] = np.arange(len(vocab_x))
+    mask_index = lookup[padded_y]
+
+    full_masks = np.full(n_words, np.iinfo(np.uint64).max, dtype=np.uint64)
+    if length_x % 64:
+        full_masks[-1] = np.uint64((1 << (length_x % 64)) - 1)
+    vector = np.tile(full_masks, (n_candidates, 1))
+    for j in range(padded_y.shape[1]):
+        match = vector & match_masks[mask_index[:, j]]
+        if not match.any():
+            continue
+
+        # 多字的加法：逐字相加并传递进位
+        total = np.empty_like(vector)
+        carry = np.zeros(n_candidates, dtype=np.uint64)
+        for w in range(n_words):
+            partial_sum = vector[:, w] + match[:, w]
+            total[:, w] = partial_sum + carry
+            carry = ((partial_sum < vector[:, w]) |
+                     (total[:, w] < partial_sum)).astype(np.uint64)
+        vector = (total | (vector ^ match)) & full_masks
+
+    lcs_lengths = length_x - _popcount(vector)
+    is_valid = denominators > 0
+    scores[is_valid] = 1 - (denominators[is_valid] - 2 * lcs_lengths[
+        is_valid]) / denominators[is_valid]
+    return scores
 
 
 def compute_lcss_similarity(word_list_x=None, word_list_y=None,
@@ -128,37 +476,213 @@ def compute_lcss_similarity(word_list_x=None, word_list_y=None,
     ----------
         返回两个列表之间的LCSS距离。
     """
-    length_x, length_y = len(word_list_x), len(word_list_y)
-    denominator = min(length_x, length_y)
+    return float(compute_lcss_similarity_many(
+        word_list_x, [word_list_y], max_pos_diff)[0])
 
-    # 早停条件
-    if length_x == 0 or length_y == 0:
-        return 0
-    if length_x == 1 and word_list_x[0] in word_list_y:
-        return 1 / denominator
-    if length_x == 1 and word_list_x[0] not in word_list_y:
-        return 0
-    if length_y == 1 and word_list_y[0] in word_list_x:
-        return 1 / denominator
-    if length_y == 1 and word_list_y[0] not in word_list_x:
-        return 0
 
-    # 动态规划矩阵计算
-    dp = np.zeros((length_x+1, length_y+1))
-    for i in range(1, length_x+1):
-        for j in range(1, length_y+1):
-            pos_diff = int(abs(i - j))
+def compute_lcss_similarity_many(word_list_x, word_lists_y, max_pos_diff=3):
+    """计算word_list_x与word_lists_y中每一个词列表之间的LCSS距离。
 
-            if (pos_diff <= max_pos_diff) and \
-               (word_list_x[i-1] == word_list_y[j-1]):
-                dp[i, j] = dp[i-1, j-1] + 1
-            else:
-                dp[i, j] = max(dp[i-1, j], dp[i, j-1])
-    return dp[-1, -1] / denominator
+    由于只有位置差不超过max_pos_diff的词才可能匹配，动态规划只需要计算dp矩阵中
+    |i - j| <= max_pos_diff的对角带状区域：带外的dp值等于与其相邻的带边界上的值。
+    词被映射为整数id之后，逐行对所有候选词列表同时进行向量化更新，每一行的dp值
+    由np.maximum.accumulate一次求得，空间复杂度为O(len(word_lists_y) * band)。
+
+    @Parameters:
+    ----------
+        word_list_x: {list-like} or {array-like}
+            句子分词之后的词列表，列表中的每一个元素即句子中的词。
+        word_lists_y: {list-like}
+            待比较的词列表的集合，每一个元素为一个句子分词之后的词列表。
+        max_pos_diff: {int-like}
+            判定不同句子的两个词属于公共子序的最大允许位置差距的范围。
+
+    @Returns:
+    ----------
+        shape为(len(word_lists_y), )的np.ndarray，与compute_lcss_similarity
+        逐个计算的结果一致。
+    """
+    ids_x, ids_y = _encode_word_lists(word_list_x, word_lists_y)
+    padded_y, lengths_y = _pad_token_ids(ids_y)
+    return _compute_lcss_similarity_padded(ids_x, padded_y, lengths_y,
+                                           max_pos_diff)
+
+
+def _compute_lcss_similarity_padded(ids_x, padded_y, lengths_y,
+                                    max_pos_diff=3):
+    """由填充之后的id矩阵，同时计算ids_x与所有候选列表之间的LCSS距离，
+    见compute_lcss_similarity_many。"""
+    length_x = len(ids_x)
+    scores = np.zeros(len(lengths_y))
+    if length_x == 0 or not lengths_y.any():
+        return scores
+
+    # 早停条件：空列表与长度为1的列表
+    is_nonempty = lengths_y > 0
+    if length_x == 1:
+        scores[is_nonempty] = (padded_y == ids_x[0]).any(axis=1)[is_nonempty]
+        return scores
+    is_single = lengths_y == 1
+    scores[is_single] = np.isin(padded_y[is_single, 0], ids_x)
+    candidates = np.flatnonzero(lengths_y > 1)
+    if len(candidates) == 0 or max_pos_diff < 0:
+        return scores
+
+    lengths_y = lengths_y[candidates]
+    max_length = int(max(length_x, lengths_y.max()))
+    band = int(min(max_pos_diff, max_length))
+    width = 2 * band + 1
+
+    # band_padded_y[j + band, c]为第c个候选列表的第j个词（j从1开始），其余位置
+    # 为-2；候选列表位于第二维，每一步的更新都在连续的行上进行
+    band_padded_y = np.full((max_length + width + 1, len(candidates)), -2,
+                            dtype=np.int64)
+    n_columns = min(padded_y.shape[1], max_length)
+    band_padded_y[band+1:band+1+n_columns] = \
+        padded_y[candidates, :n_columns].T
+
+    # 结果所在的dp矩阵的行(rows)与带内偏移(offsets)
+    rows = np.where(length_x - lengths_y > band, lengths_y + band, length_x)
+    cols = np.where(lengths_y - length_x > band, length_x + band, lengths_y)
+    offsets = cols - (rows - band)
+
+    # 带状动态规划：dp_band[k, c]表示第c个候选列表的dp[i, i - band + k]
+    dp_band = np.zeros((width, len(candidates)), dtype=np.int64)
+    for i in range(1, rows.max() + 1):
+        is_match = band_padded_y[i:i+width] == ids_x[i-1]
+        dp_up = np.concatenate([dp_band[1:], dp_band[-1:]], axis=0)
+        dp_band = np.maximum.accumulate(
+            np.maximum(dp_up, dp_band + is_match), axis=0)
+
+        is_done = rows == i
+        if is_done.any():
+            done = np.flatnonzero(is_done)
+            lcss = dp_band[offsets[done], done]
+            denominator = np.minimum(length_x, lengths_y[done])
+            scores[candidates[done]] = lcss / denominator
+    return scores
+
+
+# 共现边的权重：0-1边、共现次数与按距离衰减（距离为d的一次共现贡献1/d）的共现次数
+EDGE_WEIGHTS = ["binary", "count", "distance"]
+
+
+def build_cooccurrence_edges(document, window_size=2, vertex_index=None,
+                             edge_weight="binary"):
+    """向量化地生成document中滑窗内共现的词对，与get_word_pair的词对一致。
+
+    所有句子的词id拼接为一个数组，距离为d的词对即该数组与其平移d位之后的数组
+    逐位配对，再滤除跨句子的词对，无需逐词对调用Python代码。词对按无向边去重，
+    重复的共现依据edge_weight累加为边的权重。
+
+    @Parameters:
+    ----------
+        document: {object-like}
+            EncodedDocument类型的分词结果，或者整数id数组的列表。
+        window_size: {int-like}
+            滑窗尺寸的大小。
+        vertex_index: {array-like}
+            词id到结点编号的映射数组，编号为-1的词不参与构图。默认为None，即词id
+            就是结点编号。
+        edge_weight: {str-like}
+            边的权重，可选"binary"、"count"与"distance"，见EDGE_WEIGHTS。
+        top_k: {int-like}
+            只返回分数最大的top_k个词，见get_top_k_index。默认为None，即返回
+            全部词。
+
+    @Returns:
+    ----------
+        (rows, cols, weights)三元组，每条无向边只出现一次且rows <= cols。
+    """
+    window_size = _check_window_size(window_size)
+    if edge_weight not in EDGE_WEIGHTS:
+        raise ValueError("Invalid edge_weight: {}".format(edge_weight))
+
+    if len(document) == 0:
+        document = EncodedDocument(np.array([], dtype=np.int64), [0])
+    document = _as_encoded_document(document)
+    if document is None:
+        raise TypeError("document must be an EncodedDocument or a list " +
+                        "of integer id arrays !")
+    token_ids = np.asarray(document.token_ids, dtype=np.int64)
+    if vertex_index is not None and len(token_ids):
+        token_ids = np.asarray(vertex_index)[token_ids]
+    sentence_ids = np.repeat(np.arange(len(document)),
+                             np.diff(document.sentence_offsets))
+
+    rows, cols, weights = [np.array([], dtype=np.int64)], \
+        [np.array([], dtype=np.int64)], [np.array([])]
+    for shift in range(1, min(window_size, len(token_ids) - 1) + 1):
+        ids_x, ids_y = token_ids[:-shift], token_ids[shift:]
+        is_kept = (sentence_ids[:-shift] == sentence_ids[shift:]) & \
+            (ids_x >= 0) & (ids_y >= 0)
+        ids_x, ids_y = ids_x[is_kept], ids_y[is_kept]
+        rows.append(np.minimum(ids_x, ids_y))
+        cols.append(np.maximum(ids_x, ids_y))
+        weights.append(np.full(len(ids_x),
+                               1.0 / shift if edge_weight == "distance"
+                               else 1.0))
+    rows, cols, weights = np.concatenate(rows), np.concatenate(cols), \
+        np.concatenate(weights)
+
+    # 无向边去重，累加重复共现的权重
+    n_ids = int(cols.max()) + 1 if len(cols) else 1
+    edge_keys, inverse = np.unique(rows * n_ids + cols, return_inverse=True)
+    if edge_weight == "binary":
+        weights = np.ones(len(edge_keys))
+    else:
+        weights = np.bincount(inverse.reshape(-1), weights=weights,
+                              minlength=len(edge_keys))
+    return edge_keys // n_ids, edge_keys % n_ids, weights
+
+
+def build_cooccurrence_matrix(document, n_vertex, window_size=2,
+                              vertex_index=None, edge_weight="binary",
+                              is_sparse=True):
+    """依据document中词的共现关系，一次性构建对称的邻接矩阵。
+
+    @Parameters:
+    ----------
+        document: {object-like}
+            EncodedDocument类型的分词结果，或者整数id数组的列表。
+        n_vertex: {int-like}
+            图的结点数目。
+        window_size, vertex_index, edge_weight:
+            见build_cooccurrence_edges。
+        is_sparse: {bool-like}
+            是否返回scipy.sparse.csr_matrix，为False时返回稠密的np.ndarray。
+
+    @Returns:
+    ----------
+        shape为(n_vertex, n_vertex)的对称邻接矩阵。
+    """
+    rows, cols, weights = build_cooccurrence_edges(
+        document, window_size, vertex_index, edge_weight)
+
+    # 对称化，自环只保留一次
+    is_off_diagonal = rows != cols
+    rows, cols = np.concatenate([rows, cols[is_off_diagonal]]), \
+        np.concatenate([cols, rows[is_off_diagonal]])
+    weights = np.concatenate([weights, weights[is_off_diagonal]])
+
+    if is_sparse:
+        return sparse.csr_matrix((weights, (rows, cols)),
+                                 shape=(n_vertex, n_vertex))
+    adjacent_mat = np.zeros((n_vertex, n_vertex))
+    adjacent_mat[rows, cols] = weights
+    return adjacent_mat
+
+
+def _encode_with_word_index(word_lists, word2index):
+    """依据{词: id}的索引表将word_lists编码为EncodedDocument，未登录词为-1。"""
+    return EncodedDocument.from_word_lists(
+        word_lists, Vocabulary(word2index), is_add=False)
 
 
 def compute_word_scores(vertex_source, edge_source,
-                        window_size=2, pagerank_config=None):
+                        window_size=2, pagerank_config=None,
+                        is_return_info=False, edge_weight="binary",
+                        top_k=None):
     """依据相关参数，计算vertex_source中，每一个结点的PageRank分数。
 
     PageRank算法用于无监督的计算一个图中每一个结点的重要程度。当用于关键词提取
@@ -174,12 +698,17 @@ def compute_word_scores(vertex_source, edge_source,
         window_size: {int-like}
             滑窗尺寸的大小。
         pagerank_config: {dict-like}
-            PageRank算法的参数字典，细节可参考文献[1][2]，如：
+            PageRank算法的参数字典，可选的键为alpha、max_iter与tol，细节可参考
+            文献[1][2]，如：
             {'alpha': 0.85}
+        is_return_info: {bool-like}
+            是否同时返回PageRank迭代的收敛信息，见compute_pagerank。
+        edge_weight: {str-like}
+            边的权重，可选"binary"、"count"与"distance"，见EDGE_WEIGHTS。
 
     @Returns:
     ----------
-        返回每个词的PageRank分数。
+        返回每个词的PageRank分数。若is_return_info为True，返回(分数, 收敛信息)。
 
     @References:
     ----------
@@ -192,9 +721,39 @@ def compute_word_scores(vertex_source, edge_source,
     if not pagerank_config:
         pagerank_config = {"alpha": 0.85}
     sorted_words = []
-    word2index, index2word = {}, {}
 
     # 扫描每一个句子的每一个词，构建{词: id}与{id: 词}的索引表
+    word2index, index2word = build_word_index(vertex_source)
+
+    # 构建邻接矩阵（适用于小数据）
+    adjacent_mat = build_cooccurrence_matrix(
+        _encode_with_word_index(edge_source, word2index), len(word2index),
+        window_size, edge_weight=edge_weight, is_sparse=False)
+
+    # 计算构建的邻接矩阵的每一个结点的PageRank分数值
+    vertex_scores, pagerank_info = compute_pagerank(
+        adjacent_mat, **pagerank_config)
+    for index in get_top_k_index(vertex_scores, top_k).tolist():
+        sorted_words.append([index2word[index], float(vertex_scores[index])])
+    if is_return_info:
+        return sorted_words, pagerank_info
+    return sorted_words
+
+
+def build_word_index(vertex_source):
+    """扫描vertex_source中每一个句子的每一个词，构建词与结点id之间的索引表。
+
+    @Parameters:
+    ----------
+        vertex_source: {list-like}
+            分词后的句子的集合，用于构建图的结点。
+
+    @Returns:
+    ----------
+        {词: id}与{id: 词}两个索引表，id按词首次出现的顺序编号。
+    """
+    word2index, index2word = {}, {}
+
     word_index = 0
     for word_list in vertex_source:
         for word in word_list:
@@ -202,30 +761,692 @@ def compute_word_scores(vertex_source, edge_source,
                 word2index[word] = word_index
                 index2word[word_index] = word
                 word_index += 1
+    return word2index, index2word
 
-    # 构建邻接矩阵（适用于小数据）
-    adjacent_mat = np.zeros((len(word2index), len(word2index)))
-    for word_list in edge_source:
-        for word_x, word_y in get_word_pair(word_list, window_size):
-            if word_x in word2index and word_y in word2index:
-                index_x = word2index[word_x]
-                index_y = word2index[word_y]
 
-                adjacent_mat[index_x][index_y] = 1
-                adjacent_mat[index_y][index_x] = 1
+def build_sparse_adjacent_matrix(edge_source, word2index, window_size=2,
+                                 edge_weight="binary"):
+    """依据edge_source中词的共现关系，构建CSR格式的稀疏邻接矩阵。
 
-    # 计算构建的邻接矩阵的每一个结点的PageRank分数值
-    graph = nx.from_numpy_matrix(adjacent_mat)
-    vertex_scores = nx.pagerank(graph, **pagerank_config)
-    sorted_scores = sorted(
-        vertex_scores.items(), key=lambda item: item[1], reverse=True)
+    与compute_word_scores中的稠密邻接矩阵等价：若两个词在window_size内共现且
+    均在word2index中，则两者之间存在一条无向边。存储空间随边的数目线性增长，而非
+    结点数目的平方。
 
-    for index, score in sorted_scores:
-        sorted_words.append([index2word[index], score])
-    return sorted_words
+    @Parameters:
+    ----------
+        edge_source: {list-like}
+            分词之后的句子集合，用于构建图的边关系。
+        word2index: {dict-like}
+            {词: id}的索引表，决定邻接矩阵的结点集合。
+        window_size: {int-like}
+            滑窗尺寸的大小。
+        edge_weight: {str-like}
+            边的权重，可选"binary"、"count"与"distance"，见EDGE_WEIGHTS。
+
+    @Returns:
+    ----------
+        shape为(len(word2index), len(word2index))的scipy.sparse.csr_matrix。
+    """
+    return build_cooccurrence_matrix(
+        _encode_with_word_index(edge_source, word2index), len(word2index),
+        window_size, edge_weight=edge_weight)
+
+
+def _build_transition_matrix(adjacent_mat):
+    """按行归一化邻接矩阵，返回(转移概率矩阵的转置, 悬挂结点的bool数组)。"""
+    if sparse.issparse(adjacent_mat):
+        out_degree = np.asarray(adjacent_mat.sum(axis=1), dtype=float).ravel()
+    else:
+        adjacent_mat = np.asarray(adjacent_mat, dtype=float)
+        out_degree = adjacent_mat.sum(axis=1)
+    is_dangling = out_degree == 0
+    out_degree[~is_dangling] = 1.0 / out_degree[~is_dangling]
+    if sparse.issparse(adjacent_mat):
+        transition_mat_t = sparse.diags(out_degree).dot(
+            adjacent_mat).T.tocsr()
+    else:
+        transition_mat_t = (adjacent_mat * out_degree[:, None]).T
+    return transition_mat_t, is_dangling
+
+
+def get_top_k_index(scores, top_k=None):
+    """返回scores中最大的top_k个元素的下标，按分数降序排列，分数相同时下标小者
+    在前（与sorted的稳定排序一致）。
+
+    top_k小于len(scores)时先由np.argpartition在O(N)时间内选出前top_k个元素，
+    只对这top_k个元素排序；top_k为None时返回全部元素的排序。
+    """
+    scores = np.asarray(scores)
+    if top_k is None or top_k >= len(scores):
+        return np.argsort(-scores, kind="stable")
+    if top_k <= 0:
+        raise ValueError("top_k must be positive !")
+
+    # 与第top_k大的元素相等的元素均为候选，保证分数相同时下标小者在前
+    kth_score = scores[np.argpartition(-scores, top_k - 1)[top_k - 1]]
+    top_index = np.flatnonzero(scores >= kth_score)
+    return top_index[np.lexsort((top_index, -scores[top_index]))][:top_k]
+
+
+def compute_pagerank(adjacent_mat, alpha=0.85, max_iter=100, tol=1.0e-6,
+                     initial_scores=None, top_k=None, n_stable_iter=3,
+                     max_time=None):
+    """基于幂迭代（Power Iteration）计算图中每一个结点的PageRank分数。
+
+    迭代格式与networkx.pagerank一致：转移矩阵由邻接矩阵按行归一化得到，出度为0
+    的悬挂结点（Dangling Node）将其分数均匀分配给所有结点；当相邻两次迭代结果的
+    L1距离小于N * tol时停止迭代。迭代直接在np.ndarray或scipy.sparse矩阵上进行，
+    无需构建networkx的图对象。
+
+    只需要前top_k个结点时，可以指定top_k：当分数最大的top_k个结点及其顺序连续
+    n_stable_iter次迭代保持不变时提前停止迭代。指定max_time时，迭代耗时超过
+    max_time秒即停止。提前停止时返回当前最优的分数，且info['is_converged']为
+    False，适用于对响应时间有要求的场景。
+
+    @Parameters:
+    ----------
+        adjacent_mat: {array-like} or {scipy.sparse matrix}
+            shape为(N, N)的（带权）邻接矩阵。
+        alpha: {float-like}
+            阻尼系数（Damping Factor）。
+        max_iter: {int-like}
+            最大迭代次数，至少为1。
+        tol: {float-like}
+            收敛判定的容忍误差。
+        initial_scores: {array-like}
+            shape为(N, )的迭代初始值，会被归一化。默认为均匀分布；图发生少量变化
+            时，以上一次的PageRank分数作为初始值（warm start）可以减少迭代次数。
+        top_k: {int-like}
+            提前停止时关注的结点数目，默认为None，即迭代至收敛。
+        n_stable_iter: {int-like}
+            前top_k个结点保持不变的连续迭代次数，达到后停止迭代。
+        max_time: {float-like}
+            迭代的最长耗时（秒），默认为None，即不限制。
+
+    @Returns:
+    ----------
+        (scores, info)二元组。scores为shape为(N, )的np.ndarray，每个结点的
+        PageRank分数；info为收敛信息的字典，如：
+        {'n_iter': 23, 'residual': 8.1e-07, 'is_converged': True,
+         'stop_reason': 'tol'}
+        stop_reason为停止迭代的原因，可能为'tol'（收敛）、'top_k'（前top_k个
+        结点稳定）、'max_time'（超时）或'max_iter'。与networkx不同，达到max_iter
+        仍未收敛时不抛出异常，而是返回最后一次迭代的结果，并置
+        info['is_converged']为False。
+    """
+    n_vertex = adjacent_mat.shape[0]
+    info = {"n_iter": 0, "residual": 0.0, "is_converged": True,
+            "stop_reason": "tol"}
+    if max_iter < 1:
+        raise ValueError("max_iter must be positive !")
+    if n_vertex == 0:
+        return np.array([]), info
+    if top_k is not None and top_k <= 0:
+        raise ValueError("top_k must be positive !")
+    if max_time is not None:
+        deadline = time.perf_counter() + max_time
+
+    transition_mat_t, is_dangling = _build_transition_matrix(adjacent_mat)
+
+    teleport = np.repeat(1.0 / n_vertex, n_vertex)
+    if initial_scores is None:
+        scores = teleport
+    else:
+        scores = np.asarray(initial_scores, dtype=float)
+        if scores.shape != (n_vertex, ):
+            raise ValueError(("initial_scores must be of shape " +
+                              "({}, ), not {}".format(n_vertex, scores.shape)))
+        scores = scores / scores.sum() if scores.sum() > 0 else teleport
+    info["is_converged"], info["stop_reason"] = False, "max_iter"
+    top_index, n_stable = None, 0
+    for n_iter in range(1, max_iter + 1):
+        scores_last = scores
+        dangling_sum = scores[is_dangling].sum()
+        scores = alpha * (transition_mat_t.dot(scores) + \
+                          dangling_sum * teleport) + (1 - alpha) * teleport
+
+        # L1范数判定收敛
+        residual = np.abs(scores - scores_last).sum()
+        if residual < n_vertex * tol:
+            info["is_converged"], info["stop_reason"] = True, "tol"
+            break
+
+        # 前top_k个结点及其顺序保持不变
+        if top_k is not None:
+            top_index_last, top_index = top_index, get_top_k_index(
+                scores, top_k)
+            if top_index_last is not None and \
+                    np.array_equal(top_index, top_index_last):
+                n_stable += 1
+            else:
+                n_stable = 0
+            if n_stable >= n_stable_iter:
+                info["stop_reason"] = "top_k"
+                break
+        if max_time is not None and time.perf_counter() >= deadline:
+            info["stop_reason"] = "max_time"
+            break
+    info["n_iter"], info["residual"] = n_iter, float(residual)
+    return scores, info
+
+
+def compute_pagerank_batch(adjacent_mats, alpha=0.85, max_iter=100,
+                           tol=1.0e-6, top_k=None, n_stable_iter=3,
+                           max_time=None):
+    """在一个分块对角的稀疏矩阵上同时计算多个图的PageRank分数。
+
+    每个图的结点数目通常只有几百个，逐个调用compute_pagerank时Python的调用开销
+    远大于实际的计算量。本函数将N个图的邻接矩阵拼接为一个分块对角矩阵，N个图的
+    幂迭代在同一次稀疏矩阵乘法中完成。悬挂结点的分数与随机跳转只在各自的图内
+    分配；收敛判定（以及top_k的稳定性判定）按图分别进行，已停止的图的分数不再
+    更新，其结果与单独调用compute_pagerank一致。当未停止的结点少于一半时，迭代
+    矩阵被压缩为只包含未停止的图。
+
+    @Parameters:
+    ----------
+        adjacent_mats: {list-like}
+            N个图的（带权）邻接矩阵的列表，每个元素为np.ndarray或scipy.sparse
+            矩阵。
+        alpha, max_iter, tol, top_k, n_stable_iter:
+            见compute_pagerank。
+        max_time: {float-like}
+            全部图的迭代共享的最长耗时（秒），超时之后所有未停止的图均停止迭代。
+            所有图在同一次矩阵乘法中迭代，单个图的耗时无法单独计量，因此该预算
+            针对整批图而非每个图。
+
+    @Returns:
+    ----------
+        (scores_list, info_list)二元组，分别为与adjacent_mats一一对应的PageRank
+        分数与收敛信息的列表，格式同compute_pagerank。
+    """
+    n_graphs = len(adjacent_mats)
+    if max_iter < 1:
+        raise ValueError("max_iter must be positive !")
+    if n_graphs == 0:
+        return [], []
+    if top_k is not None and top_k <= 0:
+        raise ValueError("top_k must be positive !")
+    if max_time is not None:
+        deadline = time.perf_counter() + max_time
+
+    sizes = np.array([adjacent_mat.shape[0] for adjacent_mat in adjacent_mats],
+                     dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(sizes)])
+    block_ids = np.repeat(np.arange(n_graphs), sizes)
+    transition_mat_t, is_dangling = _build_transition_matrix(
+        sparse.block_diag([sparse.csr_matrix(adjacent_mat, dtype=float)
+                           for adjacent_mat in adjacent_mats],
+                          format="csr"))
+
+    teleport = 1.0 / np.maximum(sizes, 1)[block_ids]
+    scores = teleport.copy()
+    n_iter = np.zeros(n_graphs, dtype=np.int64)
+    residual = np.zeros(n_graphs)
+    is_converged = sizes == 0
+    is_stopped = is_converged.copy()
+    stop_reasons = np.where(is_converged, "tol", "max_iter").astype(object)
+
+    # 每个图的前top_k个结点在top_index中占据一段连续的位置
+    if top_k is not None:
+        top_sizes = np.minimum(sizes, top_k)
+        top_offsets = np.concatenate([[0], np.cumsum(top_sizes)])
+        top_index = np.full(top_offsets[-1], -1, dtype=np.int64)
+        n_stable = np.zeros(n_graphs, dtype=np.int64)
+
+    # 当前迭代矩阵中的结点编号、所属的图及其随机跳转概率
+    vertex_index = np.arange(offsets[-1])
+    vertex_block_ids, vertex_teleport = block_ids, teleport
+    vertex_is_dangling = is_dangling
+    for _ in range(max_iter):
+        if is_stopped.all():
+            break
+        is_active = ~is_stopped
+
+        scores_last = scores[vertex_index]
+        dangling_sum = np.bincount(
+            vertex_block_ids, weights=scores_last * vertex_is_dangling,
+            minlength=n_graphs)
+        scores_new = alpha * (
+            transition_mat_t.dot(scores_last) +
+            dangling_sum[vertex_block_ids] * vertex_teleport) + \
+            (1 - alpha) * vertex_teleport
+
+        # 只更新未停止的图，并按图分别计算L1距离
+        is_active_vertex = is_active[vertex_block_ids]
+        scores[vertex_index[is_active_vertex]] = scores_new[is_active_vertex]
+        block_residual = np.bincount(
+            vertex_block_ids, weights=np.abs(scores_new - scores_last),
+            minlength=n_graphs)
+        n_iter[is_active] += 1
+        residual[is_active] = block_residual[is_active]
+        is_new_converged = is_active & (block_residual < sizes * tol)
+        is_converged |= is_new_converged
+        stop_reasons[is_new_converged] = "tol"
+        is_active &= ~is_new_converged
+
+        # 按(图, 分数降序)排序，得到每个图的前top_k个结点，与上一次迭代比较
+        if top_k is not None:
+            order = np.lexsort((-scores_new, vertex_block_ids))
+            ranks = np.arange(len(vertex_index)) - np.searchsorted(
+                vertex_block_ids, vertex_block_ids)
+            is_top = ranks < top_k
+            top_blocks = vertex_block_ids[is_top]
+            top_positions = top_offsets[top_blocks] + ranks[is_top]
+            top_vertices = vertex_index[order[is_top]]
+
+            n_changed = np.bincount(
+                top_blocks, weights=top_index[top_positions] != top_vertices,
+                minlength=n_graphs)
+            top_index[top_positions] = top_vertices
+            n_stable = np.where(n_changed == 0, n_stable + 1, 0)
+            is_top_k_stable = is_active & (n_stable >= n_stable_iter)
+            stop_reasons[is_top_k_stable] = "top_k"
+            is_active &= ~is_top_k_stable
+        if max_time is not None and time.perf_counter() >= deadline:
+            stop_reasons[is_active] = "max_time"
+            is_active[:] = False
+        is_stopped = ~is_active | is_stopped
+
+        # 压缩迭代矩阵，去除已停止的图
+        is_keep = ~is_stopped[vertex_block_ids]
+        if is_keep.sum() < len(vertex_index) / 2:
+            transition_mat_t = transition_mat_t[is_keep][:, is_keep]
+            vertex_index = vertex_index[is_keep]
+            vertex_block_ids = vertex_block_ids[is_keep]
+            vertex_teleport = vertex_teleport[is_keep]
+            vertex_is_dangling = vertex_is_dangling[is_keep]
+
+    scores_list = [scores[offsets[i]:offsets[i+1]] for i in range(n_graphs)]
+    info_list = [{"n_iter": int(n_iter[i]),
+                  "residual": float(residual[i]),
+                  "is_converged": bool(is_converged[i]),
+                  "stop_reason": stop_reasons[i]}
+                 for i in range(n_graphs)]
+    return scores_list, info_list
 
 
-# TODO(zhuoyin94@163.com): 稀疏PageRank算法
 def compute_word_scores_sp(vertex_source, edge_source,
-                           window_size=2, pagerank_config=None):
-    pass
+                           window_size=2, pagerank_config=None,
+                           is_return_info=False, edge_weight="binary",
+                           top_k=None):
+    """基于稀疏矩阵，计算vertex_source中每一个结点的PageRank分数。
+
+    计算结果与compute_word_scores一致，但图以CSR格式的稀疏矩阵表示，空间复杂度
+    由O(V^2)降为O(V + E)，其中V为结点个数，E为边的个数，适用于词表较大的长文本。
+
+    @Parameters:
+    ----------
+        vertex_source: {list-like}
+            分词后的句子的集合，用于构建图的结点。
+        edge_source: {list-like}
+            分词之后的句子集合，用于构建图的边关系。
+        window_size: {int-like}
+            滑窗尺寸的大小。
+        pagerank_config: {dict-like}
+            PageRank算法的参数字典，可选的键为alpha、max_iter与tol，如：
+            {'alpha': 0.85, 'max_iter': 100, 'tol': 1e-6}
+        is_return_info: {bool-like}
+            是否同时返回PageRank迭代的收敛信息，见compute_pagerank。
+        edge_weight, top_k:
+            见compute_word_scores。
+
+    @Returns:
+    ----------
+        返回每个词的PageRank分数，格式与compute_word_scores相同。
+    """
+    if not vertex_source or not edge_source:
+        raise ValueError("vertex_source and edge_source must not be empty !")
+
+    if not pagerank_config:
+        pagerank_config = {"alpha": 0.85}
+
+    word2index, index2word = build_word_index(vertex_source)
+    adjacent_mat = build_sparse_adjacent_matrix(
+        edge_source, word2index, window_size, edge_weight)
+
+    # 计算每一个结点的PageRank分数值，并按分数降序排列
+    vertex_scores, pagerank_info = compute_pagerank(
+        adjacent_mat, **pagerank_config)
+    sorted_words = []
+    for index in get_top_k_index(vertex_scores, top_k).tolist():
+        sorted_words.append([index2word[index], float(vertex_scores[index])])
+    if is_return_info:
+        return sorted_words, pagerank_info
+    return sorted_words
+
+
+def compute_word_scores_encoded(vertex_document, edge_document, vocabulary,
+                                window_size=2, pagerank_config=None,
+                                is_return_info=False, edge_weight="binary",
+                                profiler=None, top_k=None):
+    """基于整数id编码的分词结果，计算每一个结点的PageRank分数。
+
+    计算结果与compute_word_scores_sp一致，但结点与边直接由EncodedDocument中的
+    整数id数组构建：结点的编号由np.unique一次求得，词id到结点编号的映射为一个
+    整数数组，构图过程中不再需要对字符串进行哈希。vocabulary可以由多篇文档共用，
+    计算量只与当前文档的长度有关。
+
+    @Parameters:
+    ----------
+        vertex_document: {object-like}
+            EncodedDocument类型的分词结果，用于构建图的结点。
+        edge_document: {object-like}
+            EncodedDocument类型的分词结果，用于构建图的边关系。
+        vocabulary: {object-like}
+            两个文档共用的Vocabulary词表。
+        window_size: {int-like}
+            滑窗尺寸的大小。
+        pagerank_config: {dict-like}
+            PageRank算法的参数字典，见compute_pagerank。
+        is_return_info: {bool-like}
+            是否同时返回PageRank迭代的收敛信息，见compute_pagerank。
+        edge_weight: {str-like}
+            边的权重，见compute_word_scores。
+        profiler: {object-like}
+            StageProfiler类型的分析器，记录构图与PageRank迭代的耗时，以及结点数、
+            边数与迭代次数。默认为None，即不记录。
+        top_k: {int-like}
+            只返回分数最大的top_k个词，由np.argpartition选出，无需对全部结点
+            排序。默认为None，即返回全部词。pagerank_config中的top_k（见
+            compute_pagerank）只决定何时停止迭代，与本参数相互独立。
+
+    @Returns:
+    ----------
+        返回每个词的PageRank分数，格式与compute_word_scores相同。
+    """
+    if not vertex_document.n_tokens or not edge_document.n_tokens:
+        raise ValueError(
+            "vertex_document and edge_document must not be empty !")
+
+    if not pagerank_config:
+        pagerank_config = {"alpha": 0.85}
+
+    if profiler is not None:
+        start = time.perf_counter()
+    vertex_ids, adjacent_mat = _build_encoded_graph(
+        vertex_document, edge_document, window_size, edge_weight)
+    if profiler is not None:
+        profiler.add_time("graph", time.perf_counter() - start)
+        _count_graph(profiler, adjacent_mat)
+        start = time.perf_counter()
+
+    vertex_scores, pagerank_info = compute_pagerank(
+        adjacent_mat, **pagerank_config)
+    if profiler is not None:
+        profiler.add_time("pagerank", time.perf_counter() - start)
+        profiler.add_count("pagerank_iterations", pagerank_info["n_iter"])
+
+    sorted_words = _sort_word_scores(vertex_scores, vertex_ids, vocabulary,
+                                     top_k)
+    if is_return_info:
+        return sorted_words, pagerank_info
+    return sorted_words
+
+
+def _build_encoded_graph(vertex_document, edge_document, window_size,
+                         edge_weight):
+    """由EncodedDocument构建词共现图，返回(结点的词id, 稀疏邻接矩阵)。"""
+    # 结点按词首次出现的顺序编号，与build_word_index一致
+    unique_ids, first_positions = np.unique(
+        vertex_document.token_ids, return_index=True)
+    vertex_ids = unique_ids[np.argsort(first_positions, kind="stable")]
+    n_vertex = len(vertex_ids)
+
+    # 词id先被压缩到文档内出现过的词的范围，映射数组的大小与词表大小无关，
+    # 多篇文档共用一个大词表时不会为每篇文档分配O(词表大小)的数组
+    edge_ids = edge_document.token_ids
+    local_ids = np.union1d(unique_ids, edge_ids[edge_ids >= 0])
+    vertex_index = np.full(len(local_ids), -1, dtype=np.int64)
+    vertex_index[np.searchsorted(local_ids, vertex_ids)] = np.arange(n_vertex)
+    edge_document = EncodedDocument(
+        np.where(edge_ids >= 0, np.searchsorted(local_ids, edge_ids), -1),
+        edge_document.sentence_offsets)
+
+    adjacent_mat = build_cooccurrence_matrix(
+        edge_document, n_vertex, window_size, vertex_index=vertex_index,
+        edge_weight=edge_weight)
+    return vertex_ids, adjacent_mat
+
+
+def _count_graph(profiler, adjacent_mat):
+    """记录图的结点数与无向边数。"""
+    profiler.add_count("vertices", adjacent_mat.shape[0])
+    profiler.add_count("edges", (adjacent_mat.nnz + np.count_nonzero(
+        adjacent_mat.diagonal())) // 2)
+
+
+def _sort_word_scores(vertex_scores, vertex_ids, vocabulary, top_k=None):
+    """将分数最大的top_k个结点按分数降序排列为[词, 分数]的列表。"""
+    index2word = vocabulary.index2word
+    sorted_words = []
+    for index in get_top_k_index(vertex_scores, top_k).tolist():
+        sorted_words.append([index2word[vertex_ids[index]],
+                             float(vertex_scores[index])])
+    return sorted_words
+
+
+def compute_word_scores_encoded_batch(vertex_documents, edge_documents,
+                                      vocabulary, window_size=2,
+                                      pagerank_config=None,
+                                      is_return_info=False,
+                                      edge_weight="binary",
+                                      profiler=None, top_k=None):
+    """批量计算多篇文档中每一个结点的PageRank分数。
+
+    每篇文档的词共现图被分别构建，之后由compute_pagerank_batch在一个分块对角
+    矩阵上同时完成全部文档的幂迭代，适用于大量短文本（如新闻稿）的关键词抽取。
+    每篇文档的结果与compute_word_scores_encoded一致。结点或边的视图为空的文档
+    （如空白或只包含停用词的语料）不参与迭代，其结果为空列表。
+
+    @Parameters:
+    ----------
+        vertex_documents: {list-like}
+            EncodedDocument的列表，用于构建每篇文档的图的结点。
+        edge_documents: {list-like}
+            与vertex_documents一一对应的EncodedDocument的列表，用于构建图的边。
+        vocabulary: {object-like}
+            全部文档共用的Vocabulary词表。
+        window_size, pagerank_config, is_return_info, edge_weight, profiler,
+        top_k:
+            见compute_word_scores_encoded。
+
+    @Raises:
+    ----------
+        ValueError: 文档数目不一致
+
+    @Returns:
+    ----------
+        与文档一一对应的关键词列表的列表，每个元素的格式与compute_word_scores
+        相同；is_return_info为True时同时返回收敛信息的列表。
+    """
+    if len(vertex_documents) != len(edge_documents):
+        raise ValueError(
+            "vertex_documents and edge_documents must have the same length !")
+
+    # 空文档不参与构图与迭代，其结果为空列表
+    nonempty_index = [
+        index for index, (vertex_document, edge_document) in enumerate(
+            zip(vertex_documents, edge_documents))
+        if vertex_document.n_tokens and edge_document.n_tokens]
+    sorted_words_list = [[] for _ in range(len(vertex_documents))]
+    info_list = [{"n_iter": 0, "residual": 0.0, "is_converged": True,
+                  "stop_reason": "tol"} for _ in range(len(vertex_documents))]
+
+    if not pagerank_config:
+        pagerank_config = {"alpha": 0.85}
+
+    if profiler is not None:
+        start = time.perf_counter()
+    graphs = [_build_encoded_graph(vertex_documents[index],
+                                   edge_documents[index], window_size,
+                                   edge_weight)
+              for index in nonempty_index]
+    if profiler is not None:
+        profiler.add_time("graph", time.perf_counter() - start)
+        for _, adjacent_mat in graphs:
+            _count_graph(profiler, adjacent_mat)
+        start = time.perf_counter()
+
+    scores_list, nonempty_info_list = compute_pagerank_batch(
+        [adjacent_mat for _, adjacent_mat in graphs], **pagerank_config)
+    if profiler is not None:
+        profiler.add_time("pagerank", time.perf_counter() - start)
+        profiler.add_count("pagerank_iterations",
+                           sum(info["n_iter"] for info in nonempty_info_list))
+
+    for index, vertex_scores, (vertex_ids, _), info in zip(
+            nonempty_index, scores_list, graphs, nonempty_info_list):
+        sorted_words_list[index] = _sort_word_scores(
+            vertex_scores, vertex_ids, vocabulary, top_k)
+        info_list[index] = info
+    if is_return_info:
+        return sorted_words_list, info_list
+    return sorted_words_list
+
+
+# 句子相似度的批量计算方法：{名称: 一对多的相似度函数}
+SIMILARITY_MANY_FUNCTIONS = {"lcss": compute_lcss_similarity_many,
+                             "edit": compute_edit_similarity_many}
+
+# 内置相似度在填充之后的id矩阵上的批量计算方法
+SIMILARITY_PADDED_FUNCTIONS = {"lcss": _compute_lcss_similarity_padded,
+                               "edit": _compute_edit_similarity_padded}
+
+
+def build_similarity_matrix(word_lists, similarity="jaccard",
+                            similarity_threshold=0.0,
+                            top_k_neighbors=None):
+    """构建以句子为结点、句子之间的相似度为边权重的稀疏邻接矩阵。
+
+    jaccard相似度由compute_jaccard_similarity_matrix一次求得；lcss与edit相似度
+    先将所有句子以同一个词表编码为整数id并填充为矩阵，之后对每一个句子，其与之后
+    所有句子的相似度由一次向量化的计算求得，避免O(N^2)次的Python函数调用。
+    相似度低于similarity_threshold的边被剪除；若指定了top_k_neighbors，每个句子
+    只保留相似度最大的top_k_neighbors条边，从而保证图的稀疏性。
+
+    @Parameters:
+    ----------
+        word_lists: {list-like}
+            分词之后的句子集合，每一个元素为一个句子的词列表。
+        similarity: {str-like} or {callable}
+            句子相似度，可选"jaccard"、"lcss"与"edit"；也可以是形如
+            f(word_list_x, word_lists_y)的一对多相似度函数，返回np.ndarray。
+        similarity_threshold: {float-like}
+            保留的边的最小相似度。
+        top_k_neighbors: {int-like}
+            每个句子保留的最大邻居数目，默认为None，即不限制邻居数目。
+
+    @Returns:
+    ----------
+        shape为(N, N)的对称scipy.sparse.csr_matrix，对角线元素为0。
+    """
+    if not isinstance(word_lists, EncodedDocument):
+        word_lists = list(word_lists)
+    n_sentences = len(word_lists)
+
+    if similarity == "jaccard":
+        similarity_mat = compute_jaccard_similarity_matrix(
+            word_lists, threshold=similarity_threshold).tocoo()
+        rows, cols, data = similarity_mat.row, similarity_mat.col, \
+            similarity_mat.data
+    else:
+        if callable(similarity):
+            compute_similarity_many = similarity
+        elif similarity in SIMILARITY_MANY_FUNCTIONS:
+            compute_similarity_many = None
+        else:
+            raise ValueError("Invalid similarity: {}".format(similarity))
+
+        # 内置的相似度：所有句子只编码与填充一次，每一行的全部候选句子一次求得
+        if compute_similarity_many is None and n_sentences > 1:
+            document = _as_encoded_document(word_lists)
+            if document is None:
+                document = EncodedDocument.from_word_lists(word_lists,
+                                                           Vocabulary())
+            token_ids_list = list(document)
+            padded, lengths = _pad_token_ids(token_ids_list)
+            compute_similarity_padded = SIMILARITY_PADDED_FUNCTIONS[
+                similarity]
+
+        rows, cols, data = [], [], []
+        for i in range(n_sentences - 1):
+            if compute_similarity_many is None:
+                n_columns = int(lengths[i+1:].max())
+                scores = compute_similarity_padded(
+                    token_ids_list[i], padded[i+1:, :n_columns],
+                    lengths[i+1:])
+            else:
+                scores = np.asarray(compute_similarity_many(
+                    word_lists[i], [word_lists[j] for j in
+                                    range(i + 1, n_sentences)]),
+                                    dtype=float)
+            is_kept = (scores >= similarity_threshold) & (scores > 0)
+            neighbors = np.flatnonzero(is_kept) + i + 1
+
+            rows.extend([np.full(len(neighbors), i), neighbors])
+            cols.extend([neighbors, np.full(len(neighbors), i)])
+            data.extend([scores[is_kept], scores[is_kept]])
+        rows = np.concatenate(rows) if rows else np.array([], dtype=int)
+        cols = np.concatenate(cols) if cols else np.array([], dtype=int)
+        data = np.concatenate(data) if data else np.array([])
+
+    # 去除自环
+    is_kept = rows != cols
+    similarity_mat = sparse.csr_matrix(
+        (data[is_kept], (rows[is_kept], cols[is_kept])),
+        shape=(n_sentences, n_sentences))
+
+    # 每个句子只保留相似度最大的top_k_neighbors条边，任一端点保留即保留该边
+    if top_k_neighbors is not None:
+        rows, cols, data = [], [], []
+        for i in range(n_sentences):
+            begin, end = similarity_mat.indptr[i], similarity_mat.indptr[i+1]
+            scores = similarity_mat.data[begin:end]
+            neighbors = similarity_mat.indices[begin:end]
+            if len(scores) > top_k_neighbors:
+                top_index = np.argpartition(
+                    -scores, top_k_neighbors - 1)[:top_k_neighbors]
+                scores, neighbors = scores[top_index], neighbors[top_index]
+            rows.append(np.full(len(neighbors), i))
+            cols.append(neighbors)
+            data.append(scores)
+
+        pruned_mat = sparse.csr_matrix(
+            (np.concatenate(data), (np.concatenate(rows),
+                                    np.concatenate(cols))),
+            shape=(n_sentences, n_sentences))
+        similarity_mat = pruned_mat.maximum(pruned_mat.T).tocsr()
+    return similarity_mat
+
+
+def compute_sentence_scores(word_lists, similarity="jaccard",
+                            similarity_threshold=0.0,
+                            top_k_neighbors=None,
+                            pagerank_config=None):
+    """以句子为结点、句子相似度为边权重构建图，计算每一个句子的PageRank分数。
+
+    @Parameters:
+    ----------
+        word_lists: {list-like}
+            分词之后的句子集合，每一个元素为一个句子的词列表。
+        similarity, similarity_threshold, top_k_neighbors:
+            见build_similarity_matrix。
+        pagerank_config: {dict-like}
+            PageRank算法的参数字典，可选的键为alpha、max_iter与tol，如：
+            {'alpha': 0.85}
+
+    @Returns:
+    ----------
+        按PageRank分数降序排列的[句子下标, 分数]的列表。
+    """
+    if not word_lists:
+        raise ValueError("word_lists must not be empty !")
+
+    if not pagerank_config:
+        pagerank_config = {"alpha": 0.85}
+
+    similarity_mat = build_similarity_matrix(
+        word_lists, similarity, similarity_threshold, top_k_neighbors)
+    sentence_scores, _ = compute_pagerank(similarity_mat, **pagerank_config)
+    return [[index, float(sentence_scores[index])]
+            for index in get_top_k_index(sentence_scores).tolist()]
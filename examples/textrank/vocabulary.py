@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Created on Wed Jan 13 10:05:44 2021
+# Author:     zhuoyin94 <zhuoyin94@163.com>
+# Github:     https://github.com/MichaelYin1994
+
+"""
+本模块(textrank.vocabulary)提供了词表Vocabulary类，以及以整数id数组表示分词结果
+的EncodedDocument类。
+"""
+
+from array import array
+
+import numpy as np
+
+
+class Vocabulary():
+    """词与整数id之间的双向索引表。
+
+    每个词只被存储一次，分词结果中的词被替换为其整数id，之后的图构建与相似度计算
+    只需处理整数数组，无需反复对字符串进行哈希。
+
+    @Parameters:
+    ----------
+        words: {list-like}
+            初始的词列表，默认为空。
+
+    @Attributes:
+    ----------
+        self.word2index:
+            {词: id}的索引表。
+        self.index2word:
+            id到词的列表。
+    """
+    def __init__(self, words=None):
+        self.word2index = {}
+        self.index2word = []
+        for word in words or []:
+            self.add(word)
+
+    def __len__(self):
+        return len(self.index2word)
+
+    def __contains__(self, word):
+        return word in self.word2index
+
+    def add(self, word):
+        """返回word的id，新词被追加到词表的末尾。"""
+        index = self.word2index.get(word)
+        if index is None:
+            index = len(self.index2word)
+            self.word2index[word] = index
+            self.index2word.append(word)
+        return index
+
+    def encode(self, word_list, is_add=True):
+        """将词列表编码为np.int32类型的id数组。
+
+        @Parameters:
+        ----------
+            word_list: {list-like}
+                句子分词之后的词列表。
+            is_add: {bool-like}
+                是否将未登录词加入词表；为False时未登录词被编码为-1。
+
+        @Returns:
+        ----------
+            shape为(len(word_list), )的np.ndarray。
+        """
+        if is_add:
+            token_ids = array("i", [self.add(word) for word in word_list])
+        else:
+            token_ids = array("i", [self.word2index.get(word, -1)
+                                    for word in word_list])
+        return np.frombuffer(token_ids, dtype=np.int32) if token_ids \
+            else np.array([], dtype=np.int32)
+
+    def decode(self, token_ids):
+        """将id数组解码为词列表。"""
+        return [self.index2word[index] for index in token_ids]
+
+
+class EncodedDocument():
+    """以扁平的整数id数组与句子偏移量表示的分词结果。
+
+    第i个句子的词id为token_ids[sentence_offsets[i]:sentence_offsets[i+1]]，
+    与list[list[str]]相比，整篇文档只需要两个连续的数组。
+
+    @Parameters:
+    ----------
+        token_ids: {array-like}
+            所有句子的词id依次拼接而成的一维整数数组。
+        sentence_offsets: {array-like}
+            shape为(n_sentences + 1, )的句子起止位置数组，首元素为0。
+    """
+    def __init__(self, token_ids, sentence_offsets):
+        self.token_ids = np.asarray(token_ids)
+        self.sentence_offsets = np.asarray(sentence_offsets, dtype=np.int64)
+        if len(self.sentence_offsets) == 0 or self.sentence_offsets[0] != 0 \
+                or self.sentence_offsets[-1] != len(self.token_ids):
+            raise ValueError("Invalid sentence_offsets !")
+
+    def __len__(self):
+        return len(self.sentence_offsets) - 1
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("sentence index out of range")
+        return self.token_ids[
+            self.sentence_offsets[index]:self.sentence_offsets[index+1]]
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    @property
+    def n_tokens(self):
+        """文档中词的总数。"""
+        return len(self.token_ids)
+
+    @classmethod
+    def from_word_lists(cls, word_lists, vocabulary, is_add=True):
+        """将list[list[str]]类型的分词结果编码为EncodedDocument。"""
+        if is_add:
+            get_index = vocabulary.add
+        else:
+            get_index = lambda word: vocabulary.word2index.get(word, -1)
+
+        token_ids, sentence_offsets = array("i"), array("q", [0])
+        for word_list in word_lists:
+            token_ids.extend([get_index(word) for word in word_list])
+            sentence_offsets.append(len(token_ids))
+        return cls(np.frombuffer(token_ids, dtype=np.int32) if token_ids
+                   else np.array([], dtype=np.int32),
+                   np.frombuffer(sentence_offsets, dtype=np.int64))
+
+    def to_word_lists(self, vocabulary):
+        """将EncodedDocument解码为list[list[str]]类型的分词结果。"""
+        words = vocabulary.decode(self.token_ids.tolist())
+        offsets = self.sentence_offsets.tolist()
+        return [words[offsets[i]:offsets[i+1]] for i in range(len(self))]
+
+    def filter_empty(self):
+        """返回去除空句子之后的EncodedDocument。"""
+        lengths = np.diff(self.sentence_offsets)
+        offsets = np.concatenate([[0], np.cumsum(lengths[lengths > 0])])
+        return EncodedDocument(self.token_ids, offsets)